@@ -9,10 +9,18 @@ Description: restore_nat_entries.py -- restoring nat entries table into kernel d
     In case system warm reboot is enabled, it will try to restore the nat entries table into kernel
     , then it sets the stateDB flag for natsyncd to continue the
     reconciliation process.
+    The entries are added to the kernel with ctnetlink messages, sent in batches
+    (--batch-size entries). The conntrack utility is used if the netlink socket
+    can't be opened, and for the entries the kernel didn't accept with ctnetlink.
 """
 
+import argparse
+import errno
+import itertools
 import os
 import re
+import socket
+import struct
 import subprocess
 import sys
 
@@ -24,6 +32,50 @@ SYSLOG_IDENTIFIER = os.path.basename(__file__)
 WARM_BOOT_FILE_DIR = '/var/warmboot/nat/'
 NAT_WARM_BOOT_FILE = 'nat_entries.dump'
 IP_PROTO_TCP = '6'
+DEFAULT_BATCH_SIZE = 256
+NAT_ENTRY_TIMEOUT = 432000
+
+# Netlink and ctnetlink definitions (linux/netlink.h, linux/netfilter/nfnetlink_conntrack.h)
+NETLINK_NETFILTER = 12
+NLMSG_ERROR = 2
+NLM_F_REQUEST = 0x1
+NLM_F_ACK = 0x4
+NLM_F_EXCL = 0x200
+NLM_F_CREATE = 0x400
+NLA_F_NESTED = 0x8000
+NFNL_SUBSYS_CTNETLINK = 1
+IPCTNL_MSG_CT_NEW = 0
+NFNETLINK_V0 = 0
+CTA_TUPLE_ORIG = 1
+CTA_TUPLE_REPLY = 2
+CTA_STATUS = 3
+CTA_PROTOINFO = 4
+CTA_NAT_SRC = 6
+CTA_TIMEOUT = 7
+CTA_NAT_DST = 13
+CTA_TUPLE_IP = 1
+CTA_TUPLE_PROTO = 2
+CTA_IP_V4_SRC = 1
+CTA_IP_V4_DST = 2
+CTA_PROTO_NUM = 1
+CTA_PROTO_SRC_PORT = 2
+CTA_PROTO_DST_PORT = 3
+CTA_PROTOINFO_TCP = 1
+CTA_PROTOINFO_TCP_STATE = 1
+CTA_NAT_V4_MINIP = 1
+CTA_NAT_V4_MAXIP = 2
+CTA_NAT_PROTO = 3
+CTA_PROTONAT_PORT_MIN = 1
+CTA_PROTONAT_PORT_MAX = 2
+IPS_ASSURED = 0x4
+IPS_CONFIRMED = 0x8
+TCP_CONNTRACK_ESTABLISHED = 3
+
+# Messages sent before reading their acks, and socket buffer sizes holding them
+NETLINK_ACK_WINDOW = 128
+NETLINK_SOCKET_BUFFER = 4 * 1024 * 1024
+SO_SNDBUFFORCE = 32
+SO_RCVBUFFORCE = 33
 
 MATCH_CONNTRACK_ENTRY = '^(\w+)\s+(\d+).*src=([\d.]+)\s+dst=([\d.]+)\s+sport=(\d+)\s+dport=(\d+).*src=([\d.]+)\s+dst=([\d.]+)\s+sport=(\d+)\s+dport=(\d+)'
 
@@ -40,8 +92,138 @@ def add_nat_conntrack_entry_in_kernel(ipproto, srcip, dstip, srcport, dstport, n
     ctcmd = ['conntrack', '-I', '-n', natdstip + ':' + natdstport, '-g', natsrcip + ':' + natsrcport, \
         '--protonum', ipproto] + state + ['--timeout', '432000', '--src', srcip, '--sport', srcport, \
         '--dst', dstip, '--dport', dstport, '-u', 'ASSURED']
-    subprocess.call(ctcmd)
+    try:
+        rc = subprocess.call(ctcmd)
+    except OSError as e:
+        logger.log_warning("Failed to restore NAT entry {}: {}".format(ctcmd, str(e)))
+        return False
+    if rc != 0:
+        logger.log_warning("Failed to restore NAT entry: {}".format(ctcmd))
+        return False
     logger.log_info("Restored NAT entry: {}".format(ctcmd))
+    return True
+
+
+def _nla(attr_type, payload):
+    length = 4 + len(payload)
+    return struct.pack('=HH', length, attr_type) + payload + b'\0' * (-length % 4)
+
+
+def _nla_nested(attr_type, *attrs):
+    return _nla(attr_type | NLA_F_NESTED, b''.join(attrs))
+
+
+def _tuple_attr(attr_type, ipproto, srcip, dstip, srcport, dstport):
+    return _nla_nested(attr_type,
+                       _nla_nested(CTA_TUPLE_IP,
+                                   _nla(CTA_IP_V4_SRC, socket.inet_aton(srcip)),
+                                   _nla(CTA_IP_V4_DST, socket.inet_aton(dstip))),
+                       _nla_nested(CTA_TUPLE_PROTO,
+                                   _nla(CTA_PROTO_NUM, struct.pack('B', ipproto)),
+                                   _nla(CTA_PROTO_SRC_PORT, struct.pack('!H', srcport)),
+                                   _nla(CTA_PROTO_DST_PORT, struct.pack('!H', dstport))))
+
+
+def _nat_attr(attr_type, ip, port):
+    return _nla_nested(attr_type,
+                       _nla(CTA_NAT_V4_MINIP, socket.inet_aton(ip)),
+                       _nla(CTA_NAT_V4_MAXIP, socket.inet_aton(ip)),
+                       _nla_nested(CTA_NAT_PROTO,
+                                   _nla(CTA_PROTONAT_PORT_MIN, struct.pack('!H', port)),
+                                   _nla(CTA_PROTONAT_PORT_MAX, struct.pack('!H', port))))
+
+
+class ConntrackNetlink(object):
+    """
+    Adds conntrack entries with ctnetlink messages, like 'conntrack -I' does.
+    All the messages of a batch are sent at once and their acks are read afterwards.
+    """
+
+    def __init__(self):
+        self.sock = socket.socket(socket.AF_NETLINK, socket.SOCK_RAW, NETLINK_NETFILTER)
+        self.sock.bind((0, 0))
+        for force_option, option in ((SO_SNDBUFFORCE, socket.SO_SNDBUF), (SO_RCVBUFFORCE, socket.SO_RCVBUF)):
+            try:
+                self.sock.setsockopt(socket.SOL_SOCKET, force_option, NETLINK_SOCKET_BUFFER)
+            except OSError:
+                self.sock.setsockopt(socket.SOL_SOCKET, option, NETLINK_SOCKET_BUFFER)
+        self.seq = 0
+
+    def close(self):
+        self.sock.close()
+
+    def build_message(self, seq, ipproto, srcip, dstip, srcport, dstport, natsrcip, natdstip, natsrcport, natdstport):
+        """
+        Build the message of 'conntrack -I -n natdstip:natdstport -g natsrcip:natsrcport --protonum ipproto
+        [--state ESTABLISHED] --timeout 432000 --src srcip --sport srcport --dst dstip --dport dstport -u ASSURED'
+        """
+        proto = int(ipproto)
+        srcport, dstport = int(srcport), int(dstport)
+        attrs = [
+            _tuple_attr(CTA_TUPLE_ORIG, proto, srcip, dstip, srcport, dstport),
+            # the reply tuple is the inverted original tuple, the kernel applies the NAT to it
+            _tuple_attr(CTA_TUPLE_REPLY, proto, dstip, srcip, dstport, srcport),
+            _nat_attr(CTA_NAT_SRC, natdstip, int(natdstport)),
+            _nat_attr(CTA_NAT_DST, natsrcip, int(natsrcport)),
+            _nla(CTA_TIMEOUT, struct.pack('!I', NAT_ENTRY_TIMEOUT)),
+            # like 'conntrack -I', the kernel refuses to insert unconfirmed entries (EBUSY)
+            _nla(CTA_STATUS, struct.pack('!I', IPS_ASSURED | IPS_CONFIRMED)),
+        ]
+        if ipproto == IP_PROTO_TCP:
+            attrs.append(_nla_nested(CTA_PROTOINFO,
+                                     _nla_nested(CTA_PROTOINFO_TCP,
+                                                 _nla(CTA_PROTOINFO_TCP_STATE, struct.pack('B', TCP_CONNTRACK_ESTABLISHED)))))
+        payload = struct.pack('=BBH', socket.AF_INET, NFNETLINK_V0, 0) + b''.join(attrs)
+        flags = NLM_F_REQUEST | NLM_F_ACK | NLM_F_CREATE | NLM_F_EXCL
+        msg_type = (NFNL_SUBSYS_CTNETLINK << 8) | IPCTNL_MSG_CT_NEW
+        return struct.pack('=IHHII', 16 + len(payload), msg_type, flags, seq, 0) + payload
+
+    def add_entries(self, entries):
+        """
+        Add conntrack entries to the kernel
+        :param entries: list of entries, each one is the argument list of add_nat_conntrack_entry_in_kernel()
+        :return: list of tuples (entry, errno) of the entries which couldn't be added
+        """
+        failures = []
+        for start in range(0, len(entries), NETLINK_ACK_WINDOW):
+            window = entries[start:start + NETLINK_ACK_WINDOW]
+            pending = {}
+            messages = []
+            for entry in window:
+                self.seq = (self.seq + 1) & 0xffffffff
+                try:
+                    messages.append(self.build_message(self.seq, *entry))
+                except (OSError, ValueError, struct.error):
+                    failures.append((entry, errno.EINVAL))
+                    continue
+                pending[self.seq] = entry
+            if not messages:
+                continue
+            self.sock.send(b''.join(messages))
+            failures.extend(self.read_acks(pending))
+        return failures
+
+    def read_acks(self, pending):
+        failures = []
+        while pending:
+            try:
+                data = self.sock.recv(65536)
+            except OSError as e:
+                # acks were lost, e.g. ENOBUFS: the outcome of the pending entries is unknown
+                failures.extend((entry, e.errno) for entry in pending.values())
+                return failures
+            offset = 0
+            while offset + 16 <= len(data):
+                length, msg_type, _, seq, _ = struct.unpack_from('=IHHII', data, offset)
+                if length < 16:
+                    break
+                if msg_type == NLMSG_ERROR and seq in pending:
+                    error = struct.unpack_from('=i', data, offset + 16)[0]
+                    entry = pending.pop(seq)
+                    if error != 0:
+                        failures.append((entry, -error))
+                offset += (length + 3) & ~3
+        return failures
 
 
 # Set the statedb "NAT_RESTORE_TABLE|Flags", so natsyncd can start reconciliation
@@ -53,9 +235,8 @@ def set_statedb_nat_restore_done():
     return
 
 
-# This function is to restore the kernel nat entries based on the saved nat entries.
-def restore_update_kernel_nat_entries(filename):
-    # Read the entries from nat_entries.dump file and add them to kernel
+# Read the tcp/udp entries of the saved nat entries file, one at a time
+def read_nat_entries(filename):
     conntrack_match_pattern = re.compile(r'{}'.format(MATCH_CONNTRACK_ENTRY))
     with open(filename, 'r') as fp:
         for line in fp:
@@ -66,10 +247,54 @@ def restore_update_kernel_nat_entries(filename):
             proto = cmdargs.pop(0)
             if proto not in ('tcp', 'udp'):
                 continue
-            add_nat_conntrack_entry_in_kernel(*cmdargs)
+            yield cmdargs
+
+
+# This function is to restore the kernel nat entries based on the saved nat entries.
+def restore_update_kernel_nat_entries(filename, batch_size=DEFAULT_BATCH_SIZE):
+    # Read the entries from nat_entries.dump file and add them to kernel
+    try:
+        conntrack = ConntrackNetlink()
+    except OSError as e:
+        logger.log_warning("Can't open ctnetlink socket, using conntrack utility: {}".format(str(e)))
+        restored = failed = 0
+        for cmdargs in read_nat_entries(filename):
+            if add_nat_conntrack_entry_in_kernel(*cmdargs):
+                restored += 1
+            else:
+                failed += 1
+        logger.log_notice("Restored {} NAT entries, {} failed".format(restored, failed))
+        return
+
+    entries = read_nat_entries(filename)
+    restored = failed = 0
+    try:
+        for batch_num in itertools.count(1):
+            batch = list(itertools.islice(entries, batch_size))
+            if not batch:
+                break
+            failures = []
+            for entry, error in conntrack.add_entries(batch):
+                # retry the entries the kernel didn't accept with the conntrack utility
+                logger.log_warning("Failed to restore NAT entry {} with ctnetlink, using conntrack utility: {}".format(
+                    entry, os.strerror(error)))
+                if not add_nat_conntrack_entry_in_kernel(*entry):
+                    failures.append(entry)
+            restored += len(batch) - len(failures)
+            failed += len(failures)
+            logger.log_info("Restored NAT entries batch {}: {} entries, {} failed, {} restored in total".format(
+                batch_num, len(batch), len(failures), restored))
+    finally:
+        conntrack.close()
+    logger.log_notice("Restored {} NAT entries, {} failed".format(restored, failed))
 
 
 def main():
+    parser = argparse.ArgumentParser(description="Restore the NAT conntrack entries on warm reboot")
+    parser.add_argument('--batch-size', type=int, default=DEFAULT_BATCH_SIZE,
+                        help="number of entries added to the kernel with one netlink batch")
+    args = parser.parse_args()
+
     logger.log_info("restore_nat_entries service is started")
 
     # Use warmstart python binding to check warmstart information
@@ -91,7 +316,7 @@ def main():
     # Program the nat conntrack entries in the kernel by reading the
     # entries from nat_entries.dump
     try:
-        restore_update_kernel_nat_entries(WARM_BOOT_FILE_DIR + NAT_WARM_BOOT_FILE)
+        restore_update_kernel_nat_entries(WARM_BOOT_FILE_DIR + NAT_WARM_BOOT_FILE, max(1, args.batch_size))
     except Exception as e:
         logger.log_error(str(e))
         sys.exit(1)
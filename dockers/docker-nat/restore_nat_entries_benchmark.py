@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+
+"""
+    restore_nat_entries_benchmark
+
+    Measures the NAT entries restored per second by the batched ctnetlink path of
+    restore_nat_entries against the conntrack fork-per-entry path.
+    Every path runs in its own network namespace ('unshare -n'), so the conntrack
+    table of the switch is not touched. Needs root.
+
+    Usage: restore_nat_entries_benchmark.py [--entries N] [--batch-size N] [--fork-entries N]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import restore_nat_entries
+
+
+def write_dump(filename, count):
+    with open(filename, 'w') as fp:
+        for i in range(count):
+            host = '10.{}.{}.{}'.format(i >> 16 & 0xff, i >> 8 & 0xff, i & 0xff)
+            sport = 1024 + i % 60000
+            fp.write('tcp      6 431999 ESTABLISHED src={} dst=20.0.0.1 sport={} dport=80 '
+                     'src=20.0.0.1 dst=65.55.42.1 sport=80 dport={} [ASSURED] mark=0 use=1\n'.format(
+                         host, sport, 1024 + i % 60000))
+
+
+def run_netlink(filename, batch_size):
+    conntrack = restore_nat_entries.ConntrackNetlink()
+    entries = list(restore_nat_entries.read_nat_entries(filename))
+    start = time.time()
+    failures = []
+    for index in range(0, len(entries), batch_size):
+        failures.extend(conntrack.add_entries(entries[index:index + batch_size]))
+    elapsed = time.time() - start
+    conntrack.close()
+    return len(entries), len(failures), elapsed
+
+
+def run_fork(filename, count):
+    entries = list(restore_nat_entries.read_nat_entries(filename))[:count]
+    start = time.time()
+    failed = 0
+    for cmdargs in entries:
+        if not restore_nat_entries.add_nat_conntrack_entry_in_kernel(*cmdargs):
+            failed += 1
+    return len(entries), failed, time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the NAT entries restore")
+    parser.add_argument('--entries', type=int, default=50000)
+    parser.add_argument('--batch-size', type=int, default=restore_nat_entries.DEFAULT_BATCH_SIZE)
+    parser.add_argument('--fork-entries', type=int, default=2000,
+                        help="entries restored with the fork path, it is much slower")
+    parser.add_argument('--run', choices=['netlink', 'fork'], help=argparse.SUPPRESS)
+    parser.add_argument('--dump', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.run:
+        # child, already in its own network namespace
+        if args.run == 'netlink':
+            result = run_netlink(args.dump, args.batch_size)
+        else:
+            result = run_fork(args.dump, args.fork_entries)
+        print('{} {} {}'.format(*result))
+        return
+
+    with tempfile.NamedTemporaryFile(mode='w', suffix='.dump') as dump:
+        write_dump(dump.name, args.entries)
+        paths = ['netlink']
+        if shutil.which('conntrack'):
+            paths.append('fork')
+        else:
+            print('conntrack utility not found, skipping the fork path')
+        for path in paths:
+            output = subprocess.check_output(['unshare', '-n', sys.executable, os.path.abspath(__file__),
+                                              '--run', path, '--dump', dump.name,
+                                              '--batch-size', str(args.batch_size),
+                                              '--fork-entries', str(args.fork_entries)],
+                                             universal_newlines=True)
+            count, failed, elapsed = output.split()[-3:]
+            count, failed, elapsed = int(count), int(failed), float(elapsed)
+            print('{:8s} {:7d} entries {:6d} failed {:8.3f} s {:10.0f} entries/s'.format(
+                path, count, failed, elapsed, count / elapsed if elapsed else 0))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,138 @@
+import os
+import socket
+import struct
+import sys
+
+from unittest import mock
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(test_path))
+
+import restore_nat_entries
+
+TCP_ENTRY = ['6', '10.0.0.1', '20.0.0.1', '1001', '80', '20.0.0.1', '65.55.42.1', '80', '1001']
+UDP_ENTRY = ['17', '10.0.0.2', '20.0.0.1', '53', '53', '20.0.0.1', '65.55.42.1', '53', '53']
+NAT_DUMP = """tcp      6 431999 ESTABLISHED src=10.0.0.1 dst=20.0.0.1 sport=1001 dport=80 src=20.0.0.1 dst=65.55.42.1 sport=80 dport=1001 [ASSURED] mark=0 use=1
+udp      17 29 src=10.0.0.2 dst=20.0.0.1 sport=53 dport=53 src=20.0.0.1 dst=65.55.42.1 sport=53 dport=53 [ASSURED] mark=0 use=1
+icmp     1 29 src=10.0.0.3 dst=20.0.0.1 type=8 code=0 id=1 src=20.0.0.1 dst=65.55.42.1 type=0 code=0 id=1 mark=0 use=1
+"""
+
+
+def parse_attrs(data):
+    """Decode netlink attributes into {type: payload or nested dict}"""
+    attrs = {}
+    offset = 0
+    while offset < len(data):
+        length, attr_type = struct.unpack_from('=HH', data, offset)
+        payload = data[offset + 4:offset + length]
+        if attr_type & restore_nat_entries.NLA_F_NESTED:
+            attrs[attr_type & ~restore_nat_entries.NLA_F_NESTED] = parse_attrs(payload)
+        else:
+            attrs[attr_type] = payload
+        offset += (length + 3) & ~3
+    return attrs
+
+
+def build_message(seq, entry):
+    conntrack = restore_nat_entries.ConntrackNetlink.__new__(restore_nat_entries.ConntrackNetlink)
+    return conntrack.build_message(seq, *entry)
+
+
+def test_build_message_header():
+    msg = build_message(7, TCP_ENTRY)
+    length, msg_type, flags, seq, pid = struct.unpack_from('=IHHII', msg)
+    assert length == len(msg)
+    assert length % 4 == 0
+    assert msg_type == (restore_nat_entries.NFNL_SUBSYS_CTNETLINK << 8) | restore_nat_entries.IPCTNL_MSG_CT_NEW
+    assert flags == (restore_nat_entries.NLM_F_REQUEST | restore_nat_entries.NLM_F_ACK |
+                     restore_nat_entries.NLM_F_CREATE | restore_nat_entries.NLM_F_EXCL)
+    assert seq == 7
+    assert pid == 0
+    assert struct.unpack_from('=BBH', msg, 16) == (socket.AF_INET, restore_nat_entries.NFNETLINK_V0, 0)
+
+
+def test_build_message_attributes():
+    attrs = parse_attrs(build_message(1, TCP_ENTRY)[20:])
+
+    # conntrack refuses to insert entries without IPS_CONFIRMED
+    status = struct.unpack('!I', attrs[restore_nat_entries.CTA_STATUS])[0]
+    assert status == restore_nat_entries.IPS_ASSURED | restore_nat_entries.IPS_CONFIRMED
+    assert struct.unpack('!I', attrs[restore_nat_entries.CTA_TIMEOUT])[0] == restore_nat_entries.NAT_ENTRY_TIMEOUT
+
+    orig = attrs[restore_nat_entries.CTA_TUPLE_ORIG]
+    assert orig[restore_nat_entries.CTA_TUPLE_IP] == {
+        restore_nat_entries.CTA_IP_V4_SRC: socket.inet_aton('10.0.0.1'),
+        restore_nat_entries.CTA_IP_V4_DST: socket.inet_aton('20.0.0.1')}
+    assert orig[restore_nat_entries.CTA_TUPLE_PROTO] == {
+        restore_nat_entries.CTA_PROTO_NUM: b'\x06',
+        restore_nat_entries.CTA_PROTO_SRC_PORT: struct.pack('!H', 1001),
+        restore_nat_entries.CTA_PROTO_DST_PORT: struct.pack('!H', 80)}
+    reply = attrs[restore_nat_entries.CTA_TUPLE_REPLY]
+    assert reply[restore_nat_entries.CTA_TUPLE_IP] == {
+        restore_nat_entries.CTA_IP_V4_SRC: socket.inet_aton('20.0.0.1'),
+        restore_nat_entries.CTA_IP_V4_DST: socket.inet_aton('10.0.0.1')}
+
+    # -n natdstip:natdstport -g natsrcip:natsrcport
+    assert attrs[restore_nat_entries.CTA_NAT_SRC] == {
+        restore_nat_entries.CTA_NAT_V4_MINIP: socket.inet_aton('65.55.42.1'),
+        restore_nat_entries.CTA_NAT_V4_MAXIP: socket.inet_aton('65.55.42.1'),
+        restore_nat_entries.CTA_NAT_PROTO: {
+            restore_nat_entries.CTA_PROTONAT_PORT_MIN: struct.pack('!H', 1001),
+            restore_nat_entries.CTA_PROTONAT_PORT_MAX: struct.pack('!H', 1001)}}
+    assert attrs[restore_nat_entries.CTA_NAT_DST] == {
+        restore_nat_entries.CTA_NAT_V4_MINIP: socket.inet_aton('20.0.0.1'),
+        restore_nat_entries.CTA_NAT_V4_MAXIP: socket.inet_aton('20.0.0.1'),
+        restore_nat_entries.CTA_NAT_PROTO: {
+            restore_nat_entries.CTA_PROTONAT_PORT_MIN: struct.pack('!H', 80),
+            restore_nat_entries.CTA_PROTONAT_PORT_MAX: struct.pack('!H', 80)}}
+
+    protoinfo = attrs[restore_nat_entries.CTA_PROTOINFO][restore_nat_entries.CTA_PROTOINFO_TCP]
+    assert protoinfo[restore_nat_entries.CTA_PROTOINFO_TCP_STATE] == bytes([restore_nat_entries.TCP_CONNTRACK_ESTABLISHED])
+
+
+def test_build_message_udp():
+    attrs = parse_attrs(build_message(1, UDP_ENTRY)[20:])
+    assert restore_nat_entries.CTA_PROTOINFO not in attrs
+    status = struct.unpack('!I', attrs[restore_nat_entries.CTA_STATUS])[0]
+    assert status == restore_nat_entries.IPS_ASSURED | restore_nat_entries.IPS_CONFIRMED
+
+
+def test_read_nat_entries(tmp_path):
+    dump = tmp_path / 'nat_entries.dump'
+    dump.write_text(NAT_DUMP)
+    assert list(restore_nat_entries.read_nat_entries(str(dump))) == [TCP_ENTRY, UDP_ENTRY]
+
+
+@mock.patch('restore_nat_entries.subprocess.call', return_value=0)
+@mock.patch('restore_nat_entries.ConntrackNetlink')
+def test_restore_retries_netlink_failures(mock_conntrack, mock_call, tmp_path):
+    dump = tmp_path / 'nat_entries.dump'
+    dump.write_text(NAT_DUMP)
+    mock_conntrack.return_value.add_entries.return_value = [(UDP_ENTRY, 16)]
+
+    restore_nat_entries.restore_update_kernel_nat_entries(str(dump))
+
+    mock_conntrack.return_value.add_entries.assert_called_once_with([TCP_ENTRY, UDP_ENTRY])
+    mock_conntrack.return_value.close.assert_called_once()
+    # only the entry the kernel didn't accept is added with the conntrack utility
+    mock_call.assert_called_once()
+    ctcmd = mock_call.call_args[0][0]
+    assert ctcmd[:2] == ['conntrack', '-I']
+    assert ctcmd[ctcmd.index('--src') + 1] == '10.0.0.2'
+
+
+@mock.patch('restore_nat_entries.subprocess.call', return_value=0)
+@mock.patch('restore_nat_entries.ConntrackNetlink', side_effect=OSError(93, 'Protocol not supported'))
+def test_restore_without_netlink(mock_conntrack, mock_call, tmp_path):
+    dump = tmp_path / 'nat_entries.dump'
+    dump.write_text(NAT_DUMP)
+
+    restore_nat_entries.restore_update_kernel_nat_entries(str(dump))
+
+    assert mock_call.call_count == 2
+
+
+@mock.patch('restore_nat_entries.subprocess.call', side_effect=[1, FileNotFoundError(2, 'conntrack')])
+def test_add_entry_with_conntrack_failure(mock_call):
+    assert not restore_nat_entries.add_nat_conntrack_entry_in_kernel(*TCP_ENTRY)
+    assert not restore_nat_entries.add_nat_conntrack_entry_in_kernel(*TCP_ENTRY)
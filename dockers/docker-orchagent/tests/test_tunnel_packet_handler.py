@@ -0,0 +1,156 @@
+import ipaddress
+import os
+import socket
+import struct
+import sys
+
+from unittest import mock
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(test_path))
+
+import tunnel_packet_handler
+
+SELF_IP = '10.1.0.32'
+PEER_IP = '10.1.0.33'
+SELF_MAC = b'\x00\x11\x22\x33\x44\x55'
+PEER_MAC = b'\x00\x11\x22\x33\x44\x66'
+
+
+def run_bpf(program, frame):
+    """Run a classic BPF program on frame, return the accepted length, 0 if dropped"""
+    instructions = [struct.unpack('HBBI', program[i:i + 8]) for i in range(0, len(program), 8)]
+    pc = 0
+    acc = 0
+    while True:
+        code, jt, jf, k = instructions[pc]
+        if code == 0x06:    # ret #k
+            return k
+        if code in (0x20, 0x28, 0x30):    # ld, ldh, ldb [k]
+            size = {0x20: 4, 0x28: 2, 0x30: 1}[code]
+            if k + size > len(frame):
+                return 0
+            acc = int.from_bytes(frame[k:k + size], 'big')
+            pc += 1
+        elif code == 0x15:    # jeq #k, jt, jf
+            pc += 1 + (jt if acc == k else jf)
+        else:
+            raise AssertionError('Unexpected BPF instruction {:#x}'.format(code))
+
+
+def ipv4_header(src, dst, proto, payload_len, options=b''):
+    ihl = 5 + len(options) // 4
+    return struct.pack('!BBHHHBBH4s4s', 0x40 | ihl, 0, ihl * 4 + payload_len, 0, 0, 64, proto, 0,
+                       ipaddress.IPv4Address(src).packed, ipaddress.IPv4Address(dst).packed) + options
+
+
+def ipv6_header(src, dst, payload_len):
+    return struct.pack('!IHBB16s16s', 6 << 28, payload_len, socket.IPPROTO_ICMPV6, 64,
+                       ipaddress.IPv6Address(src).packed, ipaddress.IPv6Address(dst).packed)
+
+
+def ipinip_frame(inner_src, inner_dst, src=PEER_IP, dst=SELF_IP, options=b'', ethertype=0x0800):
+    """Build an Ethernet frame of an IPv4 packet encapsulating an IPv4 or IPv6 packet"""
+    payload = b'\x80\x00' + bytes(30)
+    if ipaddress.ip_address(inner_dst).version == 4:
+        inner = ipv4_header(inner_src, inner_dst, socket.IPPROTO_ICMP, len(payload)) + payload
+        proto = tunnel_packet_handler.IPPROTO_IPIP
+    else:
+        inner = ipv6_header(inner_src, inner_dst, len(payload)) + payload
+        proto = tunnel_packet_handler.IPPROTO_IPV6
+    outer = ipv4_header(src, dst, proto, len(inner), options)
+    return SELF_MAC + PEER_MAC + struct.pack('!H', ethertype) + outer + inner
+
+
+def test_bpf_filter_accept():
+    program = tunnel_packet_handler.ipinip_bpf_filter(SELF_IP, PEER_IP)
+    assert len(program) == 11 * 8
+
+    # accepted packets are truncated to the snaplen
+    frame = ipinip_frame('192.168.0.2', '192.168.0.100')
+    assert run_bpf(program, frame) == tunnel_packet_handler.CAPTURE_SNAPLEN
+    frame = ipinip_frame('fc02:1000::2', 'fc02:1000::100')
+    assert run_bpf(program, frame) == tunnel_packet_handler.CAPTURE_SNAPLEN
+
+
+def test_bpf_filter_drop():
+    program = tunnel_packet_handler.ipinip_bpf_filter(SELF_IP, PEER_IP)
+
+    # not IPv4
+    assert run_bpf(program, ipinip_frame('192.168.0.2', '192.168.0.100', ethertype=0x86dd)) == 0
+    # not IPinIP
+    frame = bytearray(ipinip_frame('192.168.0.2', '192.168.0.100'))
+    frame[tunnel_packet_handler.ETH_HLEN + 9] = socket.IPPROTO_UDP
+    assert run_bpf(program, bytes(frame)) == 0
+    # not from the peer
+    assert run_bpf(program, ipinip_frame('192.168.0.2', '192.168.0.100', src='10.1.0.34')) == 0
+    # not to this switch
+    assert run_bpf(program, ipinip_frame('192.168.0.2', '192.168.0.100', dst='10.1.0.34')) == 0
+    assert run_bpf(program, ipinip_frame('192.168.0.2', '192.168.0.100', src=SELF_IP, dst=PEER_IP)) == 0
+
+
+def test_get_inner_dst():
+    assert tunnel_packet_handler.get_inner_dst(ipinip_frame('192.168.0.2', '192.168.0.100')) == '192.168.0.100'
+    assert tunnel_packet_handler.get_inner_dst(ipinip_frame('fc02:1000::2', 'fc02:1000::100')) == 'fc02:1000::100'
+
+
+def test_get_inner_dst_ip_options():
+    # the outer header has 40 bytes of options, the largest possible
+    options = b'\x01' * 40
+    frame = ipinip_frame('192.168.0.2', '192.168.0.100', options=options)
+    assert tunnel_packet_handler.get_inner_dst(frame) == '192.168.0.100'
+    frame = ipinip_frame('fc02:1000::2', 'fc02:1000::100', options=options)
+    assert len(frame) >= tunnel_packet_handler.CAPTURE_SNAPLEN
+    assert tunnel_packet_handler.get_inner_dst(frame[:tunnel_packet_handler.CAPTURE_SNAPLEN]) == 'fc02:1000::100'
+
+
+def test_get_inner_dst_truncated():
+    frame = ipinip_frame('fc02:1000::2', 'fc02:1000::100')
+    assert tunnel_packet_handler.get_inner_dst(frame[:tunnel_packet_handler.ETH_HLEN + 10]) is None
+    assert tunnel_packet_handler.get_inner_dst(frame[:tunnel_packet_handler.ETH_HLEN + 20 + 30]) is None
+
+
+def test_prober_dedupe():
+    prober = tunnel_packet_handler.InnerDstProber(ttl=1.0)
+    sock = mock.MagicMock()
+    with mock.patch.object(prober, 'socket', return_value=sock):
+        assert prober.probe('192.168.0.100', now=10.0)
+        assert not prober.probe('192.168.0.100', now=10.5)
+        assert prober.probe('192.168.0.101', now=10.5)
+        assert prober.probe('fc02:1000::100', now=10.5)
+        assert (prober.sent, prober.suppressed) == (3, 1)
+
+        # probed again once the TTL expired
+        assert prober.probe('192.168.0.100', now=11.0)
+        assert prober.sent == 4
+    assert [c.args[1][0] for c in sock.sendto.call_args_list] == \
+        ['192.168.0.100', '192.168.0.101', 'fc02:1000::100', '192.168.0.100']
+
+    # ICMP echo request with a valid checksum
+    packet = sock.sendto.call_args_list[0].args[0]
+    assert packet[0] == tunnel_packet_handler.ICMP_ECHO_REQUEST
+    assert tunnel_packet_handler.InnerDstProber.checksum(packet) == 0
+    assert sock.sendto.call_args_list[2].args[0][0] == tunnel_packet_handler.ICMPV6_ECHO_REQUEST
+
+
+def test_prober_expire():
+    prober = tunnel_packet_handler.InnerDstProber(ttl=1.0)
+    with mock.patch.object(prober, 'socket', return_value=mock.MagicMock()):
+        for i in range(4096):
+            prober.probe(str(ipaddress.IPv4Address('192.168.0.0') + i), now=10.0)
+        assert len(prober.last_probe) == 4096
+
+        # the expired destinations are dropped when the table is full
+        prober.probe('10.0.0.1', now=11.0)
+        assert prober.last_probe == {'10.0.0.1': 11.0}
+
+
+def test_prober_send_error():
+    prober = tunnel_packet_handler.InnerDstProber(ttl=1.0)
+    sock = mock.MagicMock()
+    sock.sendto.side_effect = OSError('Network is unreachable')
+    with mock.patch.object(prober, 'socket', return_value=sock):
+        assert not prober.probe('192.168.0.100', now=10.0)
+        # not probed again within the TTL
+        assert not prober.probe('192.168.0.100', now=10.5)
+    assert (prober.sent, prober.suppressed) == (0, 1)
@@ -7,8 +7,13 @@ information for the inner packet's destination IP, the entire encapsulated
 packet is trapped to the CPU. In this case, we should ping the inner
 destination IP to trigger the process of obtaining neighbor information
 """
-import subprocess
+import ctypes
+import ipaddress
+import select
+import socket
+import struct
 import sys
+import threading
 import time
 from datetime import datetime
 from ipaddress import ip_interface
@@ -20,9 +25,6 @@ from sonic_py_common import logger as log
 
 from pyroute2 import IPRoute
 from pyroute2.netlink.exceptions import NetlinkError
-from scapy.layers.inet import IP
-from scapy.layers.inet6 import IPv6
-from scapy.sendrecv import AsyncSniffer
 
 
 logger = log.Logger()
@@ -43,6 +45,20 @@ IPINIP_TUNNEL = 'ipinip'
 RTM_NEWLINK = 'RTM_NEWLINK'
 SELECT_TIMEOUT = 1000
 
+ETH_P_IP = 0x0800
+ETH_HLEN = 14
+IPPROTO_IPIP = 4
+IPPROTO_IPV6 = 41
+SO_ATTACH_FILTER = 26
+PACKET_OUTGOING = 4
+ICMP_ECHO_REQUEST = 8
+ICMPV6_ECHO_REQUEST = 128
+# Ethernet + outer IPv4 header with options + inner IPv6 header
+CAPTURE_SNAPLEN = ETH_HLEN + 60 + 40
+CAPTURE_POLL_INTERVAL = 0.5
+# A destination is probed at most once per PROBE_TTL seconds
+PROBE_TTL = 1.0
+
 nl_msgs = Queue()
 portchannel_intfs = None
 
@@ -58,6 +74,250 @@ def add_msg_to_queue(target, msg):
     if msg.get_attr('IFLA_IFNAME') in portchannel_intfs:
         nl_msgs.put(msg)
 
+def ipinip_bpf_filter(self_ip, peer_ip):
+    """
+    Builds a classic BPF program accepting the IPinIP (IPv4 or IPv6 inner)
+    packets sent from peer_ip to self_ip. Accepted packets are truncated to
+    CAPTURE_SNAPLEN bytes, enough for the inner destination IP
+
+    Returns:
+        (bytes) the sock_filter instructions
+    """
+    self_addr = int(ipaddress.IPv4Address(self_ip))
+    peer_addr = int(ipaddress.IPv4Address(peer_ip))
+    instructions = [
+        (0x28, 0, 0, 12),              # ldh [12]           ethertype
+        (0x15, 0, 8, ETH_P_IP),        # jeq #0x800         else drop
+        (0x30, 0, 0, 23),              # ldb [23]           IP protocol
+        (0x15, 1, 0, IPPROTO_IPIP),    # jeq #4             accept inner IPv4
+        (0x15, 0, 5, IPPROTO_IPV6),    # jeq #41            else drop
+        (0x20, 0, 0, 26),              # ld [26]            source IP
+        (0x15, 0, 3, peer_addr),       # jeq #peer_ip       else drop
+        (0x20, 0, 0, 30),              # ld [30]            destination IP
+        (0x15, 0, 1, self_addr),       # jeq #self_ip       else drop
+        (0x06, 0, 0, CAPTURE_SNAPLEN), # ret #snaplen
+        (0x06, 0, 0, 0),               # ret #0             drop
+    ]
+    return b''.join(struct.pack('HBBI', *ins) for ins in instructions)
+
+
+def get_inner_dst(frame):
+    """
+    Gets the inner destination IP of an IPinIP frame accepted by the BPF filter
+
+    Returns:
+        (str) the inner destination IP, or None if the frame is truncated
+    """
+    if len(frame) < ETH_HLEN + 20:
+        return None
+    inner = ETH_HLEN + (frame[ETH_HLEN] & 0x0f) * 4
+    if frame[ETH_HLEN + 9] == IPPROTO_IPIP:
+        dst = frame[inner + 16:inner + 20]
+    else:
+        dst = frame[inner + 24:inner + 40]
+    if len(dst) not in (4, 16):
+        return None
+    return str(ipaddress.ip_address(bytes(dst)))
+
+
+class InnerDstProber(object):
+    """
+    Sends an ICMP echo request to the inner destinations so that the kernel
+    resolves their neighbor (ARP or NS). A destination is probed at most
+    once per TTL seconds.
+    """
+
+    def __init__(self, ttl=PROBE_TTL):
+        self.ttl = ttl
+        self.last_probe = {}
+        self.sockets = {}
+        self.sequence = 0
+        self.sent = 0
+        self.suppressed = 0
+
+    def socket(self, version):
+        if version not in self.sockets:
+            if version == 4:
+                sock = socket.socket(socket.AF_INET, socket.SOCK_RAW, socket.IPPROTO_ICMP)
+            else:
+                sock = socket.socket(socket.AF_INET6, socket.SOCK_RAW, socket.IPPROTO_ICMPV6)
+            sock.setblocking(False)
+            self.sockets[version] = sock
+        return self.sockets[version]
+
+    @staticmethod
+    def checksum(data):
+        total = sum(struct.unpack('!{}H'.format(len(data) // 2), data))
+        total = (total >> 16) + (total & 0xffff)
+        total += total >> 16
+        return ~total & 0xffff
+
+    def expire(self, now):
+        self.last_probe = {dst: ts for dst, ts in self.last_probe.items()
+                           if now - ts < self.ttl}
+
+    def probe(self, dst_ip, now=None):
+        """
+        Probes dst_ip unless it was probed less than TTL seconds ago
+
+        Returns:
+            (bool) True if a probe was sent
+        """
+        now = time.monotonic() if now is None else now
+        last = self.last_probe.get(dst_ip)
+        if last is not None and now - last < self.ttl:
+            self.suppressed += 1
+            return False
+        self.last_probe[dst_ip] = now
+        if len(self.last_probe) > 4096:
+            self.expire(now)
+
+        self.sequence = (self.sequence + 1) & 0xffff
+        version = ipaddress.ip_address(dst_ip).version
+        try:
+            if version == 4:
+                header = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, 0, 0, self.sequence)
+                packet = struct.pack('!BBHHH', ICMP_ECHO_REQUEST, 0, self.checksum(header),
+                                     0, self.sequence)
+                self.socket(4).sendto(packet, (dst_ip, 0))
+            else:
+                # the kernel computes the ICMPv6 checksum
+                packet = struct.pack('!BBHHH', ICMPV6_ECHO_REQUEST, 0, 0, 0, self.sequence)
+                self.socket(6).sendto(packet, (dst_ip, 0, 0, 0))
+        except OSError as e:
+            logger.log_info('Failed to probe {}: {}'.format(dst_ip, e))
+            return False
+        logger.log_debug('Probed inner destination {}'.format(dst_ip))
+        self.sent += 1
+        return True
+
+    def close(self):
+        for sock in self.sockets.values():
+            sock.close()
+        self.sockets = {}
+
+
+class TunnelPacketCapture(object):
+    """
+    Captures the IPinIP packets trapped to the CPU on a set of interfaces.
+
+    Each interface has its own AF_PACKET socket with the BPF filter attached,
+    so interfaces are added and removed while the capture keeps running.
+    Only the inner destination IP is extracted and passed to the callback.
+    """
+
+    def __init__(self, bpf_filter, callback):
+        self.bpf_filter = bpf_filter
+        self.callback = callback
+        self.sockets = {}
+        self.lock = threading.Lock()
+        self.thread = None
+        self.running = False
+        self.received = 0
+
+    @property
+    def interfaces(self):
+        with self.lock:
+            return set(self.sockets)
+
+    def open_socket(self, intf):
+        sock = socket.socket(socket.AF_PACKET, socket.SOCK_RAW, 0)
+        try:
+            # attach the filter before binding so no unfiltered packet is queued
+            program = ctypes.create_string_buffer(self.bpf_filter)
+            fprog = struct.pack('HL', len(self.bpf_filter) // 8, ctypes.addressof(program))
+            sock.setsockopt(socket.SOL_SOCKET, SO_ATTACH_FILTER, fprog)
+            sock.bind((intf, ETH_P_IP))
+        except OSError:
+            sock.close()
+            raise
+        sock.setblocking(False)
+        return sock
+
+    def add_interface(self, intf):
+        """
+        Starts capturing on intf
+
+        Returns:
+            (bool) True if the interface is captured
+        """
+        with self.lock:
+            if intf in self.sockets:
+                return True
+        try:
+            sock = self.open_socket(intf)
+        except OSError as e:
+            logger.log_warning('Could not capture on {}: {}'.format(intf, e))
+            return False
+        with self.lock:
+            self.sockets[intf] = sock
+        logger.log_info('Capturing tunnel packets on {}'.format(intf))
+        return True
+
+    def remove_interface(self, intf):
+        with self.lock:
+            sock = self.sockets.pop(intf, None)
+        if sock is not None:
+            sock.close()
+            logger.log_info('Stopped capturing tunnel packets on {}'.format(intf))
+
+    def read(self, sock):
+        while True:
+            try:
+                frame, addr = sock.recvfrom(CAPTURE_SNAPLEN)
+            except (BlockingIOError, InterruptedError):
+                return
+            except OSError as e:
+                # the interface went away, it is removed on the LAG_TABLE update
+                logger.log_debug('Capture read error: {}'.format(e))
+                return
+            if addr[2] == PACKET_OUTGOING:
+                continue
+            self.received += 1
+            dst_ip = get_inner_dst(frame)
+            if dst_ip is not None:
+                self.callback(dst_ip)
+
+    def poll(self, timeout=CAPTURE_POLL_INTERVAL):
+        """
+        Waits up to timeout seconds and handles the captured packets
+        """
+        with self.lock:
+            sockets = list(self.sockets.values())
+        if not sockets:
+            time.sleep(timeout)
+            return
+        try:
+            readable, _, _ = select.select(sockets, [], [], timeout)
+        except (OSError, ValueError):
+            # a socket was closed by remove_interface
+            return
+        for sock in readable:
+            self.read(sock)
+
+    def run(self):
+        while self.running:
+            try:
+                self.poll()
+            except Exception as e:
+                logger.log_error('Tunnel packet capture error: {}'.format(e))
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        with self.lock:
+            sockets, self.sockets = self.sockets, {}
+        for sock in sockets.values():
+            sock.close()
+
+
 class TunnelPacketHandler(object):
     """
     This class handles unroutable tunnel packets that are trapped
@@ -72,10 +332,9 @@ class TunnelPacketHandler(object):
         self._portchannel_intfs = None
         self.up_portchannels = None
         self.netlink_api = IPRoute()
-        self.sniffer = None
+        self.capture = None
+        self.prober = InnerDstProber()
         self.self_ip = ''
-        self.packet_filter = ''
-        self.sniff_intfs = set()
 
         global portchannel_intfs
         portchannel_intfs = [name for name, _ in self.portchannel_intfs]
@@ -236,91 +495,48 @@ class TunnelPacketHandler(object):
 
         return None, None
 
-    def get_inner_pkt_type(self, packet):
+    def update_capture_intfs(self, lag, fvs):
         """
-        Get the type of an inner encapsulated packet
+        Adds or removes a portchannel from the captured interfaces
 
-        Returns:
-            (str)  'v4' if the inner packet is IPv4
-            (str)  'v6' if the inner packet is IPv6
-            (bool) False if `packet` is not an IPinIP packet
-        """
-        if packet.haslayer(IP):
-            # Determine inner packet type based on IP protocol number
-            # The outer packet type should always be IPv4
-            if packet[IP].proto == 4:
-                return IP
-            elif packet[IP].proto == 41:
-                return IPv6
-        return False
-
-    def sniffer_restart_required(self, lag, fvs):
-        """
-        Determines if the packet sniffer needs to be restarted
-
-        The sniffer needs to be restarted when a portchannel interface transitions
-        from down to up. When a portchannel interface goes down, the sniffer is
-        able to continue sniffing on other portchannels. 
+        A portchannel is captured while it is operationally up. When the
+        kernel interface is not up yet, it is retried for up to 3 seconds
         """
+        if lag not in portchannel_intfs:
+            return
         oper_status = dict(fvs).get(OPER_STATUS_KEY)
-        if lag not in self.sniff_intfs and oper_status == 'up':
-            logger.log_info('{} came back up, sniffer restart required'
-                            .format(lag))
-            # Don't need to modify self.sniff_intfs here since it is repopulated
-            # by self.get_up_portchannels()
-            return True
-        elif lag in self.sniff_intfs and oper_status == 'down':
-            # A portchannel interface went down, remove it from the list of
-            # sniffed interfaces so we can detect when it comes back up
-            self.sniff_intfs.remove(lag)
-            return False
-        else:
-            return False
-
-    def start_sniffer(self):
+        if oper_status == 'up' and lag not in self.capture.interfaces:
+            start = datetime.now()
+            # wait up to 3 seconds for the kernel interface to be synced with APPL_DB status
+            while (datetime.now() - start).seconds < 3:
+                if lag in self.get_up_portchannels():
+                    break
+                time.sleep(0.1)
+            logger.log_notice('{} came back up, capturing tunnel packets on it'
+                              .format(lag))
+            self.capture.add_interface(lag)
+        elif oper_status == 'down':
+            self.capture.remove_interface(lag)
+
+    def start_capture(self):
         """
-        Starts an AsyncSniffer and waits for it to inititalize fully
+        Starts capturing the tunnel packets on the up portchannels
         """
         start = datetime.now()
-        
-        self.sniff_intfs = self.get_up_portchannels()
 
-        while not self.sniff_intfs:
+        up_portchannels = self.get_up_portchannels()
+
+        while not up_portchannels:
             logger.log_info('No portchannels are up yet...')
             if (datetime.now() - start).seconds > 180:
                 logger.log_error('All portchannels failed to come up within 3 minutes, exiting...')
                 sys.exit(1)
-            self.sniff_intfs = self.get_up_portchannels()
+            up_portchannels = self.get_up_portchannels()
             time.sleep(10)
 
-        self.sniffer = AsyncSniffer(
-            iface=list(self.sniff_intfs),
-            filter=self.packet_filter,
-            prn=self.ping_inner_dst,
-            store=0
-        )
-        self.sniffer.start()
-
-        while not hasattr(self.sniffer, 'stop_cb'):
-            time.sleep(0.1)
-
-    def ping_inner_dst(self, packet):
-        """
-        Pings the inner destination IP for an encapsulated packet
-
-        Args:
-            packet: The encapsulated packet received
-        """
-        inner_packet_type = self.get_inner_pkt_type(packet)
-        if inner_packet_type and packet[IP].dst == self.self_ip:
-            cmds = ['timeout', '0.2', 'ping', '-c1',
-                    '-W1', '-i0', '-n', '-q']
-            if inner_packet_type == IPv6:
-                cmds.append('-6')
-            dst_ip = packet[IP].payload[inner_packet_type].dst
-            cmds.append(dst_ip)
-            logger.log_info("Running command '{}'".format(' '.join(cmds)))
-            subprocess.run(cmds, stdout=subprocess.DEVNULL)
+        for intf in up_portchannels:
+            self.capture.add_interface(intf)
+        self.capture.start()
 
     def listen_for_tunnel_pkts(self):
         """
@@ -335,18 +551,18 @@ class TunnelPacketHandler(object):
                               'config DB, exiting...')
             return None
 
-        self.packet_filter = 'host {} and host {}'.format(self.self_ip, peer_ip)
-        logger.log_notice('Starting tunnel packet handler for {}'
-                          .format(self.packet_filter))
-
+        logger.log_notice('Starting tunnel packet handler for packets from {} to {}'
+                          .format(peer_ip, self.self_ip))
+        self.capture = TunnelPacketCapture(ipinip_bpf_filter(self.self_ip, peer_ip),
+                                           self.prober.probe)
 
         app_db = DBConnector(APPL_DB, 0)
         lag_table = SubscriberStateTable(app_db, LAG_TABLE)
         sel = Select()
         sel.addSelectable(lag_table)
 
-        self.start_sniffer()
-        logger.log_info("Listening on interfaces {}".format(self.sniff_intfs))
+        self.start_capture()
+        logger.log_info("Listening on interfaces {}".format(self.capture.interfaces))
         while True:
             rc, _ = sel.select(SELECT_TIMEOUT)
 
@@ -356,18 +572,7 @@ class TunnelPacketHandler(object):
                 raise Exception("Select() error")
             else:
                 lag, op, fvs = lag_table.pop()
-                if self.sniffer_restart_required(lag, fvs):
-                    self.sniffer.stop()
-                    start = datetime.now()
-                    # wait up to 3 seconds for the kernel interface to be synced with APPL_DB status
-                    while (datetime.now() - start).seconds < 3:
-                        self.sniff_intfs = self.get_up_portchannels()
-                        if lag in self.sniff_intfs:
-                            break
-                        time.sleep(0.1)
-                    logger.log_notice('Restarting tunnel packet handler on '
-                                    'interfaces {}'.format(self.sniff_intfs))
-                    self.start_sniffer()
+                self.update_capture_intfs(lag, fvs)
 
     def run(self):
         """
@@ -0,0 +1,201 @@
+import errno
+import os
+import socket
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from unittest import mock
+
+import pytest
+
+scripts_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+loader = SourceFileLoader('arp_update', os.path.join(scripts_path, 'arp_update'))
+arp_update = module_from_spec(spec_from_loader(loader.name, loader))
+loader.exec_module(arp_update)
+
+LINKS = {1: ('Vlan1000', '00:11:22:33:44:55'), 2: ('Ethernet0', '00:11:22:33:44:66')}
+
+
+class NetlinkMessage(dict):
+    def __init__(self, attrs, **fields):
+        super(NetlinkMessage, self).__init__(**fields)
+        self.attrs = attrs
+
+    def get_attr(self, name):
+        return self.attrs.get(name)
+
+
+def neigh_msg(ip, ifindex, mac, state, event='RTM_NEWNEIGH'):
+    return NetlinkMessage({'NDA_DST': ip, 'NDA_LLADDR': mac}, event=event, ifindex=ifindex, state=state)
+
+
+class FakeIPRoute(object):
+    """ Stands for pyroute2.IPRoute: a neighbor table and queued neighbor events """
+
+    def __init__(self):
+        self.table = []
+        self.events = []
+        self.sockopts = {}
+        self.groups = None
+        self.rcvbuf_force = True
+
+    def get_links(self):
+        return [NetlinkMessage({'IFLA_IFNAME': name, 'IFLA_OPERSTATE': 'UP', 'IFLA_ADDRESS': mac}, index=index)
+                for index, (name, mac) in LINKS.items()]
+
+    def get_neighbours(self, family=socket.AF_UNSPEC):
+        return list(self.table)
+
+    def setsockopt(self, level, option, value):
+        if option == arp_update.SO_RCVBUFFORCE and not self.rcvbuf_force:
+            raise PermissionError(errno.EPERM, 'Operation not permitted')
+        self.sockopts[option] = value
+
+    def bind(self, groups=0):
+        self.groups = groups
+
+    def fileno(self):
+        return -1
+
+    def get(self):
+        event = self.events.pop(0)
+        if isinstance(event, Exception):
+            raise event
+        return event
+
+
+@pytest.fixture
+def ipr():
+    iprs = []
+
+    def create():
+        iprs.append(FakeIPRoute())
+        return iprs[-1]
+
+    with mock.patch.object(arp_update, 'IPRoute', side_effect=create):
+        yield iprs
+
+
+@pytest.fixture
+def kernel(ipr):
+    kernel = arp_update.Kernel(dry_run=True)
+    kernel.subscribe()
+    # events are ready as long as some are queued
+    with mock.patch.object(arp_update.select, 'select',
+                           side_effect=lambda r, w, x, timeout: (r if kernel.events.events else [], [], [])):
+        yield kernel
+
+
+@pytest.fixture
+def updater(kernel):
+    updater = arp_update.ArpUpdate(dry_run=True)
+    updater.kernel = kernel
+    updater.prober = arp_update.Prober(kernel, dry_run=True)
+    updater.dbs = mock.Mock()
+    updater.dbs.fdb_macs.return_value = {'00:AA:BB:CC:DD:01'}
+    return updater
+
+
+def test_subscribe(ipr):
+    kernel = arp_update.Kernel()
+    kernel.subscribe()
+    assert kernel.events.groups == arp_update.RTMGRP_NEIGH
+    assert kernel.events.sockopts == {arp_update.SO_RCVBUFFORCE: arp_update.EVENT_SOCKET_RCVBUF}
+
+    # without CAP_NET_ADMIN, up to net.core.rmem_max
+    events = FakeIPRoute()
+    events.rcvbuf_force = False
+    with mock.patch.object(arp_update, 'IPRoute', return_value=events):
+        kernel.subscribe()
+    assert events.sockopts == {socket.SO_RCVBUF: arp_update.EVENT_SOCKET_RCVBUF}
+
+
+def test_wait_events(kernel):
+    kernel.events.events = [
+        [neigh_msg('192.168.0.2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE),
+         neigh_msg('192.168.0.3', 1, '00:aa:bb:cc:dd:03', arp_update.NUD_STALE, event='RTM_DELNEIGH')],
+        [neigh_msg('fc00::2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_REACHABLE)],
+    ]
+    neighbors = kernel.wait_events(10)
+    assert [(n.ip, n.ifname, n.state) for n in neighbors] == [
+        ('192.168.0.2', 'Vlan1000', arp_update.NUD_STALE),
+        ('fc00::2', 'Vlan1000', arp_update.NUD_REACHABLE),
+    ]
+    assert kernel.wait_events(0.01) == []
+
+
+def test_wait_events_resync(kernel):
+    kernel.ipr.table = [
+        neigh_msg('192.168.0.2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE),
+        neigh_msg('10.0.0.1', 2, '00:aa:bb:cc:dd:03', arp_update.NUD_REACHABLE),
+        neigh_msg('10.0.0.3', 2, None, arp_update.NUD_NOARP),
+    ]
+    kernel.events.events = [
+        [neigh_msg('192.168.0.5', 1, '00:aa:bb:cc:dd:05', arp_update.NUD_STALE)],
+        OSError(errno.ENOBUFS, 'No buffer space available'),
+    ]
+    # events were lost, all the neighbors of the table are returned
+    neighbors = kernel.wait_events(10)
+    assert [n.ip for n in neighbors] == ['192.168.0.2', '10.0.0.1']
+
+    kernel.events.events = [arp_update.NetlinkError(errno.ENOBUFS)]
+    assert [n.ip for n in kernel.wait_events(10)] == ['192.168.0.2', '10.0.0.1']
+
+    kernel.events.events = [OSError(errno.EBADF, 'Bad file descriptor')]
+    with pytest.raises(OSError):
+        kernel.wait_events(10)
+
+
+def test_handle_events(updater):
+    updater.kernel.events.events = [[
+        # MAC aged out of the FDB
+        neigh_msg('192.168.0.2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE),
+        # MAC in the FDB
+        neigh_msg('192.168.0.1', 1, '00:aa:bb:cc:dd:01', arp_update.NUD_STALE),
+        neigh_msg('192.168.0.3', 1, '00:aa:bb:cc:dd:03', arp_update.NUD_REACHABLE),
+        neigh_msg('fe80::2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE),
+    ]]
+    with mock.patch.object(updater.prober, 'flush', wraps=updater.prober.flush) as flush, \
+            mock.patch.object(updater.prober, 'add', wraps=updater.prober.add) as add:
+        updater.wait(0.05)
+        add.assert_called_once_with('ping', '192.168.0.2')
+        assert flush.call_count == 1
+
+        # not probed again within the hold-down
+        updater.kernel.events.events = [[neigh_msg('192.168.0.2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE)]]
+        updater.wait(0.05)
+        assert add.call_count == 1
+
+        updater.probed['192.168.0.2'] -= arp_update.EVENT_PROBE_HOLDDOWN
+        updater.kernel.events.events = [[neigh_msg('192.168.0.2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE)]]
+        updater.wait(0.05)
+        assert add.call_count == 2
+
+
+def test_handle_events_resync(updater):
+    # the neighbor went STALE while the events were lost, the resync finds it
+    updater.kernel.ipr.table = [
+        neigh_msg('192.168.0.2', 1, '00:aa:bb:cc:dd:02', arp_update.NUD_STALE),
+        neigh_msg('192.168.0.1', 1, '00:aa:bb:cc:dd:01', arp_update.NUD_STALE),
+    ]
+    updater.kernel.events.events = [OSError(errno.ENOBUFS, 'No buffer space available')]
+    with mock.patch.object(updater.prober, 'add') as add:
+        updater.wait(0.05)
+    add.assert_called_once_with('ping', '192.168.0.2')
+
+
+def test_handle_events_chassis_packet(updater):
+    updater.switch_type = 'chassis-packet'
+    updater.static_route_nexthops = {'10.0.0.1': 'Ethernet0', '10.0.0.5': 'Ethernet0'}
+    updater.kernel.ipr.table = [
+        neigh_msg('10.0.0.1', 2, '00:aa:bb:cc:dd:03', arp_update.NUD_FAILED),
+        neigh_msg('10.0.0.5', 2, '00:aa:bb:cc:dd:05', arp_update.NUD_REACHABLE),
+    ]
+    updater.kernel.events.events = [[
+        neigh_msg('10.0.0.1', 2, '00:aa:bb:cc:dd:03', arp_update.NUD_FAILED),
+        # not a static route nexthop
+        neigh_msg('10.0.0.9', 2, '00:aa:bb:cc:dd:09', arp_update.NUD_FAILED),
+    ]]
+    with mock.patch.object(updater.prober, 'add') as add:
+        updater.wait(0.05)
+    add.assert_called_once_with('ping', '10.0.0.1', 'Ethernet0')
+    updater.dbs.fdb_macs.assert_not_called()
@@ -0,0 +1,66 @@
+import os
+import sys
+from importlib.machinery import SourceFileLoader
+from importlib.util import module_from_spec, spec_from_loader
+from unittest import mock
+
+import pytest
+
+scripts_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+loader = SourceFileLoader('supervisor_proc_exit_listener', os.path.join(scripts_path, 'supervisor-proc-exit-listener'))
+listener = module_from_spec(spec_from_loader(loader.name, loader))
+loader.exec_module(listener)
+
+
+class Subscriber(object):
+    def __init__(self, events):
+        self.events = list(events)
+
+    def pop(self):
+        if not self.events:
+            return "", "", ()
+        return self.events.pop(0)
+
+
+@pytest.mark.parametrize('use_unix_socket_path, is_tcp_conn', [(False, True), (True, False)])
+def test_auto_restart_state_connector(use_unix_socket_path, is_tcp_conn):
+    with mock.patch.object(listener.swsscommon, 'DBConnector', create=True) as mock_connector, \
+            mock.patch.object(listener.swsscommon, 'SubscriberStateTable', create=True,
+                              return_value=Subscriber([])) as mock_subscriber:
+        state = listener.AutoRestartState('snmp', use_unix_socket_path)
+    mock_connector.assert_called_once_with('CONFIG_DB', 0, is_tcp_conn)
+    mock_subscriber.assert_called_once_with(mock_connector.return_value, listener.FEATURE_TABLE_NAME)
+    assert state.subscriber is not None
+
+
+def test_auto_restart_state_update():
+    events = [
+        ('bgp', 'SET', (('auto_restart', 'disabled'),)),
+        ('snmp', 'SET', (('state', 'enabled'), ('auto_restart', 'enabled'))),
+    ]
+    with mock.patch.object(listener.swsscommon, 'DBConnector', create=True), \
+            mock.patch.object(listener.swsscommon, 'SubscriberStateTable', create=True,
+                              return_value=Subscriber(events)), \
+            mock.patch.object(listener.swsscommon, 'DEL_COMMAND', 'DEL', create=True):
+        state = listener.AutoRestartState('snmp', False)
+        assert state.get() == 'enabled'
+
+        state.subscriber.events.append(('snmp', 'SET', (('auto_restart', 'disabled'),)))
+        state.update(read_data=False)
+        assert state.get() == 'disabled'
+
+        # the state is read from CONFIG_DB when the entry is removed
+        state.subscriber.events.append(('snmp', 'DEL', ()))
+        state.update(read_data=False)
+        with mock.patch.object(listener, 'get_autorestart_state', return_value='enabled') as mock_get:
+            assert state.get() == 'enabled'
+        mock_get.assert_called_once_with('snmp', False)
+
+
+def test_auto_restart_state_without_subscription():
+    with mock.patch.object(listener.swsscommon, 'DBConnector', create=True, side_effect=RuntimeError('no db')), \
+            mock.patch.object(listener, 'get_autorestart_state', return_value='enabled') as mock_get:
+        state = listener.AutoRestartState('snmp', True)
+        assert state.subscriber is None
+        assert state.get() == 'enabled'
+    mock_get.assert_called_once_with('snmp', True)
@@ -13,8 +13,10 @@ import time
 import subprocess
 import fcntl
 import syslog
+import threading
+from contextlib import contextmanager
 from functools import wraps
-from wbutil.smbus import SMBus
+from wbutil.smbus import SMBus, I2cFunc, I2C_PEC, I2C_SMBUS_BLOCK_MAX
 
 
 PLATFORM_HAL_DEBUG_FILE = "/etc/.platform_hal_debug_flag"
@@ -98,6 +100,51 @@ def take_file_rw_lock(file_path):
     return ret
 
 
+class SMBusPool(object):
+    """
+       Keeps one open /dev/i2c-N handle per bus for the life of the process,
+       transfers on a bus are serialized by the bus lock
+    """
+
+    def __init__(self):
+        self._handles = {}
+        self._pec = {}
+        self._locks = {}
+        self._pool_lock = threading.Lock()
+
+    def _get_lock(self, bus):
+        with self._pool_lock:
+            lock = self._locks.get(bus)
+            if lock is None:
+                lock = threading.RLock()
+                self._locks[bus] = lock
+            return lock
+
+    @contextmanager
+    def bus(self, bus, pec=False):
+        with self._get_lock(bus):
+            handle = self._handles.get(bus)
+            if handle is None or handle.fd is None:
+                # SMBus closes its fd when a transfer fails, open it again
+                handle = SMBus(bus)
+                self._handles[bus] = handle
+                self._pec[bus] = False
+            if self._pec[bus] != pec:
+                fcntl.ioctl(handle.fd, I2C_PEC, 1 if pec else 0)
+                self._pec[bus] = pec
+            yield handle
+
+    def close(self):
+        with self._pool_lock:
+            for handle in self._handles.values():
+                handle.close()
+            self._handles.clear()
+            self._pec.clear()
+
+
+smbus_pool = SMBusPool()
+
+
 class osutil(object):
     """
        osutil
@@ -106,42 +153,42 @@ class osutil(object):
     @staticmethod
     @retry(maxretry=6)
     def wbi2cget_python(bus, addr, reg):
-        with SMBus(bus) as y:
+        with smbus_pool.bus(bus) as y:
             val, ind = y.read_byte_data(addr, reg, True)
         return val, ind
 
     @staticmethod
     @retry(maxretry=6)
     def wbi2cset_python(bus, addr, reg, value):
-        with SMBus(bus) as y:
+        with smbus_pool.bus(bus) as y:
             val, ind = y.write_byte_data(addr, reg, value, True)
         return val, ind
 
     @staticmethod
     @retry(maxretry=6)
     def wbi2cgetword_python(bus, addr, reg):
-        with SMBus(bus) as y:
+        with smbus_pool.bus(bus) as y:
             val, ind = y.read_word_data(addr, reg, True)
         return val, ind
 
     @staticmethod
     @retry(maxretry=6)
     def wbi2csetword_python(bus, addr, reg, value):
-        with SMBus(bus) as y:
+        with smbus_pool.bus(bus) as y:
             val, ind = y.write_word_data(addr, reg, value, True)
         return val, ind
 
     @staticmethod
     @retry(maxretry=6)
     def wbi2csetwordpec_python(bus, addr, reg, value):
-        with SMBus(bus) as y:
+        with smbus_pool.bus(bus, pec=True) as y:
             val, ind = y.write_word_data_pec(addr, reg, value, True)
         return val, ind
 
     @staticmethod
     @retry(maxretry=6)
     def wbi2cset_byte_pec_python(bus, addr, reg, value):
-        with SMBus(bus) as y:
+        with smbus_pool.bus(bus, pec=True) as y:
             val, ind = y.write_byte_data_pec(addr, reg, value, True)
         return val, ind
 
@@ -151,52 +198,96 @@ class osutil(object):
         return retcode, output
 
     @staticmethod
-    def geti2cword_i2ctool(bus, addr, offset):
-        command_line = "i2cget -f -y %d 0x%02x 0x%02x  wp" % (bus, addr, offset)
+    def i2c_transfer(bus, transfer, pec=False):
+        """
+        Run transfer(smbus) on the pooled handle of the bus
+        Return the (status, value) of the transfer, None if the bus can't be opened in process
+        """
+        try:
+            with smbus_pool.bus(bus, pec) as y:
+                return transfer(y)
+        except (OSError, IOError) as e:
+            if not os.path.exists("/dev/i2c-%d" % bus):
+                platform_hal_debug("i2c bus %d not available in process, msg: %s" % (bus, str(e)))
+                return None
+            return False, str(e)
+
+    @staticmethod
+    def i2ctool_transfer(bus, transfer, command_line, pec=False, delay=0.1):
+        """
+        i2c transfer retried up to 6 times, i2c-tools command is only used
+        when the bus can't be opened in process
+        """
         retrytime = 6
         ret_t = ""
         for i in range(retrytime):
-            ret, ret_t = osutil.command(command_line)
-            if ret == 0:
-                return True, int(ret_t, 16)
-            time.sleep(0.1)
+            result = osutil.i2c_transfer(bus, transfer, pec)
+            if result is None:
+                ret, ret_t = osutil.command(command_line)
+                if ret == 0:
+                    return True, ret_t
+            else:
+                ret, ret_t = result
+                if ret is True:
+                    return True, ret_t
+            if delay:
+                time.sleep(delay)
         return False, ret_t
 
+    @staticmethod
+    def geti2cword_i2ctool(bus, addr, offset):
+        command_line = "i2cget -f -y %d 0x%02x 0x%02x  wp" % (bus, addr, offset)
+        ret, ret_t = osutil.i2ctool_transfer(bus, lambda y: y.read_word_data(addr, offset, True),
+                                             command_line, pec=True)
+        if ret is True and isinstance(ret_t, str):
+            return True, int(ret_t, 16)
+        return ret, ret_t
+
     @staticmethod
     def seti2cword_i2ctool(bus, addr, offset, val):
         command_line = "i2cset -f -y %d 0x%02x 0x%0x 0x%04x wp" % (bus, addr, offset, val)
-        retrytime = 6
-        ret_t = ""
-        for i in range(retrytime):
-            ret, ret_t = osutil.command(command_line)
-            if ret == 0:
-                return True, ret_t
-            time.sleep(0.1)
-        return False, ret_t
+        return osutil.i2ctool_transfer(bus, lambda y: y.write_word_data_pec(addr, offset, val, True),
+                                       command_line, pec=True)
 
     @staticmethod
     def wbi2cget_i2ctool(bus, devno, address):
         command_line = "i2cget -f -y %d 0x%02x 0x%02x " % (bus, devno, address)
-        retrytime = 6
-        ret_t = ""
-        for i in range(retrytime):
-            ret, ret_t = osutil.command(command_line)
-            if ret == 0:
-                return True, int(ret_t, 16)
-            time.sleep(0.1)
-        return False, ret_t
+        ret, ret_t = osutil.i2ctool_transfer(bus, lambda y: y.read_byte_data(devno, address, True),
+                                             command_line)
+        if ret is True and isinstance(ret_t, str):
+            return True, int(ret_t, 16)
+        return ret, ret_t
 
     @staticmethod
     def wbi2cset_i2ctool(bus, devno, address, byte):
         command_line = "i2cset -f -y %d 0x%02x 0x%02x 0x%02x" % (
             bus, devno, address, byte)
-        retrytime = 6
-        ret_t = ""
-        for i in range(retrytime):
-            ret, ret_t = osutil.command(command_line)
-            if ret == 0:
-                return True, ret_t
-        return False, ret_t
+        return osutil.i2ctool_transfer(bus, lambda y: y.write_byte_data(devno, address, byte, True),
+                                       command_line, delay=0)
+
+    @staticmethod
+    def wbi2cget_block(bus, addr, reg, length):
+        """
+        Read length bytes from reg, with i2c block reads when the adapter supports them
+        """
+        try:
+            with smbus_pool.bus(bus) as y:
+                if y.funcs & I2cFunc.SMBUS_READ_I2C_BLOCK:
+                    vals = []
+                    while len(vals) < length:
+                        size = min(I2C_SMBUS_BLOCK_MAX, length - len(vals))
+                        vals.extend(y.read_i2c_block_data(addr, reg + len(vals), size, True))
+                    return True, vals
+        except Exception as e:
+            platform_hal_debug("i2c block read bus %d addr 0x%02x failed, msg: %s" % (bus, addr, str(e)))
+
+        vals = []
+        for offset in range(reg, reg + length):
+            ret, val = osutil.wbi2cget(bus, addr, offset)
+            if ret is False:
+                return False, val
+            vals.append(val)
+        return True, vals
 
     @staticmethod
     def geti2cword(bus, addr, offset):
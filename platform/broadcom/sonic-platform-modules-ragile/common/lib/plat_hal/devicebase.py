@@ -126,6 +126,9 @@ class devicebase(object):
         self._name = val
 
     def dumpValueByI2c(self, bus, loc):
+        ret, vals = osutil.wbi2cget_block(bus, loc, 0, 256)
+        if ret is True:
+            return "".join(chr(val) for val in vals)
         value = ""
         for i in range(256):
             ret, val = self.get_i2c(bus, loc, i)
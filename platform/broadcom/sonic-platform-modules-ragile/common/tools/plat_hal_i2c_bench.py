@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+#######################################################
+#
+# plat_hal_i2c_bench.py
+# Fake i2c harness and forks per cycle benchmark of plat_hal osutil i2c access
+#
+# Runs a polling cycle like hal_fanctrl/dev_monitor against fake i2c devices,
+# in process through the SMBus pool and through the i2c-tools fallback,
+# checks both give the same values and counts the forks of each.
+# It is not installed, run it against the plat_hal of ragile, micas or tencent:
+#
+# usage: PYTHONPATH=<platform modules>/common/lib plat_hal_i2c_bench.py [-c cycles] [-d devices] [--real-fork]
+#
+#######################################################
+
+import argparse
+import contextlib
+import re
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from unittest import mock
+
+from plat_hal import osutil as osutil_module
+from plat_hal.osutil import osutil
+from plat_hal.devicebase import devicebase
+try:
+    from wbutil.smbus import I2cFunc
+    I2C_PREFIX = "wb"
+except ImportError:
+    # tencent plat_hal names its i2c helpers rj*
+    from rjutil.smbus import I2cFunc
+    I2C_PREFIX = "rj"
+
+i2cget_i2ctool = getattr(osutil, I2C_PREFIX + "i2cget_i2ctool")
+i2cset_i2ctool = getattr(osutil, I2C_PREFIX + "i2cset_i2ctool")
+
+
+class FakeI2cBuses(object):
+    """
+       In memory i2c devices: (bus, addr) -> 256 byte registers
+    """
+
+    def __init__(self, buses, devices):
+        self.regs = {}
+        for bus in buses:
+            for addr in range(0x50, 0x50 + devices):
+                self.regs[(bus, addr)] = [(bus + addr + reg) & 0xff for reg in range(256)]
+        self.nak = set()
+        self.opens = 0
+        self.transfers = 0
+        self.pec_transfers = 0
+        self.pec = {}
+
+    def device(self, bus, addr):
+        if (bus, addr) in self.nak or (bus, addr) not in self.regs:
+            raise OSError(6, "No such device or address")
+        self.transfers += 1
+        if self.pec.get(bus):
+            self.pec_transfers += 1
+        return self.regs[(bus, addr)]
+
+    def read_word(self, bus, addr, reg):
+        regs = self.device(bus, addr)
+        return regs[reg] | (regs[(reg + 1) & 0xff] << 8)
+
+
+class FakeSMBus(object):
+    """
+       Stands for wbutil/rjutil smbus.SMBus on top of FakeI2cBuses
+    """
+    buses = None
+
+    def __init__(self, bus):
+        if (bus, 0x50) not in self.buses.regs:
+            raise OSError(2, "No such file or directory: '/dev/i2c-%d'" % bus)
+        self.buses.opens += 1
+        self.bus = bus
+        self.fd = 100 + bus
+        self.funcs = I2cFunc.SMBUS_BYTE_DATA | I2cFunc.SMBUS_WORD_DATA | I2cFunc.SMBUS_READ_I2C_BLOCK
+
+    def close(self):
+        self.fd = None
+
+    def _transfer(self, func):
+        try:
+            return True, func()
+        except OSError as e:
+            self.close()
+            return False, str(e)
+
+    def read_byte_data(self, addr, reg, force=None):
+        return self._transfer(lambda: self.buses.device(self.bus, addr)[reg])
+
+    def write_byte_data(self, addr, reg, value, force=None):
+        def write():
+            self.buses.device(self.bus, addr)[reg] = value
+            return ""
+        return self._transfer(write)
+
+    def read_word_data(self, addr, reg, force=None):
+        return self._transfer(lambda: self.buses.read_word(self.bus, addr, reg))
+
+    def write_word_data(self, addr, reg, value, force=None):
+        def write():
+            regs = self.buses.device(self.bus, addr)
+            regs[reg] = value & 0xff
+            regs[(reg + 1) & 0xff] = value >> 8
+            return ""
+        return self._transfer(write)
+
+    write_word_data_pec = write_word_data
+    write_byte_data_pec = write_byte_data
+
+    def read_i2c_block_data(self, addr, reg, length, force=None):
+        return self.buses.device(self.bus, addr)[reg:reg + length]
+
+
+class FakeI2cTools(object):
+    """
+       Answers i2cget/i2cset command lines from FakeI2cBuses, counting the forks
+    """
+    I2C_CMD_RE = re.compile(r"i2c(get|set) -f -y (\d+) (0x[0-9a-f]+) (0x[0-9a-f]+)(?: (0x[0-9a-f]+))?\s*(wp)?")
+
+    def __init__(self, buses, real_fork=False):
+        self.buses = buses
+        self.real_fork = real_fork
+        self.forks = 0
+
+    def getstatusoutput(self, cmd):
+        self.forks += 1
+        if self.real_fork:
+            subprocess.call(["true"])
+        match = self.I2C_CMD_RE.match(cmd)
+        if match is None:
+            return 1, "unknown command %s" % cmd
+        op, bus, addr, reg, value, word = match.groups()
+        bus, addr, reg = int(bus), int(addr, 16), int(reg, 16)
+        try:
+            if op == "get":
+                if word:
+                    return 0, "0x%04x" % self.buses.read_word(bus, addr, reg)
+                return 0, "0x%02x" % self.buses.device(bus, addr)[reg]
+            regs = self.buses.device(bus, addr)
+            value = int(value, 16)
+            regs[reg] = value & 0xff
+            if word:
+                regs[(reg + 1) & 0xff] = value >> 8
+            return 0, ""
+        except OSError as e:
+            return 1, "Error: Read failed, %s" % str(e)
+
+
+def run_cycle(buses, devices):
+    """
+       One polling cycle: fan speed bytes, PSU words, fan control writes and an eeprom dump
+    """
+    values = []
+    for bus in buses:
+        for addr in range(0x50, 0x50 + devices):
+            values.append(i2cget_i2ctool(bus, addr, 0x10))
+            values.append(osutil.geti2cword_i2ctool(bus, addr, 0x20))
+            values.append(i2cset_i2ctool(bus, addr, 0x30, 0x55))
+    values.append(devicebase().dumpValueByI2c(buses[0], 0x50))
+    return values
+
+
+@contextmanager
+def fresh_bus(bus, pec=False):
+    # Like before the pool: open and close the bus for every transfer
+    yield FakeSMBus(bus)
+
+
+def run(mode, cycles, buses, devices, real_fork):
+    fake_buses = FakeI2cBuses(buses, devices)
+    FakeSMBus.buses = fake_buses
+    tools = FakeI2cTools(fake_buses, real_fork)
+    osutil_module.smbus_pool.close()
+    with contextlib.ExitStack() as stack:
+        stack.enter_context(mock.patch.object(osutil_module, "SMBus", FakeSMBus))
+        stack.enter_context(mock.patch.object(osutil_module.fcntl, "ioctl",
+                                              lambda fd, req, arg: fake_buses.pec.__setitem__(fd - 100, arg)))
+        stack.enter_context(mock.patch.object(osutil_module.subprocess, "getstatusoutput", tools.getstatusoutput))
+        if mode == "i2c-tools":
+            # Access as before: i2c-tools commands, one bus open per byte for the eeprom dump
+            stack.enter_context(mock.patch.object(osutil, "i2c_transfer", lambda bus, transfer, pec=False: None))
+            stack.enter_context(mock.patch.object(osutil, I2C_PREFIX + "i2cget_block", lambda bus, addr, reg, length: (False, "")))
+            stack.enter_context(mock.patch.object(osutil_module.smbus_pool, "bus", fresh_bus))
+        start = time.time()
+        for _ in range(cycles):
+            values = run_cycle(buses, devices)
+        elapsed = time.time() - start
+
+        # A missing device fails after the retries
+        fake_buses.nak.add((buses[0], 0x50))
+        nak = i2cset_i2ctool(buses[0], 0x50, 0x30, 0x55)
+    osutil_module.smbus_pool.close()
+    return values, nak, tools.forks, fake_buses, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="plat_hal osutil i2c benchmark")
+    parser.add_argument("-c", "--cycles", type=int, default=20)
+    parser.add_argument("-d", "--devices", type=int, default=8, help="devices per bus")
+    parser.add_argument("-b", "--buses", type=int, default=4)
+    parser.add_argument("--real-fork", action="store_true", help="fork 'true' for every i2c-tools command")
+    args = parser.parse_args()
+    buses = list(range(1, args.buses + 1))
+
+    results = {}
+    for mode in ("in-process", "i2c-tools"):
+        values, nak, forks, fake_buses, elapsed = run(mode, args.cycles, buses, args.devices, args.real_fork)
+        results[mode] = values
+        print("%-10s: %5d forks/cycle, %4d bus opens, %6d transfers (%d with PEC), %8.3f ms/cycle, missing device: %s"
+              % (mode, forks // args.cycles, fake_buses.opens, fake_buses.transfers, fake_buses.pec_transfers,
+                 elapsed * 1000 / args.cycles, nak[0]))
+
+    if results["in-process"] != results["i2c-tools"]:
+        print("in-process and i2c-tools values differ")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -630,11 +630,13 @@ class Chassis(ChassisBase):
         """
         from . import sfp
         for index, status in port_dict.items():
-            if status == sfp.SFP_STATUS_REMOVED:
-                try:
+            try:
+                # Any event could be a module replacement, drop the cached EEPROM pages
+                self._sfp_list[int(index) - 1].invalidate_eeprom_cache()
+                if status == sfp.SFP_STATUS_REMOVED:
                     self._sfp_list[int(index) - 1].reinit()
-                except Exception as e:
-                    logger.log_error("Fail to re-initialize SFP {} - {}".format(index, repr(e)))
+            except Exception as e:
+                logger.log_error("Fail to re-initialize SFP {} - {}".format(index, repr(e)))
 
     def _show_capabilities(self):
         """
@@ -197,6 +197,37 @@ SFP_TYPE_SFF8636 = 'sff8636'
 # SFP stderr
 SFP_EEPROM_NOT_AVAILABLE = 'Input/output error'
 
+# Static EEPROM regions per SFP type: page number -> (begin, end) page offsets.
+# They hold vendor info and thresholds, and are cached until the module is replaced.
+# CMIS page 01h is not static: it holds the inactive firmware version, which changes
+# with a firmware download.
+SFP_STATIC_EEPROM_REGIONS = {
+    SFP_TYPE_CMIS: {
+        0: (128, 256),  # upper page 00h, vendor info
+        2: (0, 128),    # page 02h, thresholds
+    },
+    SFP_TYPE_SFF8636: {
+        0: (128, 256),  # upper page 00h, vendor info
+        3: (0, 128),    # page 03h, thresholds
+    },
+    SFP_TYPE_SFF8472: {
+        0: (0, 256),    # A0h
+        -1: (0, 96),    # A2h thresholds and calibration
+    },
+}
+
+# EEPROM regions identifying the module per SFP type: (page 0 offset, size) of the
+# identifier and the vendor serial number. They are read uncached to detect a module
+# replaced between two reads, the cached static regions are then dropped.
+SFP_EEPROM_IDENTITY_REGIONS = {
+    SFP_TYPE_CMIS: ((0, 1), (166, 16)),
+    SFP_TYPE_SFF8636: ((0, 1), (196, 16)),
+    SFP_TYPE_SFF8472: ((0, 1), (68, 16)),
+}
+# The identity is read again before serving static regions if it was read more
+# than this many seconds ago
+SFP_EEPROM_IDENTITY_CHECK_INTERVAL = 1
+
 SFP_DEFAULT_TEMP_WARNNING_THRESHOLD = 70.0
 SFP_DEFAULT_TEMP_CRITICAL_THRESHOLD = 80.0
 SFP_TEMPERATURE_SCALE = 8.0
@@ -312,6 +343,138 @@ class SdkHandleContext(object):
     def __exit__(self, exc_type, exc_val, exc_tb):
         deinitialize_sdk_handle(self.sdk_handle)
 
+class EepromPageAccess(object):
+    """EEPROM page access of a module.
+
+    Page files are kept open and read with pread. Static regions are read in one
+    go and served from memory until invalidate() is called, which is done when the
+    module is removed or replaced, or until check_identity() finds another module.
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._fds = {}           # page path -> fd
+        self._page_sizes = {}    # page path -> page size
+        self._static_data = {}   # (page path, begin) -> bytes
+        self._identity = None    # identity of the module of the static data
+        self._identity_time = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.bytes_read = 0
+        self.page_reads = 0
+
+    def _get_fd(self, page):
+        fd = self._fds.get(page)
+        if fd is None:
+            fd = os.open(page, os.O_RDONLY)
+            self._fds[page] = fd
+        return fd
+
+    def _pread(self, page, size, page_offset):
+        data = os.pread(self._get_fd(page), size, page_offset)
+        self.page_reads += 1
+        self.bytes_read += len(data)
+        return data
+
+    def get_page_size(self, page):
+        with self._lock:
+            size = self._page_sizes.get(page)
+            if size is None:
+                size = os.lseek(self._get_fd(page), 0, os.SEEK_END)
+                self._page_sizes[page] = size
+            return size
+
+    def read(self, page, page_offset, num_bytes, static_region=None):
+        """Read from a page, the read stops at the page end
+
+        Args:
+            page (str): page file path
+            page_offset (int): offset in the page
+            num_bytes (int): read size
+            static_region (tuple, optional): (begin, end) static region of the page
+
+        Returns:
+            bytes: the content read
+        """
+        with self._lock:
+            try:
+                if static_region and static_region[0] <= page_offset and page_offset + num_bytes <= static_region[1]:
+                    begin, end = static_region
+                    data = self._static_data.get((page, begin))
+                    if data is None:
+                        self.cache_misses += 1
+                        data = self._pread(page, end - begin, begin)
+                        if len(data) != end - begin:
+                            return data[page_offset - begin:page_offset - begin + num_bytes]
+                        self._static_data[(page, begin)] = data
+                    else:
+                        self.cache_hits += 1
+                    return data[page_offset - begin:page_offset - begin + num_bytes]
+
+                return self._pread(page, num_bytes, page_offset)
+            except OSError:
+                # Module removed or not ready, reopen the page next time
+                self._close()
+                raise
+
+    def check_identity(self, page, regions, force=False):
+        """Check that the module was not replaced since the static regions were read,
+        they are dropped otherwise. Unless forced, the identity is read at most once
+        per SFP_EEPROM_IDENTITY_CHECK_INTERVAL.
+
+        Args:
+            page (str): page file path of the identity
+            regions (tuple): (page_offset, size) of the identity regions in the page
+            force (bool): read the identity regardless of the last check
+
+        Returns:
+            bool: True if the module was replaced
+        """
+        with self._lock:
+            now = time.monotonic()
+            if not force and self._identity is not None and \
+                    now - self._identity_time < SFP_EEPROM_IDENTITY_CHECK_INTERVAL:
+                return False
+            try:
+                identity = b''.join(self._pread(page, size, page_offset) for page_offset, size in regions)
+            except OSError:
+                self._close()
+                raise
+            replaced = self._identity is not None and identity != self._identity
+            if replaced:
+                self._static_data.clear()
+            self._identity = identity
+            self._identity_time = now
+            return replaced
+
+    def _close(self):
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds.clear()
+        self._page_sizes.clear()
+        self._static_data.clear()
+        self._identity = None
+
+    def invalidate(self):
+        with self._lock:
+            self._close()
+
+    def invalidate_page(self, page):
+        with self._lock:
+            for key in [key for key in self._static_data if key[0] == page]:
+                del self._static_data[key]
+
+    def get_stats(self):
+        return {
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+            'bytes_read': self.bytes_read,
+            'page_reads': self.page_reads
+        }
+
+
 class NvidiaSFPCommon(SfpOptoeBase):
     sfp_index_to_logical_port_dict = {}
     sfp_index_to_logical_lock = threading.Lock()
@@ -462,6 +625,7 @@ class SFP(NvidiaSFPCommon):
 
         self.slot_id = slot_id
         self._sfp_type_str = None
+        self._eeprom_pages = EepromPageAccess()
         # SFP state, only applicable for module host management
         self.state = STATE_DOWN
 
@@ -485,6 +649,7 @@ class SFP(NvidiaSFPCommon):
         """
         presence_sysfs = f'/sys/module/sx_core/asic0/module{self.sdk_index}/hw_present' if self.is_sw_control() else f'/sys/module/sx_core/asic0/module{self.sdk_index}/present'
         if utils.read_int_from_file(presence_sysfs) != 1:
+            self.invalidate_eeprom_cache()
             return False
         eeprom_raw = self._read_eeprom(0, 1, log_on_error=False)
         return eeprom_raw is not None
@@ -512,29 +677,25 @@ class SFP(NvidiaSFPCommon):
         """
         result = bytearray(0)
         while num_bytes > 0:
-            _, page, page_offset = self._get_page_and_page_offset(offset)
+            page_num, page, page_offset = self._get_page_and_page_offset(offset)
             if not page:
                 return None
 
             try:
-                with open(page, mode='rb', buffering=0) as f:
-                    f.seek(page_offset)
-                    content = f.read(num_bytes)
-                    if not result:
-                        result = content
+                content = self._eeprom_pages.read(page, page_offset, num_bytes, self._get_static_eeprom_region(page_num))
+                result += content
+                read_length = len(content)
+                num_bytes -= read_length
+                if num_bytes > 0:
+                    page_size = self._eeprom_pages.get_page_size(page)
+                    if page_offset + read_length == page_size:
+                        offset += read_length
                     else:
-                        result += content
-                    read_length = len(content)
-                    num_bytes -= read_length
-                    if num_bytes > 0:
-                        page_size = f.seek(0, os.SEEK_END)
-                        if page_offset + read_length == page_size:
-                            offset += read_length
-                        else:
-                            # Indicate read finished
-                            num_bytes = 0
-                    if ctypes.get_errno() != 0:
-                        raise IOError(f'errno = {os.strerror(ctypes.get_errno())}')
+                        # Indicate read finished
+                        num_bytes = 0
+                if ctypes.get_errno() != 0:
+                    raise IOError(f'errno = {os.strerror(ctypes.get_errno())}')
+                if logger.get_min_log_priority() >= Logger.LOG_PRIORITY_DEBUG:
                     logger.log_debug(f'read EEPROM sfp={self.sdk_index}, page={page}, page_offset={page_offset}, '\
                         f'size={read_length}, data={content}')
             except (OSError, IOError) as e:
@@ -545,6 +706,67 @@ class SFP(NvidiaSFPCommon):
 
         return bytearray(result)
 
+    def _get_static_eeprom_region(self, page_num):
+        """Get the static region of a page, it is cached until the module is replaced.
+        If the module was replaced, the cached static regions are dropped and the SFP
+        is re-initialized.
+
+        Args:
+            page_num (int): page number returned by _get_page_and_page_offset
+
+        Returns:
+            tuple: (begin, end) page offsets, None if the page has no static region
+        """
+        eeprom_path = self._get_eeprom_path()
+        sfp_type = self._get_sfp_type_str(eeprom_path)
+        if sfp_type is None:
+            return None
+        region = SFP_STATIC_EEPROM_REGIONS.get(sfp_type, {}).get(page_num)
+        if region is not None and self._check_eeprom_identity(eeprom_path, sfp_type, False):
+            return self._get_static_eeprom_region(page_num)
+        return region
+
+    def _check_eeprom_identity(self, eeprom_path, sfp_type, force):
+        """Read the module identity, if the module was replaced the cached static
+        regions are dropped and the SFP is re-initialized
+
+        Returns:
+            bool: True if the module was replaced
+        """
+        if not self._eeprom_pages.check_identity(os.path.join(eeprom_path, SFP_PAGE0_PATH),
+                                                 SFP_EEPROM_IDENTITY_REGIONS[sfp_type], force):
+            return False
+        logger.log_notice(f'sfp={self.sdk_index} module replaced, drop the cached EEPROM data')
+        self.reinit()
+        return True
+
+    def check_eeprom_identity(self):
+        """Read the module identity uncached, so that the following reads of the
+        static regions, like the serial number and the thresholds, are served for
+        the module currently in the cage
+
+        Raises:
+            OSError: the identity is not readable
+        """
+        eeprom_path = self._get_eeprom_path()
+        sfp_type = self._get_sfp_type_str(eeprom_path)
+        if sfp_type in SFP_EEPROM_IDENTITY_REGIONS:
+            self._check_eeprom_identity(eeprom_path, sfp_type, True)
+
+    def invalidate_eeprom_cache(self):
+        """Close the EEPROM page files and drop the cached static pages,
+        called when the module is removed or replaced
+        """
+        self._eeprom_pages.invalidate()
+
+    def get_eeprom_stats(self):
+        """Get EEPROM access counters
+
+        Returns:
+            dict: cache_hits, cache_misses, bytes_read and page_reads
+        """
+        return self._eeprom_pages.get_stats()
+
     # write eeprom specfic bytes beginning from offset with size as num_bytes
     def write_eeprom(self, offset, num_bytes, write_buffer):
         """
@@ -583,8 +805,10 @@ class SFP(NvidiaSFPCommon):
                     num_bytes -= ret
                     if ctypes.get_errno() != 0:
                         raise IOError(f'errno = {os.strerror(ctypes.get_errno())}')
-                    logger.log_debug(f'write EEPROM sfp={self.sdk_index}, page={page}, page_offset={page_offset}, '\
-                        f'size={ret}, left={num_bytes}, data={written_buffer}')
+                    if logger.get_min_log_priority() >= Logger.LOG_PRIORITY_DEBUG:
+                        logger.log_debug(f'write EEPROM sfp={self.sdk_index}, page={page}, page_offset={page_offset}, '\
+                            f'size={ret}, left={num_bytes}, data={written_buffer}')
+                self._eeprom_pages.invalidate_page(page)
             except (OSError, IOError) as e:
                 data = ''.join('{:02x}'.format(x) for x in write_buffer)
                 logger.log_error(f'Failed to write EEPROM data sfp={self.sdk_index} EEPROM page={page}, page_offset={page_offset}, size={num_bytes}, '\
@@ -972,20 +1196,19 @@ class SFP(NvidiaSFPCommon):
         if self._sfp_type_str is None:
             page = os.path.join(eeprom_path, SFP_PAGE0_PATH)
             try:
-                with open(page, mode='rb', buffering=0) as f:
-                    id_byte_raw = bytearray(f.read(1))
-                    id = id_byte_raw[0]
-                    if id == 0x18 or id == 0x19 or id == 0x1e:
-                        self._sfp_type_str = SFP_TYPE_CMIS
-                    elif id == 0x11 or id == 0x0D:
-                        # in sonic-platform-common, 0x0D is treated as sff8436,
-                        # but it shared the same implementation on Nvidia platforms,
-                        # so, we treat it as sff8636 here.
-                        self._sfp_type_str = SFP_TYPE_SFF8636
-                    elif id == 0x03:
-                        self._sfp_type_str = SFP_TYPE_SFF8472
-                    else:
-                        logger.log_error(f'Unsupported sfp type {id}')
+                id_byte_raw = bytearray(self._eeprom_pages.read(page, 0, 1))
+                id = id_byte_raw[0]
+                if id == 0x18 or id == 0x19 or id == 0x1e:
+                    self._sfp_type_str = SFP_TYPE_CMIS
+                elif id == 0x11 or id == 0x0D:
+                    # in sonic-platform-common, 0x0D is treated as sff8436,
+                    # but it shared the same implementation on Nvidia platforms,
+                    # so, we treat it as sff8636 here.
+                    self._sfp_type_str = SFP_TYPE_SFF8636
+                elif id == 0x03:
+                    self._sfp_type_str = SFP_TYPE_SFF8472
+                else:
+                    logger.log_error(f'Unsupported sfp type {id}')
             except (OSError, IOError) as e:
                 # SFP_EEPROM_NOT_AVAILABLE usually indicates SFP is not present, no need
                 # print such error information to log
@@ -1932,6 +2155,20 @@ class RJ45Port(NvidiaSFPCommon):
         """
         return
 
+    def invalidate_eeprom_cache(self):
+        """
+        Nothing to do for RJ45. Just provide it to avoid exception
+        :return:
+        """
+        return
+
+    def check_eeprom_identity(self):
+        """
+        Nothing to do for RJ45. Just provide it to avoid exception
+        :return:
+        """
+        return
+
     def get_module_status(self):
         """Get value of sysfs status. It could return:
             SXD_PMPE_MODULE_STATUS_PLUGGED_ENABLED_E = 0x1,
@@ -18,6 +18,7 @@
 from . import utils
 from sonic_py_common import logger
 
+import concurrent.futures
 import sys
 import time
 
@@ -43,6 +44,14 @@ ASIC_DEFAULT_TEMP_CRITICAL_THRESHOLD = 120000
 
 ERROR_READ_THERMAL_DATA = 254000
 
+# Module thermal data is read by a small pool, a module not answering within
+# MODULE_READ_TIMEOUT seconds is reported with a fault
+MODULE_READ_WORKERS = 4
+MODULE_READ_TIMEOUT = 2
+MODULE_UPDATE_TIMEOUT = 8
+MODULE_WAIT_INTERVAL = 0.1
+MODULE_PRESENCE_SYSFS_TEMPLATE = '/sys/module/sx_core/asic0/module{}/{}'
+
 TC_CONFIG_FILE = '/run/hw-management/config/tc_config.json'
 logger = logger.Logger('thermal-updater')
 
@@ -52,6 +61,15 @@ class ThermalUpdater:
         self._sfp_list = sfp_list
         self._sfp_status = {}
         self._timer = utils.Timer()
+        # sdk_index -> (serial, (warning_thresh, critical_thresh)), valid while the module
+        # in the cage has this serial number
+        self._thresholds = {}
+        self._executor = None
+        # sdk_index -> future of a read still running after its timeout
+        self._stuck_reads = {}
+        self._sfp_poll_interval = None
+        self.last_module_update_duration = None
+        self.max_module_update_duration = 0
 
     def load_tc_config(self):
         asic_poll_interval = 1
@@ -77,6 +95,7 @@ class ThermalUpdater:
         logger.log_notice(f'ASIC polling interval: {asic_poll_interval}')
         self._timer.schedule(asic_poll_interval, self.update_asic)
         logger.log_notice(f'Module polling interval: {sfp_poll_interval}')
+        self._sfp_poll_interval = sfp_poll_interval
         self._timer.schedule(sfp_poll_interval, self.update_module)
 
     def start(self):
@@ -87,6 +106,9 @@ class ThermalUpdater:
 
     def stop(self):
         self._timer.stop()
+        if self._executor:
+            self._executor.shutdown(wait=False)
+            self._executor = None
         self.control_tc(True)
 
     def control_tc(self, suspend):
@@ -114,52 +136,168 @@ class ThermalUpdater:
         critical = utils.read_int_from_file('/sys/module/sx_core/asic0/temperature/critical', default=None, log_func=None)
         return critical * ASIC_TEMPERATURE_SCALE if  critical is not None else ASIC_DEFAULT_TEMP_CRITICAL_THRESHOLD
 
-    def update_single_module(self, sfp):
+    def get_module_presence(self):
+        """Read the sysfs presence of all modules in one sweep, EEPROM is not accessed
+
+        Returns:
+            dict: sdk_index -> True/False, None if it can't be told from sysfs
+        """
+        presence = {}
+        for sfp in self._sfp_list:
+            try:
+                name = 'hw_present' if sfp.is_sw_control() else 'present'
+                presence[sfp.sdk_index] = utils.read_int_from_file(
+                    MODULE_PRESENCE_SYSFS_TEMPLATE.format(sfp.sdk_index, name), log_func=None) == 1
+            except Exception:
+                presence[sfp.sdk_index] = None
+        return presence
+
+    def get_module_serial(self, sfp):
         try:
-            presence = sfp.get_presence()
-            pre_presence = self._sfp_status.get(sfp.sdk_index)
-            if presence:
-                temperature = sfp.get_temperature()
-                if temperature == 0:
-                    warning_thresh = 0
-                    critical_thresh = 0
-                    fault = 0
-                else:
-                    warning_thresh = sfp.get_temperature_warning_threshold()
-                    critical_thresh = sfp.get_temperature_critical_threshold()
-                    fault = ERROR_READ_THERMAL_DATA if (temperature is None or warning_thresh is None or critical_thresh is None) else 0
-                    temperature = 0 if temperature is None else temperature * SFP_TEMPERATURE_SCALE
-                    warning_thresh = 0 if warning_thresh is None else warning_thresh * SFP_TEMPERATURE_SCALE
-                    critical_thresh = 0 if critical_thresh is None else critical_thresh * SFP_TEMPERATURE_SCALE
-
-                hw_management_independent_mode_update.thermal_data_set_module(
-                    0, # ASIC index always 0 for now
-                    sfp.sdk_index + 1,
-                    int(temperature),
-                    int(critical_thresh),
-                    int(warning_thresh),
-                    fault
-                )
-            else:
-                if pre_presence != presence:
-                    hw_management_independent_mode_update.thermal_data_clean_module(0, sfp.sdk_index + 1)
+            # The serial number is served from the SFP EEPROM cache, which checks the
+            # module identity only once per SFP_EEPROM_IDENTITY_CHECK_INTERVAL
+            sfp.check_eeprom_identity()
+            return sfp.get_serial()
+        except Exception:
+            return None
+
+    def read_module_thermal(self, sfp, cached):
+        """Read module thermal data, called by the read pool
+
+        Args:
+            sfp: SFP object
+            cached: cached (serial, (warning_thresh, critical_thresh)) or None
 
+        Returns:
+            tuple: (presence, temperature, (warning_thresh, critical_thresh), serial)
+        """
+        if not sfp.get_presence():
+            return False, None, None, None
+        temperature = sfp.get_temperature()
+        if temperature == 0:
+            return True, temperature, None, None
+        # A module swapped between two polls is still present, the cached thresholds
+        # are only used for the same module
+        serial = self.get_module_serial(sfp)
+        if cached is not None and serial is not None and cached[0] == serial:
+            return True, temperature, cached[1], serial
+        return True, temperature, (sfp.get_temperature_warning_threshold(),
+                                   sfp.get_temperature_critical_threshold()), serial
+
+    def publish_module_thermal(self, sfp, presence, temperature, thresholds, serial=None):
+        pre_presence = self._sfp_status.get(sfp.sdk_index)
+        if pre_presence != presence:
+            self._sfp_status[sfp.sdk_index] = presence
+            self._thresholds.pop(sfp.sdk_index, None)
+
+        if not presence:
             if pre_presence != presence:
-                self._sfp_status[sfp.sdk_index] = presence
+                hw_management_independent_mode_update.thermal_data_clean_module(0, sfp.sdk_index + 1)
+            return
+
+        if temperature == 0:
+            warning_thresh = 0
+            critical_thresh = 0
+            fault = 0
+        else:
+            warning_thresh, critical_thresh = thresholds
+            if serial is not None and warning_thresh is not None and critical_thresh is not None:
+                # Thresholds are static EEPROM fields
+                self._thresholds[sfp.sdk_index] = (serial, thresholds)
+            fault = ERROR_READ_THERMAL_DATA if (temperature is None or warning_thresh is None or critical_thresh is None) else 0
+            temperature = 0 if temperature is None else temperature * SFP_TEMPERATURE_SCALE
+            warning_thresh = 0 if warning_thresh is None else warning_thresh * SFP_TEMPERATURE_SCALE
+            critical_thresh = 0 if critical_thresh is None else critical_thresh * SFP_TEMPERATURE_SCALE
+
+        hw_management_independent_mode_update.thermal_data_set_module(
+            0, # ASIC index always 0 for now
+            sfp.sdk_index + 1,
+            int(temperature),
+            int(critical_thresh),
+            int(warning_thresh),
+            fault
+        )
+
+    def publish_module_fault(self, sfp):
+        hw_management_independent_mode_update.thermal_data_set_module(
+            0, # ASIC index always 0 for now
+            sfp.sdk_index + 1,
+            0,
+            0,
+            0,
+            ERROR_READ_THERMAL_DATA
+        )
+
+    def update_single_module(self, sfp):
+        try:
+            result = self.read_module_thermal(sfp, self._thresholds.get(sfp.sdk_index))
+            self.publish_module_thermal(sfp, *result)
         except Exception as e:
             logger.log_error(f'Failed to update module {sfp.sdk_index} thermal data - {e}')
-            hw_management_independent_mode_update.thermal_data_set_module(
-                0, # ASIC index always 0 for now
-                sfp.sdk_index + 1,
-                0,
-                0,
-                0,
-                ERROR_READ_THERMAL_DATA
-            )
+            self.publish_module_fault(sfp)
+
+    def _timed_read(self, sfp, thresholds, start_times):
+        start_times[sfp.sdk_index] = time.monotonic()
+        return self.read_module_thermal(sfp, thresholds)
 
     def update_module(self):
+        begin = time.monotonic()
+        presence = self.get_module_presence()
+        if self._executor is None:
+            self._executor = concurrent.futures.ThreadPoolExecutor(max_workers=MODULE_READ_WORKERS,
+                                                                   thread_name_prefix='thermal-updater')
+
+        futures = {}
+        start_times = {}
         for sfp in self._sfp_list:
-            self.update_single_module(sfp)
+            if presence.get(sfp.sdk_index) is False:
+                # Not in the cage, no need to touch EEPROM
+                self.publish_module_thermal(sfp, False, None, None)
+                continue
+            stuck = self._stuck_reads.get(sfp.sdk_index)
+            if stuck is not None:
+                if not stuck.done():
+                    logger.log_error(f'Module {sfp.sdk_index} thermal data read is still pending')
+                    self.publish_module_fault(sfp)
+                    continue
+                del self._stuck_reads[sfp.sdk_index]
+            future = self._executor.submit(self._timed_read, sfp, self._thresholds.get(sfp.sdk_index), start_times)
+            futures[future] = sfp
+
+        pending = set(futures)
+        while pending:
+            done, pending = concurrent.futures.wait(pending, timeout=MODULE_WAIT_INTERVAL,
+                                                    return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                sfp = futures[future]
+                try:
+                    self.publish_module_thermal(sfp, *future.result())
+                except Exception as e:
+                    logger.log_error(f'Failed to update module {sfp.sdk_index} thermal data - {e}')
+                    self.publish_module_fault(sfp)
+
+            now = time.monotonic()
+            for future in list(pending):
+                sfp = futures[future]
+                start_time = start_times.get(sfp.sdk_index)
+                if start_time is not None:
+                    timed_out = now - start_time > MODULE_READ_TIMEOUT
+                else:
+                    timed_out = now - begin > MODULE_UPDATE_TIMEOUT
+                if timed_out:
+                    logger.log_error(f'Timeout reading module {sfp.sdk_index} thermal data')
+                    future.cancel()
+                    self._stuck_reads[sfp.sdk_index] = future
+                    self.publish_module_fault(sfp)
+                    pending.remove(future)
+
+        duration = time.monotonic() - begin
+        self.last_module_update_duration = duration
+        self.max_module_update_duration = max(self.max_module_update_duration, duration)
+        if self._sfp_poll_interval and duration > self._sfp_poll_interval:
+            logger.log_warning(f'Module thermal update took {duration:.3f} seconds, polling interval is {self._sfp_poll_interval}')
+        else:
+            logger.log_debug(f'Module thermal update took {duration:.3f} seconds for {len(futures)} modules')
 
     def update_asic(self):
         try:
@@ -28,7 +28,7 @@ test_path = os.path.dirname(os.path.abspath(__file__))
 modules_path = os.path.dirname(test_path)
 sys.path.insert(0, modules_path)
 
-from sonic_platform.sfp import SFP, RJ45Port, SX_PORT_MODULE_STATUS_INITIALIZING, SX_PORT_MODULE_STATUS_PLUGGED, SX_PORT_MODULE_STATUS_UNPLUGGED, SX_PORT_MODULE_STATUS_PLUGGED_WITH_ERROR, SX_PORT_MODULE_STATUS_PLUGGED_DISABLED
+from sonic_platform.sfp import SFP, RJ45Port, SX_PORT_MODULE_STATUS_INITIALIZING, SX_PORT_MODULE_STATUS_PLUGGED, SX_PORT_MODULE_STATUS_UNPLUGGED, SX_PORT_MODULE_STATUS_PLUGGED_WITH_ERROR, SX_PORT_MODULE_STATUS_PLUGGED_DISABLED, SFP_PAGE0_PATH, SFP_EEPROM_IDENTITY_CHECK_INTERVAL
 from sonic_platform.chassis import Chassis
 
 
@@ -139,35 +139,93 @@ class TestSfp:
             expected_calls = [mock.call(bytes_to_write), mock.call(bytes_to_write[128:]), mock.call(bytes_to_write[256:])]
             handle.write.assert_has_calls(expected_calls)
 
+    @mock.patch('sonic_platform.sfp.SFP._get_static_eeprom_region', mock.MagicMock(return_value=None))
     @mock.patch('sonic_platform.sfp.SFP._get_page_and_page_offset')
     def test_sfp_read_eeprom(self, mock_get_page):
         sfp = SFP(0)
         mock_get_page.return_value = (None, None, None)
         assert sfp.read_eeprom(0, 1) is None
 
-        mock_get_page.return_value = (0, '/tmp/mock_page', 0)
-        mo = mock.mock_open()
-        with mock.patch('sonic_platform.sfp.open', mo):
-            handle = mo()
-            assert sfp.read_eeprom(0, 0) == bytearray(0)
+        mock_page = '/tmp/mock_page'
+        with open(mock_page, 'wb') as f:
+            f.write(bytes([0] * 128 + [1] * 128))
+        mock_get_page.return_value = (0, mock_page, 0)
+        assert sfp.read_eeprom(0, 0) == bytearray(0)
+        assert sfp.read_eeprom(0, 1) == bytearray([0])
 
-            handle.read.return_value = b'\x00'
-            assert sfp.read_eeprom(0, 1) == bytearray([0])
-            handle.seek.assert_called_once_with(0)
-
-            ctypes.set_errno(1)
-            assert sfp.read_eeprom(0, 1) is None
-            ctypes.set_errno(0)
+        ctypes.set_errno(1)
+        assert sfp.read_eeprom(0, 1) is None
+        ctypes.set_errno(0)
 
-            handle.read.side_effect = OSError('')
+        with mock.patch('os.pread', mock.MagicMock(side_effect=OSError(''))):
             assert sfp.read_eeprom(0, 1) is None
 
-        mo = mock.mock_open()
-        with mock.patch('sonic_platform.sfp.open', mo):
-            handle = mo()
-            handle.read.side_effect = [b'\x00'*128, b'\x01'*128, b'\x02'*64]
-            handle.seek.side_effect = [0, 128, 0, 128, 0]
-            assert sfp.read_eeprom(0, 320) == bytearray([0]*128 + [1]*128 + [2]*64)
+        mock_page1 = '/tmp/mock_page1'
+        with open(mock_page1, 'wb') as f:
+            f.write(bytes([2] * 128))
+        mock_get_page.side_effect = [(0, mock_page, 0), (1, mock_page1, 0)]
+        assert sfp.read_eeprom(0, 320) == bytearray([0]*128 + [1]*128 + [2]*64)
+        mock_get_page.side_effect = None
+
+        # Page files are kept open
+        assert sfp._eeprom_pages.page_reads == 4
+        assert len(sfp._eeprom_pages._fds) == 2
+        sfp.invalidate_eeprom_cache()
+        assert not sfp._eeprom_pages._fds
+        os.remove(mock_page)
+        os.remove(mock_page1)
+
+    @mock.patch('sonic_platform.sfp.SFP._get_sfp_type_str', mock.MagicMock(return_value='cmis'))
+    @mock.patch('sonic_platform.sfp.SFP._get_eeprom_path', mock.MagicMock(return_value='/tmp/mock_eeprom'))
+    @mock.patch('sonic_platform.sfp.SFP._get_page_and_page_offset')
+    @mock.patch('sonic_platform.sfp.time.monotonic')
+    def test_sfp_read_eeprom_static_cache(self, mock_time, mock_get_page):
+        mock_time.return_value = 100
+        sfp = SFP(0)
+        mock_page = os.path.join('/tmp/mock_eeprom', SFP_PAGE0_PATH)
+        os.makedirs(os.path.dirname(mock_page), exist_ok=True)
+        with open(mock_page, 'wb') as f:
+            f.write(bytes(range(256)))
+
+        # Upper page 00h is static, read once and served from cache, after the
+        # identifier and serial number are read
+        mock_get_page.return_value = (0, mock_page, 148)
+        assert sfp.read_eeprom(148, 16) == bytearray(range(148, 164))
+        mock_get_page.return_value = (0, mock_page, 168)
+        assert sfp.read_eeprom(168, 16) == bytearray(range(168, 184))
+        assert sfp.get_eeprom_stats() == {'cache_hits': 1, 'cache_misses': 1, 'bytes_read': 145, 'page_reads': 3}
+
+        # Lower page 00h is not cached
+        mock_get_page.return_value = (0, mock_page, 14)
+        assert sfp.read_eeprom(14, 2) == bytearray([14, 15])
+        assert sfp.read_eeprom(14, 2) == bytearray([14, 15])
+        assert sfp.get_eeprom_stats()['page_reads'] == 5
+
+        # Page 01h is not static, it holds the inactive firmware version
+        assert sfp._get_static_eeprom_region(1) is None
+        assert sfp._get_static_eeprom_region(2) == (0, 128)
+
+        # Same module, the identity is read again after the check interval
+        mock_time.return_value += SFP_EEPROM_IDENTITY_CHECK_INTERVAL
+        mock_get_page.return_value = (0, mock_page, 148)
+        assert sfp.read_eeprom(148, 1) == bytearray([148])
+        assert sfp.get_eeprom_stats() == {'cache_hits': 2, 'cache_misses': 1, 'bytes_read': 166, 'page_reads': 7}
+
+        # Module replaced, served from cache until the identity is read again
+        with open(mock_page, 'wb') as f:
+            f.write(bytes([0xff] * 256))
+        assert sfp.read_eeprom(148, 1) == bytearray([148])
+        mock_time.return_value += SFP_EEPROM_IDENTITY_CHECK_INTERVAL
+        with mock.patch.object(sfp, 'reinit', wraps=sfp.reinit) as mock_reinit:
+            assert sfp.read_eeprom(148, 1) == bytearray([0xff])
+            mock_reinit.assert_called_once()
+
+        # Module replaced, cache dropped on invalidation
+        with open(mock_page, 'wb') as f:
+            f.write(bytes(range(256)))
+        sfp.invalidate_eeprom_cache()
+        assert sfp.read_eeprom(148, 1) == bytearray([148])
+        os.remove(mock_page)
 
     @mock.patch('sonic_platform.sfp.SFP._fetch_port_status')
     def test_is_port_admin_status_up(self, mock_port_status):
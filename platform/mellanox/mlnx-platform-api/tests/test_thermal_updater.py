@@ -15,10 +15,14 @@
 # limitations under the License.
 #
 
+import os
+import threading
 import time
 from unittest import mock
 
 from sonic_platform import utils
+from sonic_platform.sfp import SFP, SFP_PAGE0_PATH
+from sonic_platform import thermal_updater
 from sonic_platform.thermal_updater import ThermalUpdater, hw_management_independent_mode_update
 from sonic_platform.thermal_updater import ASIC_DEFAULT_TEMP_WARNNING_THRESHOLD, \
                                            ASIC_DEFAULT_TEMP_CRITICAL_THRESHOLD
@@ -90,6 +94,7 @@ class TestThermalUpdater:
         assert updater.get_asic_temp_warning_threshold() == ASIC_DEFAULT_TEMP_WARNNING_THRESHOLD
         assert updater.get_asic_temp_critical_threshold() == ASIC_DEFAULT_TEMP_CRITICAL_THRESHOLD
 
+    @mock.patch('sonic_platform.utils.read_int_from_file', mock.MagicMock(return_value=1))
     def test_update_module(self):
         mock_sfp = mock.MagicMock()
         mock_sfp.sdk_index = 10
@@ -109,3 +114,129 @@ class TestThermalUpdater:
         mock_sfp.get_presence = mock.MagicMock(return_value=False)
         updater.update_module()
         hw_management_independent_mode_update.thermal_data_clean_module.assert_called_once_with(0, 11)
+
+    @mock.patch('sonic_platform.utils.read_int_from_file', mock.MagicMock(return_value=1))
+    def test_update_module_threshold_cache(self):
+        mock_sfp = mock.MagicMock()
+        mock_sfp.sdk_index = 3
+        mock_sfp.get_presence = mock.MagicMock(return_value=True)
+        mock_sfp.get_temperature = mock.MagicMock(return_value=50.0)
+        mock_sfp.get_temperature_warning_threshold = mock.MagicMock(return_value=70.0)
+        mock_sfp.get_temperature_critical_threshold = mock.MagicMock(return_value=80.0)
+        updater = ThermalUpdater([mock_sfp])
+        updater.update_module()
+        updater.update_module()
+        assert mock_sfp.get_temperature.call_count == 2
+        assert mock_sfp.get_temperature_warning_threshold.call_count == 1
+        assert mock_sfp.get_temperature_critical_threshold.call_count == 1
+        assert updater.last_module_update_duration is not None
+
+        # Presence change drops the cached thresholds
+        mock_sfp.get_presence.return_value = False
+        updater.update_module()
+        mock_sfp.get_presence.return_value = True
+        hw_management_independent_mode_update.reset_mock()
+        updater.update_module()
+        assert mock_sfp.get_temperature_warning_threshold.call_count == 2
+        hw_management_independent_mode_update.thermal_data_set_module.assert_called_once_with(0, 4, 50000, 80000, 70000, 0)
+
+    @mock.patch('sonic_platform.utils.read_int_from_file', mock.MagicMock(return_value=1))
+    def test_update_module_threshold_cache_swap(self):
+        mock_sfp = mock.MagicMock()
+        mock_sfp.sdk_index = 3
+        mock_sfp.get_presence = mock.MagicMock(return_value=True)
+        mock_sfp.get_serial = mock.MagicMock(return_value='MT2001A00001')
+        mock_sfp.get_temperature = mock.MagicMock(return_value=50.0)
+        mock_sfp.get_temperature_warning_threshold = mock.MagicMock(return_value=70.0)
+        mock_sfp.get_temperature_critical_threshold = mock.MagicMock(return_value=80.0)
+        updater = ThermalUpdater([mock_sfp])
+        updater.update_module()
+        updater.update_module()
+        assert mock_sfp.get_temperature_warning_threshold.call_count == 1
+
+        # Module swapped between two polls, presence never seen down
+        mock_sfp.get_serial.return_value = 'MT2001A00002'
+        mock_sfp.get_temperature_warning_threshold.return_value = 75.0
+        mock_sfp.get_temperature_critical_threshold.return_value = 85.0
+        hw_management_independent_mode_update.reset_mock()
+        updater.update_module()
+        assert mock_sfp.get_temperature_warning_threshold.call_count == 2
+        hw_management_independent_mode_update.thermal_data_set_module.assert_called_once_with(0, 4, 50000, 85000, 75000, 0)
+
+        # Serial number not readable, thresholds are not cached
+        mock_sfp.get_serial.side_effect = Exception('EEPROM not readable')
+        updater.update_module()
+        updater.update_module()
+        assert mock_sfp.get_temperature_warning_threshold.call_count == 4
+
+    @mock.patch('sonic_platform.utils.read_int_from_file', mock.MagicMock(return_value=1))
+    @mock.patch('sonic_platform.sfp.SFP._get_sfp_type_str', mock.MagicMock(return_value='cmis'))
+    @mock.patch('sonic_platform.sfp.SFP._get_eeprom_path', mock.MagicMock(return_value='/tmp/mock_eeprom'))
+    @mock.patch('sonic_platform.sfp.time.monotonic', mock.MagicMock(return_value=100))
+    def test_update_module_threshold_cache_swap_eeprom_cache(self):
+        sfp = SFP(0)
+        mock_page = os.path.join('/tmp/mock_eeprom', SFP_PAGE0_PATH)
+        os.makedirs(os.path.dirname(mock_page), exist_ok=True)
+        with open(mock_page, 'wb') as f:
+            f.write(bytes([0x18] + [0] * 165) + b'MT2001A00001    ' + bytes(74))
+
+        # The serial number is read through the SFP EEPROM cache
+        sfp.get_presence = mock.MagicMock(return_value=True)
+        sfp.get_serial = mock.MagicMock(side_effect=lambda: sfp.read_eeprom(166, 16).decode().strip())
+        sfp.get_temperature = mock.MagicMock(return_value=50.0)
+        sfp.get_temperature_warning_threshold = mock.MagicMock(return_value=70.0)
+        sfp.get_temperature_critical_threshold = mock.MagicMock(return_value=80.0)
+        updater = ThermalUpdater([sfp])
+        updater.update_module()
+        updater.update_module()
+        assert sfp.get_temperature_warning_threshold.call_count == 1
+
+        # Module swapped within the identity check interval of the EEPROM cache
+        with open(mock_page, 'r+b') as f:
+            f.seek(166)
+            f.write(b'MT2001A00002    ')
+        sfp.get_temperature_warning_threshold.return_value = 75.0
+        sfp.get_temperature_critical_threshold.return_value = 85.0
+        hw_management_independent_mode_update.reset_mock()
+        updater.update_module()
+        assert sfp.get_serial() == 'MT2001A00002'
+        assert sfp.get_temperature_warning_threshold.call_count == 2
+        hw_management_independent_mode_update.thermal_data_set_module.assert_called_once_with(0, 1, 50000, 85000, 75000, 0)
+        os.remove(mock_page)
+
+    @mock.patch('sonic_platform.utils.read_int_from_file', mock.MagicMock(return_value=0))
+    def test_update_module_absent_in_sysfs(self):
+        mock_sfp = mock.MagicMock()
+        mock_sfp.sdk_index = 5
+        updater = ThermalUpdater([mock_sfp])
+        hw_management_independent_mode_update.reset_mock()
+        updater.update_module()
+        mock_sfp.get_presence.assert_not_called()
+        hw_management_independent_mode_update.thermal_data_clean_module.assert_called_once_with(0, 6)
+
+    @mock.patch('sonic_platform.thermal_updater.MODULE_READ_TIMEOUT', 0.2)
+    @mock.patch('sonic_platform.utils.read_int_from_file', mock.MagicMock(return_value=1))
+    def test_update_module_timeout(self):
+        release = threading.Event()
+        slow_sfp = mock.MagicMock()
+        slow_sfp.sdk_index = 0
+        slow_sfp.get_presence = mock.MagicMock(side_effect=lambda: release.wait(5))
+        fast_sfp = mock.MagicMock()
+        fast_sfp.sdk_index = 1
+        fast_sfp.get_presence = mock.MagicMock(return_value=True)
+        fast_sfp.get_temperature = mock.MagicMock(return_value=0.0)
+        updater = ThermalUpdater([slow_sfp, fast_sfp])
+        hw_management_independent_mode_update.reset_mock()
+        updater.update_module()
+        hw_management_independent_mode_update.thermal_data_set_module.assert_has_calls([
+            mock.call(0, 2, 0, 0, 0, 0),
+            mock.call(0, 1, 0, 0, 0, thermal_updater.ERROR_READ_THERMAL_DATA)
+        ], any_order=True)
+
+        # The read is still stuck, it is not submitted again
+        hw_management_independent_mode_update.reset_mock()
+        updater.update_module()
+        assert slow_sfp.get_presence.call_count == 1
+        release.set()
+        with mock.patch('sonic_platform.utils.write_file'):
+            updater.stop()
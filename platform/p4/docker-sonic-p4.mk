@@ -24,7 +24,7 @@ $(DOCKER_SONIC_P4)_DEPENDS += $(QUAGGA)
 # endif
 
 $(DOCKER_SONIC_P4)_FILES += $(CONFIGDB_LOAD_SCRIPT) \
-                            $(ARP_UPDATE_SCRIPT) \
+                            $(ARP_UPDATE_SHELL_SCRIPT) \
                             $(ARP_UPDATE_VARS_TEMPLATE)
 
 $(DOCKER_SONIC_P4)_LOAD_DOCKERS += $(DOCKER_CONFIG_ENGINE)
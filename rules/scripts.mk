@@ -2,6 +2,10 @@
 ARP_UPDATE_SCRIPT = arp_update
 $(ARP_UPDATE_SCRIPT)_PATH = files/scripts
 
+# Shell arp_update for the dockers without pyroute2
+ARP_UPDATE_SHELL_SCRIPT = arp_update.sh
+$(ARP_UPDATE_SHELL_SCRIPT)_PATH = files/scripts
+
 ARP_UPDATE_VARS_TEMPLATE = arp_update_vars.j2
 $(ARP_UPDATE_VARS_TEMPLATE)_PATH = files/build_templates
 
@@ -37,6 +41,7 @@ $(RSYSLOG_PLUGIN_CONF_J2)_PATH = files/build_templates
 
 SONIC_COPY_FILES += $(CONFIGDB_LOAD_SCRIPT) \
                     $(ARP_UPDATE_SCRIPT) \
+                    $(ARP_UPDATE_SHELL_SCRIPT) \
                     $(ARP_UPDATE_VARS_TEMPLATE) \
                     $(BUFFERS_CONFIG_TEMPLATE) \
                     $(QOS_CONFIG_TEMPLATE) \
@@ -2,19 +2,78 @@
 
 import argparse
 import hashlib
+import json
 import os
 import shutil
 import subprocess
 import sys
+import time
 
 from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
 from functools import cached_property
 
 DRY_RUN = False
+HASH_CHUNK_SIZE = 1024 * 1024
+
 def enable_dry_run(enabled):
     global DRY_RUN # pylint: disable=global-statement
     DRY_RUN = enabled
 
+def hash_file(path):
+    h = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        while True:
+            chunk = f.read(HASH_CHUNK_SIZE)
+            if not chunk:
+                break
+            h.update(chunk)
+    return h.hexdigest()
+
+class HashCache:
+    """Checksums of previous runs, keyed on (dev, inode, ctime, mtime, size)"""
+    def __init__(self, path):
+        self.path = path
+        self.entries = {}
+        self.used = {}
+        if path and os.path.exists(path):
+            try:
+                with open(path) as f:
+                    self.entries = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f'ignoring hash cache {path}: {e}')
+
+    @staticmethod
+    def key(st):
+        # inodes are reused and mtimes preserved when the rootfs is extracted again,
+        # the ctime can't be set back
+        return f'{st.st_dev}:{st.st_ino}:{st.st_ctime_ns}:{st.st_mtime_ns}:{st.st_size}'
+
+    def get(self, f):
+        checksum = self.entries.get(self.key(f.stats))
+        if checksum is not None:
+            self.used[f.path] = checksum
+        return checksum
+
+    def set(self, f, checksum):
+        self.used[f.path] = checksum
+
+    def save(self):
+        if not self.path or DRY_RUN:
+            return
+        # only keep the entries of this run, stale inodes would pile up otherwise.
+        # hardlinking changes the ctime, so the files are keyed on their current stats
+        entries = {}
+        for path, checksum in self.used.items():
+            try:
+                entries[self.key(os.stat(path))] = checksum
+            except OSError:
+                pass
+        tmp = f'{self.path}.tmp'
+        with open(tmp, 'w') as f:
+            json.dump(entries, f)
+        os.replace(tmp, self.path)
+
 class File:
     def __init__(self, path):
         self.path = path
@@ -51,18 +110,28 @@ class File:
     def size(self):
         return self.stats.st_size
 
+    @cached_property
+    def inode(self):
+        return (self.stats.st_dev, self.stats.st_ino)
+
     @cached_property
     def checksum(self):
-        with open(self.path, 'rb') as f:
-            return hashlib.md5(f.read()).hexdigest()
+        return hash_file(self.path)
 
 class FileManager:
-    def __init__(self, path):
+    def __init__(self, path, jobs=None, hash_cache=None):
         self.path = path
+        self.jobs = jobs or os.cpu_count()
+        self.hash_cache = hash_cache or HashCache(None)
         self.files = []
         self.folders = []
         self.nindex = defaultdict(list)
         self.cindex = defaultdict(list)
+        self.hashed_files = 0
+        self.hashed_bytes = 0
+        self.cache_hits = 0
+        self.linked_files = 0
+        self.saved_bytes = 0
 
     def add_file(self, path):
         if not os.path.isfile(path) or os.path.islink(path):
@@ -79,11 +148,46 @@ class FileManager:
                 self.add_file(os.path.join(root, f))
         print(f'loaded {len(self.files)} files and {len(self.folders)} folders')
 
+    def compute_checksums(self, files):
+        """Set the checksum of files, hashing each inode once"""
+        inodes = defaultdict(list)
+        for f in files:
+            inodes[f.inode].append(f)
+
+        pending = []
+        for same in inodes.values():
+            checksum = self.hash_cache.get(same[0])
+            if checksum is None:
+                pending.append(same)
+            else:
+                self.cache_hits += 1
+                for f in same:
+                    f.checksum = checksum
+
+        paths = [same[0].path for same in pending]
+        if self.jobs > 1 and len(paths) > 1:
+            with ProcessPoolExecutor(max_workers=self.jobs) as executor:
+                checksums = list(executor.map(hash_file, paths,
+                                              chunksize=max(1, len(paths) // (self.jobs * 4))))
+        else:
+            checksums = [hash_file(path) for path in paths]
+
+        for same, checksum in zip(pending, checksums):
+            self.hash_cache.set(same[0], checksum)
+            self.hashed_files += 1
+            self.hashed_bytes += same[0].size
+            for f in same:
+                f.checksum = checksum
+
     def generate_index(self):
-        print('Computing file hashes')
+        # only files sharing their name and size with another one can be hardlinked
         for f in self.files:
-            self.nindex[f.name].append(f)
-            self.cindex[(f.name, f.checksum)].append(f)
+            self.nindex[(f.name, f.size)].append(f)
+        candidates = [f for files in self.nindex.values() if len(files) > 1 for f in files]
+        print(f'Computing file hashes of {len(candidates)} candidates out of {len(self.files)} files')
+        self.compute_checksums(candidates)
+        for f in candidates:
+            self.cindex[(f.name, f.size, f.checksum)].append(f)
 
     def create_hardlinks(self):
         print('Creating hard links')
@@ -91,12 +195,23 @@ class FileManager:
             if len(files) <= 1:
                 continue
             orig = files[0]
+            inodes = defaultdict(list)
             for f in files[1:]:
-                f.hardlink(orig)
+                if f.inode != orig.inode:
+                    inodes[f.inode].append(f)
+            for same in inodes.values():
+                # the space is only freed once every link to the inode is replaced
+                if same[0].stats.st_nlink <= len(same):
+                    self.saved_bytes += same[0].size
+                for f in same:
+                    f.hardlink(orig)
+                    self.linked_files += 1
 
 class FsRoot:
-    def __init__(self, path):
+    def __init__(self, path, jobs=None, hash_cache=None):
         self.path = path
+        self.jobs = jobs
+        self.hash_cache = hash_cache
 
     def iter_fsroots(self):
         yield self.path
@@ -140,10 +255,14 @@ class FsRoot:
         ])
 
     def hardlink_under(self, path):
-        fm = FileManager(os.path.join(self.path, path))
+        start = time.monotonic()
+        fm = FileManager(os.path.join(self.path, path), self.jobs, self.hash_cache)
         fm.load_tree()
         fm.generate_index()
         fm.create_hardlinks()
+        print(f'hardlinked {fm.linked_files} files under {path} in {time.monotonic() - start:.2f}s, '
+              f'hashed {fm.hashed_files} files ({fm.hashed_bytes} bytes), '
+              f'{fm.cache_hits} hash cache hits, saved {fm.saved_bytes} bytes')
 
     def remove_platforms(self, filter_func):
         devpath = os.path.join(self.path, 'usr/share/sonic/device')
@@ -205,6 +324,10 @@ def parse_args(args):
         help="show space statistics")
     parser.add_argument('--hardlinks', action='append',
         help="path where similar files need to be hardlinked")
+    parser.add_argument('-j', '--jobs', type=int, default=None,
+        help="number of processes hashing files (default: cpu count)")
+    parser.add_argument('--hash-cache', default=None,
+        help="file keeping the file hashes for the next runs")
     parser.add_argument('--remove-docs', action='store_true',
         help="remove documentation")
     parser.add_argument('--remove-licenses', action='store_true',
@@ -222,7 +345,8 @@ def main(args):
 
     enable_dry_run(args.dry_run)
 
-    fs = FsRoot(args.fsroot)
+    hash_cache = HashCache(args.hash_cache)
+    fs = FsRoot(args.fsroot, args.jobs, hash_cache)
     if args.stats:
         begin = fs.collect_fsroot_size()
         print(f'fsroot size is {begin} bytes')
@@ -239,8 +363,9 @@ def main(args):
     if args.image_type:
         fs.specialize_image(args.image_type)
 
-    for path in args.hardlinks:
+    for path in args.hardlinks or []:
         fs.hardlink_under(path)
+    hash_cache.save()
 
     if args.stats:
         end = fs.collect_fsroot_size()
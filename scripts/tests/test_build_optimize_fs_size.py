@@ -0,0 +1,91 @@
+import importlib.util
+import os
+import time
+
+import pytest
+
+scripts_path = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location('build_optimize_fs_size',
+                                              os.path.join(scripts_path, 'build-optimize-fs-size.py'))
+fs_size = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(fs_size)
+
+
+def write(path, data):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w') as f:
+        f.write(data)
+
+
+def rewrite_in_place(path, data):
+    """Change the content of a file, keeping its inode, size and mtime like a recreated tree"""
+    st = os.stat(path)
+    # let the ctime move past the one of the cached entry
+    time.sleep(0.05)
+    with open(path, 'r+') as f:
+        f.write(data)
+    os.utime(path, ns=(st.st_atime_ns, st.st_mtime_ns))
+    new = os.stat(path)
+    assert (new.st_ino, new.st_mtime_ns, new.st_size) == (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+def hardlink_tree(path, cache_path):
+    hash_cache = fs_size.HashCache(cache_path)
+    fm = fs_size.FileManager(path, jobs=1, hash_cache=hash_cache)
+    fm.load_tree()
+    fm.generate_index()
+    fm.create_hardlinks()
+    hash_cache.save()
+    return fm
+
+
+def test_hardlink_same_files(tmp_path):
+    write(str(tmp_path / 'x/f'), 'PP')
+    write(str(tmp_path / 'y/f'), 'PP')
+    write(str(tmp_path / 'z/f'), 'QQ')
+    fm = hardlink_tree(str(tmp_path), None)
+    assert fm.linked_files == 1
+    assert os.stat(tmp_path / 'x/f').st_ino == os.stat(tmp_path / 'y/f').st_ino
+    assert os.stat(tmp_path / 'x/f').st_ino != os.stat(tmp_path / 'z/f').st_ino
+
+
+def test_hash_cache_hits(tmp_path):
+    cache = str(tmp_path / 'cache.json')
+    write(str(tmp_path / 'root/x/f'), 'PP')
+    write(str(tmp_path / 'root/y/f'), 'PP')
+    write(str(tmp_path / 'root/z/f'), 'QQ')
+    hardlink_tree(str(tmp_path / 'root'), cache)
+
+    # hardlinking changed the ctime of the linked inode, the cache is keyed on the stats after the run
+    fm = hardlink_tree(str(tmp_path / 'root'), cache)
+    assert fm.hashed_files == 0
+    assert fm.cache_hits == 2
+
+
+def test_hash_cache_recreated_tree(tmp_path):
+    cache = str(tmp_path / 'cache.json')
+    root = str(tmp_path / 'root')
+    write(os.path.join(root, 'x/f'), 'PP')
+    write(os.path.join(root, 'y/f'), 'PP')
+    write(os.path.join(root, 'x/g'), 'RR')
+    write(os.path.join(root, 'y/g'), 'RR')
+    # checksums cached without linking the files
+    hash_cache = fs_size.HashCache(cache)
+    fm = fs_size.FileManager(root, jobs=1, hash_cache=hash_cache)
+    fm.load_tree()
+    fm.generate_index()
+    hash_cache.save()
+
+    # tree extracted again: same inodes, sizes and mtimes, other contents
+    rewrite_in_place(os.path.join(root, 'y/f'), 'QQ')
+    rewrite_in_place(os.path.join(root, 'y/g'), 'SS')
+
+    fm = hardlink_tree(root, cache)
+    assert fm.linked_files == 0
+    # only the rewritten files are hashed again
+    assert fm.hashed_files == 2
+    assert fm.cache_hits == 2
+    with open(os.path.join(root, 'y/f')) as f:
+        assert f.read() == 'QQ'
+    with open(os.path.join(root, 'y/g')) as f:
+        assert f.read() == 'SS'
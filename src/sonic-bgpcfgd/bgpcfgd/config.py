@@ -1,23 +1,65 @@
+import time
+
+from .log import log_debug
+from .running_config import RunningConfigIndex, RunningConfigEditor
+
+
 class ConfigMgr(object):
-    """ The class represents frr configuration """
-    def __init__(self, frr):
+    """ The class represents frr configuration
+        The running configuration read from FRR is cached. Changes committed
+        by bgpcfgd are applied onto the cached copy, so it is only read from
+        FRR again when a commit failed, when a committed change couldn't be
+        applied locally, or when it is older than resync_interval seconds.
+    """
+    RESYNC_INTERVAL = 300
+
+    def __init__(self, frr, resync_interval=RESYNC_INTERVAL):
         self.frr = frr
-        self.current_config = None
+        self.resync_interval = resync_interval
         self.current_config_raw = None
         self.changes = ""
         self.peer_groups_to_restart = []
+        self.synced_at = None
+        self.canonical = None
+        self.index = None
+
+    @property
+    def current_config(self):
+        """ The cached running configuration in canonical format """
+        if self.current_config_raw is None:
+            return None
+        if self.canonical is None:
+            self.canonical = self.to_canonical("\n".join(self.current_config_raw))
+        return self.canonical
 
     def reset(self):
         """ Reset stored config """
-        self.current_config = None
-        self.current_config_raw = None
+        self.set_text(None)
+        self.reset_changes()
+
+    def reset_changes(self):
+        """ Drop the changes which weren't committed """
         self.changes = ""
         self.peer_groups_to_restart = []
 
-    def update(self):
-        """ Read current config from FRR """
-        self.current_config = None
-        self.current_config_raw = None
+    def set_text(self, text):
+        self.current_config_raw = text
+        self.canonical = None
+        self.index = None
+
+    def invalidate(self):
+        """ Read the running configuration from FRR on the next update() """
+        self.synced_at = None
+
+    def update(self, force=False):
+        """
+        Make the current config available. It's read from FRR only if the cached copy isn't valid
+        :param force: read the config from FRR even if the cached copy is valid
+        """
+        if not force and self.current_config_raw is not None and self.synced_at is not None \
+                and time.time() - self.synced_at < self.resync_interval:
+            return
+        self.set_text(None)
         out = self.frr.get_config()
         text = []
         for line in out.split('\n'):
@@ -25,8 +67,8 @@ class ConfigMgr(object):
                 continue
             text.append(line)
         text += ["     "]  # Add empty line to have something to work on, if there is no text
-        self.current_config_raw = text
-        self.current_config = self.to_canonical(out)  # FIXME: use text as an input
+        self.set_text(text)
+        self.synced_at = time.time()
 
     def push_list(self, cmdlist):
         """
@@ -50,21 +92,40 @@ class ConfigMgr(object):
         """
         self.peer_groups_to_restart.extend(peer_groups)
 
+    def has_changes(self):
+        """ Return True if there are changes which weren't committed yet """
+        return self.changes.strip() != ""
+
     def commit(self):
         """
         Write configuration change to FRR.
         :return: True if change was applied successfully, False otherwise
         """
-        if self.changes.strip() == "":
+        if not self.has_changes():
             return True
         rc_write = self.frr.write(self.changes)
         rc_restart = self.frr.restart_peer_groups(self.peer_groups_to_restart)
-        self.reset()
+        if rc_write and self.current_config_raw is not None and self.synced_at is not None:
+            text = RunningConfigEditor(self.current_config_raw).apply(self.changes)
+            if text is None:
+                log_debug("ConfigMgr::commit(): changes can't be applied to the cached config. It will be read from FRR")
+                self.invalidate()
+            else:
+                self.set_text(text + ["     "])
+        else:
+            self.invalidate()
+        self.reset_changes()
         return rc_write and rc_restart
 
     def get_text(self):
         return self.current_config_raw
 
+    def get_index(self):
+        """ Return a RunningConfigIndex of the current config """
+        if self.index is None:
+            self.index = RunningConfigIndex(self.current_config_raw or [])
+        return self.index
+
     @staticmethod
     def to_canonical(raw_config):
         """
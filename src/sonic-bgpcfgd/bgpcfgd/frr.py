@@ -6,6 +6,23 @@ import tempfile
 from bgpcfgd.log import log_err, log_info, log_warn, log_crit
 from .vars import g_debug
 from .utils import run_command
+from .vty import get_vty_pool
+
+
+def run_vtysh(commands):
+    """
+    Run bgpd commands through the persistent bgpd vty connection.
+    Use the vtysh binary when the vty socket isn't available.
+    :param commands: list of commands
+    :return: Tuple: integer exit code, stdout as a string, stderr as a string
+    """
+    result = get_vty_pool().run(commands, daemon='bgpd')
+    if result is not None:
+        return result
+    command = ["vtysh"]
+    for cmd in commands:
+        command += ["-c", cmd]
+    return run_command(command)
 
 
 class FRR(object):
@@ -57,12 +74,19 @@ class FRR(object):
     @staticmethod
     def restart_peer_groups(peer_groups):
         """ Restart peer-groups which support BBR
+        All peer-groups are restarted by a single batch of commands. If it fails,
+        the peer-groups are restarted one by one to find out which ones failed.
         :param peer_groups: List of peer_groups to restart
         :return: True if restart of all peer-groups was successful, False otherwise
         """
+        peer_groups = sorted(set(peer_groups))
+        if len(peer_groups) > 1:
+            rc, _, _ = run_vtysh(["clear bgp peer-group %s soft in" % peer_group for peer_group in peer_groups])
+            if rc == 0:
+                return True
         res = True
-        for peer_group in sorted(peer_groups):
-            rc, out, err = run_command(["vtysh", "-c", "clear bgp peer-group %s soft in" % peer_group])
+        for peer_group in peer_groups:
+            rc, out, err = run_vtysh(["clear bgp peer-group %s soft in" % peer_group])
             if rc != 0:
                 log_value = peer_group, rc, out, err
                 log_crit("Can't restart bgp peer-group '%s'. rc='%d', out='%s', err='%s'" % log_value)
@@ -37,11 +37,13 @@ def do_work():
     frr = FRR(["bgpd", "zebra", "staticd"])
     frr.wait_for_daemons(seconds=20)
     #
+    constants = read_constants()
+    bgpcfgd_cfg = constants.get('bgp', {}).get('bgpcfgd', {})
     common_objs = {
         'directory': Directory(),
-        'cfg_mgr':   ConfigMgr(frr),
+        'cfg_mgr':   ConfigMgr(frr, bgpcfgd_cfg.get('running_config_resync_s', ConfigMgr.RESYNC_INTERVAL)),
         'tf':        TemplateFabric(),
-        'constants': read_constants(),
+        'constants': constants,
     }
     managers = [
         # Config DB managers
@@ -80,7 +82,9 @@ def do_work():
     if device_info.is_chassis():
         managers.append(ChassisAppDbMgr(common_objs, "CHASSIS_APP_DB", "BGP_DEVICE_GLOBAL"))
 
-    runner = Runner(common_objs['cfg_mgr'])
+    runner = Runner(common_objs['cfg_mgr'],
+                    batch_window=bgpcfgd_cfg.get('batch_window_ms', 0),
+                    batch_max_latency=bgpcfgd_cfg.get('batch_max_latency_ms', 0))
     for mgr in managers:
         runner.add_manager(mgr)
     runner.run()
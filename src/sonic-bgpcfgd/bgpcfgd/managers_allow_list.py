@@ -332,20 +332,12 @@ class BGPAllowListMgr(Manager):
         """
         assert af == self.V4 or af == self.V6
         family = self.__af_to_family(af)
-        match_string = '%s prefix-list %s seq ' % (family, pl_name)
-        conf = self.cfg_mgr.get_text()
-        if not any(line.strip().startswith(match_string) for line in conf):
+        config_list = self.cfg_mgr.get_index().get_prefix_list(family, pl_name)
+        if not config_list:
             return False, False  # if the prefix list is not exists, it is not correct
         expect_set = set(self.__normalize_ipnetwork(af, constant_list))
         expect_set.update(set(self.__normalize_ipnetwork(af, allow_list)))
 
-        config_list = []
-        for line in conf:
-            if line.startswith(match_string):
-                found = line[len(match_string):].strip().split(' ')
-                rule = " ".join(found[1:])
-                config_list.append(rule)
-
         # Return double Ture, when running configuraiton is identical with config db + constants.
         return True, expect_set == set(self.__normalize_ipnetwork(af, config_list))
 
@@ -398,13 +390,10 @@ class BGPAllowListMgr(Manager):
                           Second element: community value if the first element is True no value otherwise
         """
         log_debug("BGPAllowListMgr::__is_community_presented. community='%s'" % community_name)
-        match_string = 'bgp community-list standard %s permit ' % community_name
-        conf = self.cfg_mgr.get_text()
-        found = [line.strip() for line in conf if line.strip().startswith(match_string)]
+        found = self.cfg_mgr.get_index().get_community_list(community_name)
         if not found:
             return False, None
-        community_value = found[0].replace(match_string, '')
-        return True, community_value
+        return True, found[0]
 
     def __update_allow_route_map_entry(self, af, allow_address_pl_name, community_name, route_map_name):
         """
@@ -460,23 +449,15 @@ class BGPAllowListMgr(Manager):
         :return: a community value used for default action
         """
         log_debug("BGPAllowListMgr::__parse_default_action_route_map_entries. rm='%s'" % route_map_name)
-        match_string = 'route-map %s permit 65535' % route_map_name
         match_community = re.compile(r'^set community (\S+) additive$')
-        inside_route_map = False
         community_value = ""
-        conf = self.cfg_mgr.get_text()
-        for line in conf + [""]:
-            s_line = line.strip()
-            if inside_route_map:
-                matched = match_community.match(s_line)
-                if matched:
-                    community_value = matched.group(1)
-                    break
-                else:
-                    log_err("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=65535" % route_map_name)
-                inside_route_map = False
-            elif s_line == match_string:
-                inside_route_map = True
+        action, entry_lines = self.cfg_mgr.get_index().get_route_map(route_map_name).get(65535, (None, []))
+        if action == 'permit':
+            matched = match_community.match(entry_lines[0]) if entry_lines else None
+            if matched:
+                community_value = matched.group(1)
+            else:
+                log_err("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=65535" % route_map_name)
         if community_value == "":
             log_err("BGPAllowListMgr::Default action community value is not found. route-map '%s' entry. seq_no=65535" % route_map_name)
         return community_value
@@ -526,44 +507,29 @@ class BGPAllowListMgr(Manager):
         """
         assert af == self.V4 or af == self.V6
         log_debug("BGPAllowListMgr::__parse_allow_route_map_entries. af='%s', rm='%s'" % (af, route_map_name))
-        match_string = 'route-map %s permit ' % route_map_name
         entries = {}
-        inside_route_map = False
-        route_map_seq_number = None
-        pl_allow_list_name = None
-        community_name = self.EMPTY_COMMUNITY
         if af == self.V4:
             match_pl_allow_list = 'match ip address prefix-list '
         else:  # self.V6
             match_pl_allow_list = 'match ipv6 address prefix-list '
         match_community = 'match community '
-        conf = self.cfg_mgr.get_text()
-        for line in conf + [""]:
-            if inside_route_map:
-                if line.strip().startswith(match_pl_allow_list):
-                    pl_allow_list_name = line.strip()[len(match_pl_allow_list):]
-                    continue
-                elif line.strip().startswith(match_community):
-                    community_name = line.strip()[len(match_community):]
-                    continue
-                else:
-                    if pl_allow_list_name is not None:
-                        entries[route_map_seq_number] = {
-                            'pl_allow_list': pl_allow_list_name,
-                            'community': community_name,
-                        }
-                    else:
-                        if route_map_seq_number != 65535:
-                            log_warn("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=%d" % (route_map_name, route_map_seq_number))
-                    inside_route_map = False
-                    pl_allow_list_name = None
-                    community_name = self.EMPTY_COMMUNITY
-                    route_map_seq_number = None
-            if line.startswith(match_string):
-                found = line[len(match_string):]
-                assert found.isdigit()
-                route_map_seq_number = int(found)
-                inside_route_map = True
+        for route_map_seq_number, (action, entry_lines) in self.cfg_mgr.get_index().get_route_map(route_map_name).items():
+            if action != 'permit':
+                continue
+            pl_allow_list_name = None
+            community_name = self.EMPTY_COMMUNITY
+            for line in entry_lines:
+                if line.startswith(match_pl_allow_list):
+                    pl_allow_list_name = line[len(match_pl_allow_list):]
+                elif line.startswith(match_community):
+                    community_name = line[len(match_community):]
+            if pl_allow_list_name is not None:
+                entries[route_map_seq_number] = {
+                    'pl_allow_list': pl_allow_list_name,
+                    'community': community_name,
+                }
+            elif route_map_seq_number != 65535:
+                log_warn("BGPAllowListMgr::Found incomplete route-map '%s' entry. seq_no=%d" % (route_map_name, route_map_seq_number))
         return entries
 
     @staticmethod
@@ -597,14 +563,7 @@ class BGPAllowListMgr(Manager):
         Extract names of all peer-groups defined in the config
         :return: list of peer-group names
         """
-        # Find all peer-groups entries
-        re_peer_group = re.compile(r'^\s*neighbor (\S+) peer-group$')
-        peer_groups = []
-        for line in self.cfg_mgr.get_text():
-            result = re_peer_group.match(line)
-            if result:
-                peer_groups.append(result.group(1))
-        return peer_groups
+        return list(self.cfg_mgr.get_index().get_peer_groups())
 
     def __get_peer_group_to_route_map(self, peer_groups):
         """
@@ -613,14 +572,12 @@ class BGPAllowListMgr(Manager):
         :return: dictionary where key is a peer-group, value is a route-map name which is defined as route-map in
                  for the peer_group.
         """
+        index = self.cfg_mgr.get_index()
         pg_2_rm = {}
         for pg in peer_groups:
-            re_peer_group_rm = re.compile(r'^\s*neighbor %s route-map (\S+) in$' % pg)
-            for line in self.cfg_mgr.get_text():
-                result = re_peer_group_rm.match(line)
-                if result:
-                    pg_2_rm[pg] = result.group(1)
-                    break
+            route_map = index.get_neighbor_route_map_in(pg)
+            if route_map is not None:
+                pg_2_rm[pg] = route_map
         return pg_2_rm
 
     def __get_route_map_calls(self, rms):
@@ -629,24 +586,16 @@ class BGPAllowListMgr(Manager):
         :rms: a set with route-map names
         :return: a dictionary: key - name of a route-map, value - name of a route-map call defined for the route-map
         """
+        index = self.cfg_mgr.get_index()
         rm_2_call = {}
-        re_rm = re.compile(r'^route-map (\S+) permit \d+$')
-        re_call = re.compile(r'^\s*call (\S+)$')
-        inside_name = None
-        for line in self.cfg_mgr.get_text():
-            if inside_name:
-                inside_result = re_call.match(line)
-                if inside_result:
-                    rm_2_call[inside_name] = inside_result.group(1)
-                    inside_name = None
+        for name in rms:
+            for action, entry_lines in index.get_route_map(name).values():
+                if action != 'permit':
                     continue
-            result = re_rm.match(line)
-            if not result:
-                continue
-            inside_name = None
-            if result.group(1) not in rms:
-                continue
-            inside_name = result.group(1)
+                for line in entry_lines:
+                    if line.startswith('call '):
+                        rm_2_call[name] = line.split()[1]
+                        break
         return rm_2_call
 
     def __get_routemap_tag(self):
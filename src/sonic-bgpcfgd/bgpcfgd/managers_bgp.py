@@ -8,6 +8,7 @@ from .log import log_warn, log_err, log_info, log_debug, log_crit
 from .manager import Manager
 from .template import TemplateFabric
 from .utils import run_command
+from .vty import get_vty_pool
 from .managers_device_global import DeviceGlobalCfgMgr
 
 
@@ -380,14 +381,24 @@ class BGPPeerMgrBase(Manager):
         else:
             return tuple(key.split('|', 1))
 
+    @staticmethod
+    def run_vtysh(command):
+        """
+        Run a bgpd command through the persistent bgpd vty connection, or through vtysh when it isn't available
+        :return: Tuple: integer exit code, stdout as a string, stderr as a string
+        """
+        result = get_vty_pool().run([command], daemon='bgpd')
+        if result is not None:
+            return result
+        return run_command(["vtysh", "-c", command])
+
     @staticmethod
     def load_peers():
         """
         Load peers from FRR.
         :return: set of peers, which are already installed in FRR
         """
-        command = ["vtysh", "-c", "show bgp vrfs json"]
-        ret_code, out, err = run_command(command)
+        ret_code, out, err = BGPPeerMgrBase.run_vtysh("show bgp vrfs json")
         if ret_code == 0:
             js_vrf = json.loads(out)
             vrfs = js_vrf['vrfs'].keys()
@@ -396,8 +407,7 @@ class BGPPeerMgrBase(Manager):
             raise Exception("Can't read bgp vrfs: %s" % err)
         peers = set()
         for vrf in vrfs:
-            command = ["vtysh", "-c", 'show bgp vrf %s neighbors json' % str(vrf)]
-            ret_code, out, err = run_command(command)
+            ret_code, out, err = BGPPeerMgrBase.run_vtysh('show bgp vrf %s neighbors json' % str(vrf))
             if ret_code == 0:
                 js_bgp = json.loads(out)
                 for nbr in js_bgp.keys():
@@ -1,4 +1,6 @@
-from collections import defaultdict
+import time
+
+from collections import defaultdict, OrderedDict
 from swsscommon import swsscommon
 
 from .log import log_debug, log_crit
@@ -17,16 +19,42 @@ class Runner(object):
     """ Implements main io-loop of the application
         It will run event handlers inside of Manager objects
         when corresponding db/table is updated
+
+        Events are accumulated for up to batch_window ms after the last
+        received event, but never longer than batch_max_latency ms after
+        the first pending one. Pending events are coalesced per key, but
+        never across a DEL: a DEL followed by a SET of the same key is
+        delivered as both, so the handlers recreate the object instead of
+        updating it. Events are delivered in the order they were received.
+        All FRR changes the handlers produce for a batch are committed at once.
     """
     SELECT_TIMEOUT = 1000
 
-    def __init__(self, cfg_manager):
-        """ Constructor """
+    def __init__(self, cfg_manager, batch_window=0, batch_max_latency=0):
+        """
+        Constructor
+        :param cfg_manager: ConfigMgr object which receives the FRR changes
+        :param batch_window: quiet period in ms which closes a batch. 0 disables batching
+        :param batch_max_latency: max time in ms an event is kept pending
+        """
         self.cfg_manager = cfg_manager
+        self.batch_window = batch_window
+        self.batch_max_latency = max(batch_max_latency, batch_window)
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
         self.subscribers = set()
+        self.pending = OrderedDict()  # seq -> ((db, table, key), op, data)
+        self.pending_keys = {}  # (db, table, key) -> seqs of its pending events, at most [DEL, SET]
+        self.seq = 0
+        self.batch_start = None
+        self.last_event = None
+        self.counters = {
+            'events_in': 0,
+            'coalesced': 0,
+            'batches': 0,
+            'commits': 0,
+        }
 
     def add_manager(self, manager):
         """
@@ -51,23 +79,82 @@ class Runner(object):
             self.selector.addSelectable(subscriber)
         self.callbacks[db][table_name].append(manager.handler)
 
+    def get_counters(self):
+        """ Return a copy of the event and commit counters """
+        return dict(self.counters)
+
     def run(self):
         """ Main loop """
         while g_run:
-            state, _ = self.selector.select(Runner.SELECT_TIMEOUT)
-            if state == self.selector.TIMEOUT:
-                continue
-            elif state == self.selector.ERROR:
+            state, _ = self.selector.select(self.select_timeout())
+            if state == self.selector.ERROR:
                 raise Exception("Received error from select")
+            elif state != self.selector.TIMEOUT:
+                self.read_events()
+            if self.pending and self.batch_ready():
+                self.flush()
+
+    def read_events(self):
+        """ Move all available events of the subscribers into the pending batch """
+        now = time.time()
+        for subscriber in self.subscribers:
+            while True:
+                key, op, fvs = subscriber.pop()
+                if not key:
+                    break
+                log_debug("Received message : '%s'" % str((key, op, fvs)))
+                self.add_event(subscriber.getDbConnector().getDbId(), subscriber.getTableName(), key, op, dict(fvs), now)
+
+    def add_event(self, db, table_name, key, op, data, now):
+        """
+        Add an event to the pending batch. A pending SET of the same key
+        is replaced: the last SET wins and a DEL cancels a pending SET.
+        A SET following a pending DEL is kept as a separate event, and a
+        DEL following a pending DEL is dropped.
+        """
+        self.counters['events_in'] += 1
+        event_id = (db, table_name, key)
+        seqs = self.pending_keys.setdefault(event_id, [])
+        if seqs and self.pending[seqs[-1]][1] != swsscommon.DEL_COMMAND:
+            del self.pending[seqs.pop()]
+            self.counters['coalesced'] += 1
+        if seqs and op == swsscommon.DEL_COMMAND:
+            # the key is already deleted by the pending DEL
+            self.counters['coalesced'] += 1
+        else:
+            self.seq += 1
+            self.pending[self.seq] = (event_id, op, data)
+            seqs.append(self.seq)
+        if self.batch_start is None:
+            self.batch_start = now
+        self.last_event = now
+
+    def batch_deadline(self):
+        """ Return the time when the pending batch has to be flushed """
+        return min(self.last_event + self.batch_window / 1000.0, self.batch_start + self.batch_max_latency / 1000.0)
+
+    def batch_ready(self):
+        return self.batch_window == 0 or time.time() >= self.batch_deadline()
+
+    def select_timeout(self):
+        """ Return the select timeout in ms, which ends at the deadline of the pending batch """
+        if not self.pending:
+            return Runner.SELECT_TIMEOUT
+        remaining = int(round((self.batch_deadline() - time.time()) * 1000))
+        return min(max(remaining, 0), Runner.SELECT_TIMEOUT)
 
-            for subscriber in self.subscribers:
-                while True:
-                    key, op, fvs = subscriber.pop()
-                    if not key:
-                        break
-                    log_debug("Received message : '%s'" % str((key, op, fvs)))
-                    for callback in self.callbacks[subscriber.getDbConnector().getDbId()][subscriber.getTableName()]:
-                        callback(key, op, dict(fvs))
-            rc = self.cfg_manager.commit()
-            if not rc:
-                log_crit("Runner::commit was unsuccessful")
+    def flush(self):
+        """ Deliver the pending batch to the handlers and commit the resulting FRR changes """
+        events, self.pending = self.pending, OrderedDict()
+        self.pending_keys = {}
+        self.batch_start = self.last_event = None
+        for (db, table_name, key), op, data in events.values():
+            for callback in self.callbacks[db][table_name]:
+                callback(key, op, data)
+        self.counters['batches'] += 1
+        if self.cfg_manager.has_changes():
+            self.counters['commits'] += 1
+        rc = self.cfg_manager.commit()
+        if not rc:
+            log_crit("Runner::commit was unsuccessful")
+        log_debug("Runner counters: %s" % str(self.counters))
@@ -0,0 +1,241 @@
+import re
+
+from collections import OrderedDict
+
+
+class RunningConfigIndex(object):
+    """ Indexed view of the FRR running configuration text
+        Prefix-lists, community-lists, route-maps and peer-groups are
+        collected with one pass over the text, so lookups don't need to
+        scan the whole configuration.
+    """
+    re_prefix_list = re.compile(r'^(ip|ipv6) prefix-list (\S+) seq (\d+) (.*)$')
+    re_community_list = re.compile(r'^bgp community-list standard (\S+) permit (.*)$')
+    re_route_map = re.compile(r'^route-map (\S+) (permit|deny) (\d+)$')
+    re_peer_group = re.compile(r'^\s*neighbor\s+(\S+)\s+peer-group\s*$')
+    re_neighbor_rm_in = re.compile(r'^\s*neighbor (\S+) route-map (\S+) in$')
+
+    def __init__(self, lines):
+        """
+        Build indexes from the running configuration
+        :param lines: running configuration as returned by ConfigMgr.get_text()
+        """
+        self.prefix_lists = {}       # (family, name) -> list of rules without the sequence number
+        self.community_lists = {}    # name -> list of permitted community values
+        self.route_maps = {}         # name -> OrderedDict: seq -> (action, list of stripped entry lines)
+        self.peer_groups = []
+        self.neighbor_rm_in = {}     # neighbor or peer-group -> name of the inbound route-map
+        entry_lines = None
+        for line in lines:
+            if line.startswith(' '):
+                if entry_lines is not None:
+                    entry_lines.append(line.strip())
+                m = self.re_peer_group.match(line)
+                if m:
+                    self.peer_groups.append(m.group(1))
+                    continue
+                m = self.re_neighbor_rm_in.match(line)
+                if m:
+                    self.neighbor_rm_in.setdefault(m.group(1), m.group(2))
+                continue
+            entry_lines = None
+            m = self.re_route_map.match(line)
+            if m:
+                entry_lines = []
+                self.route_maps.setdefault(m.group(1), OrderedDict())[int(m.group(3))] = (m.group(2), entry_lines)
+                continue
+            m = self.re_prefix_list.match(line)
+            if m:
+                self.prefix_lists.setdefault((m.group(1), m.group(2)), []).append(m.group(4).strip())
+                continue
+            m = self.re_community_list.match(line.strip())
+            if m:
+                self.community_lists.setdefault(m.group(1), []).append(m.group(2))
+
+    def get_prefix_list(self, family, name):
+        """
+        Return the rules of a prefix-list
+        :param family: 'ip' or 'ipv6'
+        :param name: name of the prefix-list
+        :return: list of rules, e.g. 'permit 10.0.0.0/8 le 32'. None if the prefix-list doesn't exist
+        """
+        return self.prefix_lists.get((family, name))
+
+    def get_community_list(self, name):
+        """ Return the list of values permitted by the standard community-list, None if it doesn't exist """
+        return self.community_lists.get(name)
+
+    def get_route_map(self, name):
+        """ Return the entries of a route-map as OrderedDict: seq -> (action, list of entry lines) """
+        return self.route_maps.get(name, OrderedDict())
+
+    def get_peer_groups(self):
+        """ Return the list of configured peer-groups """
+        return self.peer_groups
+
+    def get_neighbor_route_map_in(self, name):
+        """ Return the inbound route-map of a neighbor or a peer-group, None if it has no one """
+        return self.neighbor_rm_in.get(name)
+
+
+class RunningConfigEditor(object):
+    """ Applies configuration commands pushed to FRR onto the running
+        configuration text, so it can be kept without dumping it from FRR
+        after each commit.
+        Only the statements bgpcfgd pushes in a high volume are supported:
+        prefix-lists, standard community-lists and route-map entries.
+        apply() returns None for anything else, which means the running
+        configuration has to be read from FRR again.
+    """
+    re_prefix_list = re.compile(r'^(ip|ipv6) prefix-list (\S+) seq (\d+) \S.*$')
+    re_no_prefix_list = re.compile(r'^no (ip|ipv6) prefix-list (\S+)(?: seq (\d+)(?: .*)?)?$')
+    re_community_list = re.compile(r'^bgp community-list standard (\S+) (?:permit|deny) \S.*$')
+    re_no_community_list = re.compile(r'^no bgp community-list standard (\S+)(?: (?:permit|deny) \S.*)?$')
+    re_route_map = re.compile(r'^route-map (\S+) (permit|deny) (\d+)$')
+    re_no_route_map = re.compile(r'^no route-map (\S+)(?: (?:permit|deny) (\d+))?$')
+    entry_commands = ('match', 'set', 'call', 'on-match', 'description')
+
+    def __init__(self, lines):
+        self.blocks = []  # list of [top level line, list of entry lines]
+        for line in lines:
+            if line.startswith(' ') or line == '':
+                if self.blocks and line.strip():
+                    self.blocks[-1][1].append(line)
+                continue
+            self.blocks.append([line, []])
+
+    def get_lines(self):
+        lines = []
+        for header, entry_lines in self.blocks:
+            lines.append(header)
+            lines.extend(entry_lines)
+        return lines
+
+    def apply(self, changes):
+        """
+        Apply configuration commands onto the running configuration
+        :param changes: configuration text pushed to FRR
+        :return: resulting lines of the running configuration, or None if a command isn't supported
+        """
+        for header, entry_lines in self.__split_blocks(changes):
+            if not self.__apply_block(header, entry_lines):
+                return None
+        return self.get_lines()
+
+    @staticmethod
+    def __split_blocks(changes):
+        blocks = []
+        for line in changes.split('\n'):
+            s_line = line.strip()
+            if s_line == '' or s_line.startswith('!') or s_line in ('exit', 'end'):
+                continue
+            if line.startswith(' '):
+                if not blocks:
+                    return [(line, [])]  # unsupported, an entry without a statement
+                blocks[-1][1].append(s_line)
+            else:
+                blocks.append((s_line, []))
+        return blocks
+
+    def __find(self, predicate):
+        return [i for i, (header, _) in enumerate(self.blocks) if predicate(header)]
+
+    def __insert_after(self, predicate, block):
+        """ Insert the block after the last block matching predicate, or at the end """
+        found = self.__find(predicate)
+        position = found[-1] + 1 if found else len(self.blocks)
+        self.blocks.insert(position, block)
+        return block
+
+    def __remove(self, predicate):
+        self.blocks = [block for block in self.blocks if not predicate(block[0])]
+
+    def __apply_block(self, header, entry_lines):
+        m = self.re_route_map.match(header)
+        if m:
+            return self.__apply_route_map(m.group(1), m.group(2), m.group(3), entry_lines)
+        if entry_lines:
+            return False
+
+        m = self.re_prefix_list.match(header)
+        if m:
+            def same_rule(line):
+                found = self.re_prefix_list.match(line)
+                return found is not None and found.groups() == m.groups()
+            indices = self.__find(same_rule)
+            if indices:
+                self.blocks[indices[0]][0] = header
+            else:
+                prefix = '%s prefix-list %s seq ' % (m.group(1), m.group(2))
+                self.__insert_after(lambda line: line.startswith(prefix), [header, []])
+            return True
+
+        m = self.re_no_prefix_list.match(header)
+        if m:
+            prefix = '%s prefix-list %s ' % (m.group(1), m.group(2))
+            if m.group(3) is not None:
+                prefix += 'seq %s ' % m.group(3)
+            self.__remove(lambda line: line.startswith(prefix))
+            return True
+
+        m = self.re_community_list.match(header)
+        if m:
+            if not self.__find(lambda line: line == header):
+                prefix = 'bgp community-list standard %s ' % m.group(1)
+                self.__insert_after(lambda line: line.startswith(prefix), [header, []])
+            return True
+
+        m = self.re_no_community_list.match(header)
+        if m:
+            if header == 'no bgp community-list standard %s' % m.group(1):
+                prefix = 'bgp community-list standard %s ' % m.group(1)
+                self.__remove(lambda line: line.startswith(prefix))
+            else:
+                self.__remove(lambda line: line == header[len('no '):])
+            return True
+
+        m = self.re_no_route_map.match(header)
+        if m:
+            name, seq = m.group(1), m.group(2)
+            def same_route_map(line):
+                found = self.re_route_map.match(line)
+                return found is not None and found.group(1) == name and (seq is None or found.group(3) == seq)
+            self.__remove(same_route_map)
+            return True
+
+        return False
+
+    def __apply_route_map(self, name, action, seq, entry_lines):
+        def same_name(line):
+            found = self.re_route_map.match(line)
+            return found is not None and found.group(1) == name
+        indices = [i for i in self.__find(same_name) if self.re_route_map.match(self.blocks[i][0]).group(3) == seq]
+        if indices:
+            block = self.blocks[indices[0]]
+            if block[0] != 'route-map %s %s %s' % (name, action, seq):
+                return False  # the action of an existing entry can't be changed
+        else:
+            block = self.__insert_after(same_name, ['route-map %s %s %s' % (name, action, seq), []])
+
+        for line in entry_lines:
+            negate = line.startswith('no ')
+            command = line[len('no '):] if negate else line
+            words = command.split()
+            if not words or words[0] not in self.entry_commands:
+                return False
+            if negate:
+                block[1] = [l for l in block[1] if not (l.strip() == command or l.strip().startswith(command + ' '))]
+                continue
+            key = self.__entry_key(words)
+            block[1] = [l for l in block[1] if self.__entry_key(l.split()) != key]
+            block[1].append(' ' + command)
+        return True
+
+    @staticmethod
+    def __entry_key(words):
+        """ Return the part of a route-map entry line which identifies the setting it replaces """
+        if words[0] in ('call', 'on-match', 'description'):
+            return tuple(words[:1])
+        if len(words) > 2 and words[1] in ('ip', 'ipv6'):
+            return tuple(words[:3])
+        return tuple(words[:2])
@@ -1,8 +1,11 @@
 from collections import OrderedDict
 from functools import partial
 
+import sys
+
 import jinja2
 import netaddr
+from sonic_py_common.jinja2_cache import enable_bytecode_cache, precompile_templates
 
 from .log import log_err
 
@@ -17,8 +20,16 @@ class TemplateFabric(object):
         j2_env.filters['pfx_filter'] = self.pfx_filter
         for attr in ['ip', 'network', 'prefixlen', 'netmask']:
             j2_env.filters[attr] = partial(self.prefix_attr, attr)
+        enable_bytecode_cache(j2_env)
         self.env = j2_env
 
+    def precompile(self):
+        """
+        Compile all templates into the jinja2 bytecode cache
+        :return: a tuple of the compiled template names and a list of (template name, error) of failed templates
+        """
+        return precompile_templates(self.env)
+
     def from_file(self, filename):
         """
         Read a template from a file
@@ -106,3 +117,16 @@ class TemplateFabric(object):
             else:
                 table[key] = val
         return table
+
+
+def precompile_main():
+    """ Populate the jinja2 bytecode cache with the bgpcfgd templates. Used at image build time """
+    template_path = sys.argv[1] if len(sys.argv) > 1 else '/usr/share/sonic/templates'
+    tf = TemplateFabric(template_path)
+    if tf.env.bytecode_cache is None:
+        print("Jinja2 bytecode cache directory is not available", file=sys.stderr)
+        sys.exit(1)
+    compiled, failed = tf.precompile()
+    for name, error in failed:
+        print("Failed to compile %s: %s" % (name, error), file=sys.stderr)
+    print("Compiled %d templates of %s into %s" % (len(compiled), template_path, tf.env.bytecode_cache.directory))
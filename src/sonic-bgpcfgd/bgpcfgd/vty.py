@@ -0,0 +1,175 @@
+"""
+Client of the vty unix sockets of the FRR daemons
+
+vtysh is a separate process which connects to the vty socket of every FRR
+daemon each time it is run. Daemons of the bgp docker which only need to
+run commands of a single daemon (e.g. 'show bgp summary json' of bgpd) can
+talk to the daemon socket directly and keep the connection open.
+
+Protocol of the vty socket: a command is sent as a NUL terminated string.
+The daemon answers with the command output, followed by three NUL bytes
+and one byte with the command status (0 is success). Several commands can
+be sent at once, the daemon answers them in order.
+"""
+
+import json
+import os
+import socket
+import threading
+
+from .log import log_debug, log_warn
+
+
+FRR_VTY_DIR = '/var/run/frr'
+VTY_TIMEOUT = 30.0
+VTY_RESPONSE_END = b'\0\0\0'
+CMD_SUCCESS = 0
+
+
+class VtyError(Exception):
+    """ The daemon vty socket can't be used """
+    pass
+
+
+class VtyClient(object):
+    """ Persistent connection to the vty socket of one FRR daemon """
+
+    def __init__(self, daemon, vty_dir=FRR_VTY_DIR, timeout=VTY_TIMEOUT):
+        """
+        Constructor
+        :param daemon: name of the FRR daemon, e.g. 'bgpd'
+        :param vty_dir: directory with the vty sockets of the daemons
+        :param timeout: timeout in seconds to wait for a daemon response
+        """
+        self.daemon = daemon
+        self.path = os.path.join(vty_dir, '%s.vty' % daemon)
+        self.timeout = timeout
+        self.sock = None
+        self.buffer = b''
+        self.lock = threading.Lock()
+        self.connects = 0
+
+    def connect(self):
+        """ Connect to the daemon and enter the enable node """
+        self.close()
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        try:
+            sock.connect(self.path)
+        except (OSError, socket.error) as e:
+            sock.close()
+            raise VtyError("Can't connect to '%s': %s" % (self.path, str(e)))
+        self.sock = sock
+        self.connects += 1
+        status, output = self.__run(['enable'])[0]
+        if status != CMD_SUCCESS:
+            self.close()
+            raise VtyError("Can't enter enable node of %s: %s" % (self.daemon, output))
+
+    def close(self):
+        if self.sock is not None:
+            try:
+                self.sock.close()
+            except (OSError, socket.error):
+                pass
+        self.sock = None
+        self.buffer = b''
+
+    def execute(self, commands):
+        """
+        Run a batch of commands. The batch is sent at once and the responses
+        are read in order. If the connection was lost (e.g. the daemon was
+        restarted), the client reconnects once and sends the batch again.
+        :param commands: list of commands
+        :return: list of tuples (status, output), one for every command
+        """
+        with self.lock:
+            for attempt in range(2):
+                try:
+                    if self.sock is None:
+                        self.connect()
+                    return self.__run(commands)
+                except (OSError, socket.error, VtyError) as e:
+                    self.close()
+                    if attempt > 0:
+                        raise VtyError("Can't run commands on %s: %s" % (self.daemon, str(e)))
+                    log_debug("VtyClient: connection to %s was lost, reconnecting: %s" % (self.daemon, str(e)))
+
+    def execute_json(self, command):
+        """
+        Run a command producing json output
+        :return: tuple (status, parsed output). Parsed output is None if the command failed
+        """
+        status, output = self.execute([command])[0]
+        if status != CMD_SUCCESS:
+            return status, None
+        return status, json.loads(output)
+
+    def __run(self, commands):
+        self.sock.sendall(b''.join(command.encode('utf-8') + b'\0' for command in commands))
+        return [self.__read_response() for _ in commands]
+
+    def __read_response(self):
+        while True:
+            end = self.buffer.find(VTY_RESPONSE_END)
+            # the status byte has to be received as well
+            if end >= 0 and len(self.buffer) > end + len(VTY_RESPONSE_END):
+                output = self.buffer[:end]
+                status = self.buffer[end + len(VTY_RESPONSE_END)]
+                self.buffer = self.buffer[end + len(VTY_RESPONSE_END) + 1:]
+                return status, output.decode('utf-8', 'replace')
+            data = self.sock.recv(65536)
+            if not data:
+                raise VtyError("Connection to %s was closed" % self.daemon)
+            self.buffer += data
+
+
+class VtyPool(object):
+    """ One persistent VtyClient for every FRR daemon """
+
+    def __init__(self, vty_dir=FRR_VTY_DIR, timeout=VTY_TIMEOUT):
+        self.vty_dir = vty_dir
+        self.timeout = timeout
+        self.clients = {}
+        self.lock = threading.Lock()
+
+    def get(self, daemon):
+        with self.lock:
+            if daemon not in self.clients:
+                self.clients[daemon] = VtyClient(daemon, self.vty_dir, self.timeout)
+            return self.clients[daemon]
+
+    def is_available(self, daemon):
+        """ Return True if the vty socket of the daemon exists """
+        return os.path.exists(self.get(daemon).path)
+
+    def close(self):
+        with self.lock:
+            for client in self.clients.values():
+                client.close()
+
+    def run(self, commands, daemon='bgpd'):
+        """
+        Run commands on a daemon, with the result format of utils.run_command()
+        :param commands: list of commands
+        :param daemon: name of the FRR daemon
+        :return: tuple (status, output, error), or None if the daemon vty socket can't be used
+        """
+        if not self.is_available(daemon):
+            return None
+        try:
+            results = self.get(daemon).execute(commands)
+        except VtyError as e:
+            log_warn("Can't use vty socket of %s: %s" % (daemon, str(e)))
+            return None
+        status = next((status for status, _ in results if status != CMD_SUCCESS), CMD_SUCCESS)
+        output = ''.join(output for _, output in results)
+        return status, output, output if status != CMD_SUCCESS else ''
+
+
+g_vty_pool = VtyPool()
+
+
+def get_vty_pool():
+    """ Return the process wide VtyPool """
+    return g_vty_pool
@@ -23,16 +23,131 @@ Description: bgpmon.py -- populating bgp related information in stateDB.
     "previous" neighbor dictionary will be kept and used to determine if there
     is a need to perform update or the peer is stale to be removed from the
     state DB
+
+    In the event mode (the default), the frr log file is followed with
+    inotify instead. Only the neighbors reported by %ADJCHANGE messages are
+    queried and updated in the state DB, and the full neighbor table is
+    reconciled on a much longer period. The poll mode is used when the log
+    file isn't available.
 """
+import argparse
+import ctypes
+import ctypes.util
 import json
 import os
+import re
+import select
 import sys
 import syslog
 from swsscommon import swsscommon
 import time
 from sonic_py_common.general import getstatusoutput_noshell
+from bgpcfgd.vty import get_vty_pool, VtyError
 
 PIPE_BATCH_MAX_COUNT = 50
+FRR_LOG_FILE = "/var/log/frr/frr.log"
+POLL_INTERVAL = 15
+RECONCILE_INTERVAL = 300
+# Polling period of the log file when inotify isn't available
+LOG_POLL_INTERVAL = 1
+
+IN_MODIFY = 0x00000002
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+
+ADJCHANGE_RE = re.compile(r'%ADJCHANGE: neighbor (\S+?)(?:\(\S*\))?(?: in vrf (\S+))? (Up|Down)\b')
+
+
+def parse_adjchange_peers(lines):
+    """Return the set of default vrf neighbors reported by %ADJCHANGE messages"""
+    peers = set()
+    for line in lines:
+        m = ADJCHANGE_RE.search(line)
+        if m and m.group(2) in (None, 'default'):
+            peers.add(m.group(1))
+    return peers
+
+
+class LogTailer:
+    """Follow a log file across rotations. Changes are waited for with
+    inotify on the log directory, or by polling when inotify isn't available.
+    """
+    def __init__(self, path):
+        self.path = path
+        self.file = None
+        self.inode = None
+        self.partial = b''
+        self.inotify_fd = self.inotify_watch(os.path.dirname(path))
+        self.open(seek_end=True)
+
+    @staticmethod
+    def inotify_watch(directory):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+            fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+            if fd < 0:
+                return None
+            mask = IN_MODIFY | IN_CREATE | IN_MOVED_TO | IN_MOVED_FROM | IN_DELETE
+            if libc.inotify_add_watch(fd, directory.encode(), mask) < 0:
+                os.close(fd)
+                return None
+            return fd
+        except (OSError, AttributeError):
+            return None
+
+    def open(self, seek_end):
+        self.close()
+        try:
+            self.file = open(self.path, 'rb')
+        except (IOError, OSError):
+            return
+        self.inode = os.fstat(self.file.fileno()).st_ino
+        if seek_end:
+            self.file.seek(0, os.SEEK_END)
+
+    def close(self):
+        if self.file is not None:
+            self.file.close()
+        self.file = None
+        self.partial = b''
+
+    def read_lines(self):
+        """Return the complete lines appended to the log since the previous call"""
+        data = b''
+        try:
+            st = os.stat(self.path)
+        except (IOError, OSError):
+            st = None
+        if self.file is not None:
+            if st is not None and st.st_ino == self.inode and st.st_size < self.file.tell():
+                self.file.seek(0)  # truncated
+            data = self.file.read()
+        if st is not None and (self.file is None or st.st_ino != self.inode):
+            # rotated: the rest of the previous file was read above, continue with the new one
+            partial = self.partial + data
+            self.open(seek_end=False)
+            data = partial + self.file.read() if self.file is not None else partial
+        else:
+            data = self.partial + data
+        lines = data.split(b'\n')
+        self.partial = lines.pop()
+        return [line.decode('utf-8', 'replace') for line in lines]
+
+    def wait(self, timeout):
+        """Wait up to timeout seconds for new log lines and return them"""
+        if self.inotify_fd is not None:
+            ready, _, _ = select.select([self.inotify_fd], [], [], timeout)
+            if ready:
+                try:
+                    while os.read(self.inotify_fd, 65536):
+                        pass
+                except (IOError, OSError):
+                    pass
+        else:
+            time.sleep(min(timeout, LOG_POLL_INTERVAL))
+        return self.read_lines()
 
 class BgpStateGet:
     def __init__(self):
@@ -50,6 +165,9 @@ class BgpStateGet:
         self.pipe = swsscommon.RedisPipeline(self.db.get_redis_client(self.db.STATE_DB))
         self.db.delete_all_by_pattern(self.db.STATE_DB, "NEIGH_STATE_TABLE|*" )
         self.MAX_RETRY_ATTEMPTS = 3
+        self.cycles = 0
+        self.last_cycle_time = 0.0
+        self.max_cycle_time = 0.0
 
     # A quick way to check if there are anything happening within BGP is to
     # check its log file has any activities. This is by checking its modified
@@ -75,6 +193,15 @@ class BgpStateGet:
                                          peer_dict["peers"][peer]["remoteAs"],
                                          peer_dict["peers"][peer]["localAs"])
 
+    # Run the command through the persistent bgpd vty connection,
+    # with a fallback to the vtysh binary when the socket isn't available
+    @staticmethod
+    def run_vtysh(cmd):
+        result = get_vty_pool().run(cmd[2:], daemon='bgpd')
+        if result is not None:
+            return result[0], result[1]
+        return getstatusoutput_noshell(cmd)
+
     # Get a new snapshot of BGP neighbors and store them in the "new" location
     def get_all_neigh_states(self):
         cmd = ["vtysh", "-c", 'show bgp summary json']
@@ -82,7 +209,7 @@ class BgpStateGet:
 
         while retry_attempt < self.MAX_RETRY_ATTEMPTS:
             try:
-                rc, output = getstatusoutput_noshell(cmd)
+                rc, output = self.run_vtysh(cmd)
                 if rc:
                     syslog.syslog(syslog.LOG_ERR, "*ERROR* Failed with rc:{} when execute: {}".format(rc, cmd))
                     return
@@ -117,6 +244,66 @@ class BgpStateGet:
         sys.exit(1)
 
 
+    # Get the states of the given neighbors only.
+    # Return a dictionary: peer -> (state, remoteAs, localAs), or None for a neighbor which doesn't exist any more.
+    # Neighbors whose state couldn't be read are left out.
+    def get_neigh_states(self, peers):
+        commands = ['show bgp neighbors %s json' % peer for peer in peers]
+        results = None
+        pool = get_vty_pool()
+        if pool.is_available('bgpd'):
+            try:
+                results = pool.get('bgpd').execute(commands)
+            except VtyError as e:
+                syslog.syslog(syslog.LOG_WARNING, "*WARNING* Can't use bgpd vty socket: {}".format(e))
+        if results is None:
+            results = [getstatusoutput_noshell(["vtysh", "-c", command]) for command in commands]
+
+        states = {}
+        for peer, (rc, output) in zip(peers, results):
+            if rc or len(output) == 0:
+                continue
+            try:
+                info = json.loads(output).get(peer)
+            except ValueError:
+                continue
+            if info is None:
+                states[peer] = None
+            else:
+                states[peer] = (info.get("bgpState"), info.get("remoteAs"), info.get("localAs"))
+        return states
+
+    # Update the state DB entries of the given neighbors only
+    def update_peers(self, peers):
+        data = {}
+        for peer, value in self.get_neigh_states(sorted(peers)).items():
+            key = "NEIGH_STATE_TABLE|%s" % peer
+            if value is None:
+                if peer in self.peer_l:
+                    data[key] = None
+                    self.peer_l.discard(peer)
+                    self.peer_state.pop(peer, None)
+                continue
+            state, remote_as, local_as = value
+            if peer not in self.peer_l or self.peer_state.get(peer) != state:
+                peerType = "i-BGP" if remote_as == local_as else "e-BGP"
+                data[key] = {'state':state, 'peerType':peerType}
+                self.peer_state[peer] = state
+                self.peer_l.add(peer)
+            if len(data) > PIPE_BATCH_MAX_COUNT:
+                self.flush_pipe(data)
+        if len(data) > 0:
+            self.flush_pipe(data)
+
+    # Account the time spent by one update cycle
+    def record_cycle(self, kind, start, count):
+        elapsed = time.time() - start
+        self.cycles += 1
+        self.last_cycle_time = elapsed
+        self.max_cycle_time = max(self.max_cycle_time, elapsed)
+        syslog.syslog(syslog.LOG_DEBUG, "bgpmon {} cycle #{}: {} neighbors in {:.3f}s (max {:.3f}s)".format(
+            kind, self.cycles, count, elapsed, self.max_cycle_time))
+
     # This method will take the caller's dictionary which contains the peer state operation
     # That need to be updated in StateDB using Redis pipeline.
     # The data{} will be cleared at the end of this method before returning to caller.
@@ -185,7 +372,43 @@ class BgpStateGet:
         # Save the new set
         self.peer_l = self.new_peer_l.copy()
 
+def run_poll_mode(bgp_state_get, poll_interval):
+    # periodically obtain the new neighbor information and update if necessary
+    while True:
+        time.sleep(poll_interval)
+        if bgp_state_get.bgp_activity_detected():
+            start = time.time()
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+            bgp_state_get.record_cycle("poll", start, len(bgp_state_get.peer_l))
+
+
+def run_event_mode(bgp_state_get, tailer, reconcile_interval):
+    next_reconcile = 0
+    while True:
+        lines = tailer.wait(max(0, next_reconcile - time.time()))
+        peers = parse_adjchange_peers(lines)
+        if peers:
+            start = time.time()
+            bgp_state_get.update_peers(peers)
+            bgp_state_get.record_cycle("event", start, len(peers))
+        if time.time() >= next_reconcile:
+            start = time.time()
+            bgp_state_get.get_all_neigh_states()
+            bgp_state_get.update_neigh_states()
+            bgp_state_get.record_cycle("reconcile", start, len(bgp_state_get.peer_l))
+            next_reconcile = time.time() + reconcile_interval
+
+
 def main():
+    parser = argparse.ArgumentParser(description="Populate the BGP neighbor states in the state DB")
+    parser.add_argument("--mode", choices=["event", "poll"], default="event",
+                        help="follow the frr log for neighbor changes, or poll all the neighbors periodically")
+    parser.add_argument("--log-file", default=FRR_LOG_FILE, help="frr log file followed in the event mode")
+    parser.add_argument("--poll-interval", type=int, default=POLL_INTERVAL, help="polling period in seconds of the poll mode")
+    parser.add_argument("--reconcile-interval", type=int, default=RECONCILE_INTERVAL,
+                        help="period in seconds of the full neighbor reconciliation in the event mode")
+    args = parser.parse_args()
 
     syslog.syslog(syslog.LOG_INFO, "bgpmon service started")
     bgp_state_get = None
@@ -195,12 +418,11 @@ def main():
         syslog.syslog(syslog.LOG_ERR, "{}: error exit 1, reason {}".format("THIS_MODULE", str(e)))
         sys.exit(1)
 
-    # periodically obtain the new neighbor information and update if necessary
-    while True:
-        time.sleep(15)
-        if bgp_state_get.bgp_activity_detected():
-            bgp_state_get.get_all_neigh_states()
-            bgp_state_get.update_neigh_states()
+    if args.mode == "event" and os.path.exists(args.log_file):
+        syslog.syslog(syslog.LOG_INFO, "bgpmon follows {} for neighbor changes".format(args.log_file))
+        run_event_mode(bgp_state_get, LogTailer(args.log_file), args.reconcile_interval)
+    else:
+        run_poll_mode(bgp_state_get, args.poll_interval)
 
 if __name__ == '__main__':
     main()
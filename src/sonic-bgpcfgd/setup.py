@@ -13,6 +13,7 @@ setuptools.setup(
             'bgpcfgd = bgpcfgd.main:main',
             'staticroutebfd = staticroutebfd.main:main',
             'bgpmon = bgpmon.bgpmon:main',
+            'bgpcfgd-precompile-templates = bgpcfgd.template:precompile_main',
         ]
     },
     install_requires = [
@@ -1,4 +1,4 @@
 from unittest.mock import MagicMock
 
 
-swsscommon = MagicMock(CFG_DEVICE_METADATA_TABLE_NAME = "DEVICE_METADATA")
+swsscommon = MagicMock(CFG_DEVICE_METADATA_TABLE_NAME = "DEVICE_METADATA", SET_COMMAND = "SET", DEL_COMMAND = "DEL")
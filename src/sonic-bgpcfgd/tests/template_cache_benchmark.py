@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Measure the template load time saved by the jinja2 bytecode cache.
+
+For every template of the FRR docker, the time to load it in a fresh
+TemplateFabric is measured once with compilation from source and once from
+a bytecode cache populated by TemplateFabric.precompile().
+
+Usage (from src/sonic-bgpcfgd):
+    python3 tests/template_cache_benchmark.py [TEMPLATE_PATH]
+"""
+
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from unittest.mock import patch
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.realpath(__file__)), '..'))
+
+from bgpcfgd import template
+from bgpcfgd.template import TemplateFabric
+
+TEMPLATE_PATH = os.path.abspath(os.path.join(os.path.dirname(os.path.realpath(__file__)), '../../../dockers/docker-fpm-frr/frr'))
+
+
+def load_time(template_path, name, cache_dir):
+    with patch.object(template, 'enable_bytecode_cache', partial_enable(cache_dir)):
+        tf = TemplateFabric(template_path)
+    start = time.time()
+    tf.from_file(name)
+    return time.time() - start
+
+
+def partial_enable(cache_dir):
+    enable = template.enable_bytecode_cache
+    if cache_dir is None:
+        return lambda env: None
+    return lambda env: enable(env, cache_dir)
+
+
+def main():
+    template_path = sys.argv[1] if len(sys.argv) > 1 else TEMPLATE_PATH
+    cache_dir = tempfile.mkdtemp()
+    try:
+        with patch.object(template, 'enable_bytecode_cache', partial_enable(cache_dir)):
+            compiled, _ = TemplateFabric(template_path).precompile()
+
+        total_cold = total_warm = 0.0
+        print('{:<60} {:>10} {:>10} {:>10}'.format('template', 'source ms', 'cache ms', 'saved ms'))
+        for name in sorted(compiled):
+            cold = load_time(template_path, name, None)
+            warm = load_time(template_path, name, cache_dir)
+            total_cold += cold
+            total_warm += warm
+            print('{:<60} {:>10.2f} {:>10.2f} {:>10.2f}'.format(name, cold * 1000, warm * 1000, (cold - warm) * 1000))
+        print('{:<60} {:>10.2f} {:>10.2f} {:>10.2f}'.format('total', total_cold * 1000, total_warm * 1000, (total_cold - total_warm) * 1000))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,7 @@
 from unittest.mock import MagicMock, patch
 
 from bgpcfgd.directory import Directory
+from bgpcfgd.running_config import RunningConfigIndex
 from bgpcfgd.template import TemplateFabric
 from copy import deepcopy
 from . import swsscommon_test
@@ -390,5 +391,6 @@ def test__get_available_peer_groups():
         '  exit-address-family',
         '     ',
     ])
+    m.cfg_mgr.get_index = lambda: RunningConfigIndex(m.cfg_mgr.get_text())
     res = m._BBRMgr__get_available_peer_groups()
     assert res == {"PEER_V4", "PEER_V6"}
@@ -0,0 +1,62 @@
+import os
+import sys
+from unittest.mock import MagicMock, patch
+
+from . import swsscommon_test
+sys.modules["swsscommon"] = swsscommon_test
+
+from bgpmon.bgpmon import BgpStateGet, LogTailer, parse_adjchange_peers
+
+
+def test_parse_adjchange():
+    lines = [
+        "Jan  1 00:00:00 sonic bgpd[62]: %ADJCHANGE: neighbor 10.0.0.1 Up",
+        "Jan  1 00:00:00 sonic bgpd[62]: %ADJCHANGE: neighbor fc00::2 Down Neighbor deleted",
+        "Jan  1 00:00:00 sonic bgpd[62]: %ADJCHANGE: neighbor 10.0.0.3(ARISTA01T2) in vrf default Up",
+        "Jan  1 00:00:00 sonic bgpd[62]: %ADJCHANGE: neighbor 10.0.0.4 in vrf Vrf_red Up",
+        "Jan  1 00:00:00 sonic bgpd[62]: bgp_update_receive: rcvd UPDATE",
+    ]
+    assert parse_adjchange_peers(lines) == {'10.0.0.1', 'fc00::2', '10.0.0.3'}
+
+
+def test_log_tailer(tmp_path):
+    path = str(tmp_path / 'frr.log')
+    with open(path, 'w') as f:
+        f.write("old line\n")
+    tailer = LogTailer(path)
+    assert tailer.read_lines() == []
+    with open(path, 'a') as f:
+        f.write("line 1\nline")
+    assert tailer.wait(1) == ["line 1"]
+    with open(path, 'a') as f:
+        f.write(" 2\n")
+    assert tailer.read_lines() == ["line 2"]
+    # rotation
+    os.rename(path, path + '.1')
+    with open(path, 'w') as f:
+        f.write("line 3\n")
+    assert tailer.wait(1) == ["line 3"]
+    # truncation
+    with open(path, 'w') as f:
+        f.write("4\n")
+    assert tailer.read_lines() == ["4"]
+
+
+@patch('bgpmon.bgpmon.get_vty_pool')
+def test_update_peers(mocked_pool):
+    mocked_pool.return_value.is_available.return_value = True
+    mocked_pool.return_value.get.return_value.execute.return_value = [
+        (0, '{"10.0.0.1": {"bgpState": "Established", "remoteAs": 65200, "localAs": 65100}}'),
+        (0, '{}'),
+    ]
+    bgp_state_get = BgpStateGet.__new__(BgpStateGet)
+    bgp_state_get.peer_l = {'10.0.0.2'}
+    bgp_state_get.peer_state = {'10.0.0.2': 'Established'}
+    bgp_state_get.flush_pipe = MagicMock()
+    bgp_state_get.update_peers({'10.0.0.2', '10.0.0.1'})
+    bgp_state_get.flush_pipe.assert_called_once_with({
+        'NEIGH_STATE_TABLE|10.0.0.1': {'state': 'Established', 'peerType': 'e-BGP'},
+        'NEIGH_STATE_TABLE|10.0.0.2': None,
+    })
+    assert bgp_state_get.peer_l == {'10.0.0.1'}
+    assert bgp_state_get.peer_state == {'10.0.0.1': 'Established'}
@@ -58,6 +58,7 @@ def test_restart_peer_groups():
 @patch('bgpcfgd.frr.log_crit')
 def test_restart_peer_groups_fail(mocked_log_crit):
     return_value_map = {
+        "['vtysh', '-c', 'clear bgp peer-group pg_1 soft in', '-c', 'clear bgp peer-group pg_2 soft in']": (1, "", ""),
         "['vtysh', '-c', 'clear bgp peer-group pg_1 soft in']": (0, "", ""),
         "['vtysh', '-c', 'clear bgp peer-group pg_2 soft in']": (1, "some output", "some error")
     }
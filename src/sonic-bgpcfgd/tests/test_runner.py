@@ -0,0 +1,145 @@
+from unittest.mock import MagicMock, patch
+
+from . import swsscommon_test
+
+import sys
+sys.modules["swsscommon"] = swsscommon_test
+
+from bgpcfgd.config import ConfigMgr
+import bgpcfgd.runner
+from bgpcfgd.runner import Runner
+
+
+class Subscriber(object):
+    def __init__(self, table_name, events):
+        self.table_name = table_name
+        self.events = list(events)
+        self.connector = MagicMock()
+        self.connector.getDbId.return_value = 4
+
+    def pop(self):
+        if not self.events:
+            return "", "", ()
+        return self.events.pop(0)
+
+    def getDbConnector(self):
+        return self.connector
+
+    def getTableName(self):
+        return self.table_name
+
+
+def create_runner(events, **kwargs):
+    frr = MagicMock()
+    frr.write.return_value = True
+    frr.restart_peer_groups.return_value = True
+    cfg_mgr = ConfigMgr(frr)
+    runner = Runner(cfg_mgr, **kwargs)
+    received = []
+
+    def handler(key, op, data):
+        received.append((key, op, data))
+        if op == "SET":
+            cfg_mgr.push("set %s %s" % (key, data.get("value", "")))
+            cfg_mgr.restart_peer_groups(["PEER_V4"])
+        else:
+            cfg_mgr.push("no set %s" % key)
+
+    runner.callbacks[4]["STATIC_ROUTE"].append(handler)
+    runner.subscribers.add(Subscriber("STATIC_ROUTE", events))
+    return runner, frr, received
+
+
+def test_coalescing():
+    events = [
+        ("a", "SET", (("value", "1"),)),
+        ("b", "SET", (("value", "1"),)),
+        ("a", "SET", (("value", "2"),)),
+        ("c", "SET", (("value", "1"),)),
+        ("b", "DEL", ()),
+    ]
+    runner, frr, received = create_runner(events, batch_window=100, batch_max_latency=1000)
+    runner.read_events()
+    runner.flush()
+    assert received == [("a", "SET", {"value": "2"}), ("c", "SET", {"value": "1"}), ("b", "DEL", {})]
+    frr.write.assert_called_once_with("set a 2\nset c 1\nno set b\n")
+    frr.restart_peer_groups.assert_called_once_with(["PEER_V4", "PEER_V4"])
+    assert runner.get_counters() == {'events_in': 5, 'coalesced': 2, 'batches': 1, 'commits': 1}
+
+
+def test_del_then_set():
+    events = [
+        ("n", "SET", (("value", "1"),)),
+        ("n", "DEL", ()),
+        ("x", "SET", (("value", "1"),)),
+        ("n", "SET", (("value", "2"),)),
+        ("n", "SET", (("value", "3"),)),
+    ]
+    runner, frr, received = create_runner(events, batch_window=100, batch_max_latency=1000)
+    runner.read_events()
+    runner.flush()
+    # the DEL isn't merged with the following SET, the object is recreated
+    assert received == [("n", "DEL", {}), ("x", "SET", {"value": "1"}), ("n", "SET", {"value": "3"})]
+    frr.write.assert_called_once_with("no set n\nset x 1\nset n 3\n")
+    assert runner.get_counters()['coalesced'] == 2
+
+
+def test_del_set_del():
+    events = [
+        ("n", "DEL", ()),
+        ("n", "SET", (("value", "2"),)),
+        ("n", "DEL", ()),
+        ("n", "DEL", ()),
+    ]
+    runner, _, received = create_runner(events, batch_window=100, batch_max_latency=1000)
+    runner.read_events()
+    runner.flush()
+    assert received == [("n", "DEL", {})]
+    assert runner.get_counters()['coalesced'] == 3
+
+
+def test_order_across_tables():
+    runner, _, received = create_runner([], batch_window=100, batch_max_latency=1000)
+
+    def neighbor_handler(key, op, data):
+        received.append(("BGP_NEIGHBOR", key, op))
+
+    runner.callbacks[4]["BGP_NEIGHBOR"].append(neighbor_handler)
+    runner.add_event(4, "BGP_NEIGHBOR", "10.0.0.1", "DEL", {}, 10.0)
+    runner.add_event(4, "STATIC_ROUTE", "a", "SET", {}, 10.0)
+    runner.add_event(4, "BGP_NEIGHBOR", "10.0.0.1", "SET", {}, 10.0)
+    runner.add_event(4, "STATIC_ROUTE", "b", "SET", {}, 10.0)
+    runner.flush()
+    assert received == [
+        ("BGP_NEIGHBOR", "10.0.0.1", "DEL"),
+        ("a", "SET", {}),
+        ("BGP_NEIGHBOR", "10.0.0.1", "SET"),
+        ("b", "SET", {}),
+    ]
+
+
+def test_batch_window():
+    runner, _, _ = create_runner([("a", "SET", ())], batch_window=100, batch_max_latency=1000)
+    with patch.object(bgpcfgd.runner.time, "time", return_value=10.0):
+        assert runner.select_timeout() == Runner.SELECT_TIMEOUT
+        runner.read_events()
+        assert not runner.batch_ready()
+        assert runner.select_timeout() == 100
+    # every new event extends the window until the max latency is reached
+    for now in [10.05, 10.1, 10.9]:
+        with patch.object(bgpcfgd.runner.time, "time", return_value=now):
+            runner.add_event(4, "STATIC_ROUTE", "b", "SET", {}, now)
+            assert not runner.batch_ready()
+    with patch.object(bgpcfgd.runner.time, "time", return_value=10.95):
+        assert runner.select_timeout() == 50
+    with patch.object(bgpcfgd.runner.time, "time", return_value=11.0):
+        assert runner.batch_ready()
+
+
+def test_no_batching():
+    runner, _, _ = create_runner([("a", "SET", ())])
+    runner.read_events()
+    assert runner.batch_ready()
+    runner.flush()
+    assert runner.get_counters()['commits'] == 1
+    assert runner.select_timeout() == Runner.SELECT_TIMEOUT
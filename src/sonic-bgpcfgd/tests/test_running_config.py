@@ -0,0 +1,131 @@
+from unittest.mock import MagicMock, patch
+
+from bgpcfgd.config import ConfigMgr
+from bgpcfgd.running_config import RunningConfigIndex, RunningConfigEditor
+
+
+RUNNING_CONFIG = """!
+ip prefix-list PL_V4 seq 10 deny 0.0.0.0/0 le 17
+ip prefix-list PL_V4 seq 20 permit 10.0.0.0/8 le 32
+ipv6 prefix-list PL_V6 seq 10 deny ::/0 le 59
+bgp community-list standard COMM permit 1010:2020
+!
+router bgp 65100
+ neighbor PEER_V4 peer-group
+ neighbor PEER_V6 peer-group
+ address-family ipv4
+  neighbor PEER_V4 route-map FROM_BGP_PEER_V4 in
+ exit-address-family
+!
+route-map FROM_BGP_PEER_V4 permit 2
+ call ALLOW_LIST_DEPLOYMENT_ID_0_V4
+ on-match next
+route-map ALLOW_LIST_DEPLOYMENT_ID_0_V4 permit 10
+ match ip address prefix-list PL_V4
+ match community COMM
+route-map ALLOW_LIST_DEPLOYMENT_ID_0_V4 permit 65535
+ set community 5060:12345 additive
+!
+"""
+
+
+def create_cfg_mgr(resync_interval=ConfigMgr.RESYNC_INTERVAL):
+    frr = MagicMock()
+    frr.get_config.return_value = RUNNING_CONFIG
+    frr.write.return_value = True
+    frr.restart_peer_groups.return_value = True
+    c = ConfigMgr(frr, resync_interval)
+    c.update()
+    return c, frr
+
+
+def test_index():
+    c, _ = create_cfg_mgr()
+    index = c.get_index()
+    assert index.get_prefix_list('ip', 'PL_V4') == ['deny 0.0.0.0/0 le 17', 'permit 10.0.0.0/8 le 32']
+    assert index.get_prefix_list('ipv6', 'PL_V4') is None
+    assert index.get_community_list('COMM') == ['1010:2020']
+    assert index.get_peer_groups() == ['PEER_V4', 'PEER_V6']
+    assert index.get_neighbor_route_map_in('PEER_V4') == 'FROM_BGP_PEER_V4'
+    assert index.get_neighbor_route_map_in('PEER_V6') is None
+    assert list(index.get_route_map('ALLOW_LIST_DEPLOYMENT_ID_0_V4').items()) == [
+        (10, ('permit', ['match ip address prefix-list PL_V4', 'match community COMM'])),
+        (65535, ('permit', ['set community 5060:12345 additive'])),
+    ]
+    assert c.get_index() is index
+
+
+def test_editor():
+    c, _ = create_cfg_mgr()
+    editor = RunningConfigEditor(c.get_text())
+    lines = editor.apply("\n".join([
+        'no ip prefix-list PL_V4',
+        'ip prefix-list PL_V4 seq 10 permit 20.0.0.0/8 le 32',
+        'ip prefix-list PL_NEW seq 10 permit 30.0.0.0/8 le 32',
+        'no bgp community-list standard COMM',
+        'bgp community-list standard COMM permit 3030:4040',
+        'route-map ALLOW_LIST_DEPLOYMENT_ID_0_V4 permit 65535',
+        ' set community 1111:2222 additive',
+        'no route-map ALLOW_LIST_DEPLOYMENT_ID_0_V4 permit 10',
+        'route-map ALLOW_LIST_DEPLOYMENT_ID_0_V4 permit 20',
+        ' match ip address prefix-list PL_NEW',
+    ]))
+    index = RunningConfigIndex(lines)
+    assert index.get_prefix_list('ip', 'PL_V4') == ['permit 20.0.0.0/8 le 32']
+    assert index.get_prefix_list('ip', 'PL_NEW') == ['permit 30.0.0.0/8 le 32']
+    assert index.get_community_list('COMM') == ['3030:4040']
+    assert list(index.get_route_map('ALLOW_LIST_DEPLOYMENT_ID_0_V4').items()) == [
+        (65535, ('permit', ['set community 1111:2222 additive'])),
+        (20, ('permit', ['match ip address prefix-list PL_NEW'])),
+    ]
+    assert index.get_peer_groups() == ['PEER_V4', 'PEER_V6']
+
+
+def test_editor_unsupported():
+    c, _ = create_cfg_mgr()
+    assert RunningConfigEditor(c.get_text()).apply("router bgp 65100\n neighbor PEER_V4 allowas-in 1\n") is None
+    assert RunningConfigEditor(c.get_text()).apply("route-map FROM_BGP_PEER_V4 deny 2\n") is None
+
+
+def test_update_uses_cache():
+    c, frr = create_cfg_mgr()
+    c.update()
+    c.update()
+    assert frr.get_config.call_count == 1
+    c.update(force=True)
+    assert frr.get_config.call_count == 2
+
+
+def test_resync_timer():
+    with patch('bgpcfgd.config.time.time', return_value=100.0):
+        c, frr = create_cfg_mgr(resync_interval=10)
+    with patch('bgpcfgd.config.time.time', return_value=109.0):
+        c.update()
+    assert frr.get_config.call_count == 1
+    with patch('bgpcfgd.config.time.time', return_value=110.0):
+        c.update()
+    assert frr.get_config.call_count == 2
+
+
+def test_commit_updates_cache():
+    c, frr = create_cfg_mgr()
+    c.push_list(['ip prefix-list PL_V4 seq 30 permit 40.0.0.0/8 le 32'])
+    assert c.commit()
+    c.update()
+    assert frr.get_config.call_count == 1
+    assert c.get_index().get_prefix_list('ip', 'PL_V4')[-1] == 'permit 40.0.0.0/8 le 32'
+    assert c.get_text()[-1] == '     '
+
+
+def test_commit_invalidates_cache():
+    c, frr = create_cfg_mgr()
+    c.push_list(['router bgp 65100', ' neighbor PEER_V4 allowas-in 1'])
+    assert c.commit()
+    c.update()
+    assert frr.get_config.call_count == 2
+
+    frr.write.return_value = False
+    c.push_list(['ip prefix-list PL_V4 seq 30 permit 40.0.0.0/8 le 32'])
+    assert not c.commit()
+    c.update()
+    assert frr.get_config.call_count == 3
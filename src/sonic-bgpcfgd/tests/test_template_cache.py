@@ -0,0 +1,28 @@
+import os
+
+from unittest.mock import patch
+
+from bgpcfgd import template
+from bgpcfgd.template import TemplateFabric
+
+TEMPLATE_PATH = os.path.abspath('../../dockers/docker-fpm-frr/frr')
+
+
+def test_template_cache_disabled_by_default():
+    with patch('sonic_py_common.jinja2_cache.os.path.isdir', return_value=False):
+        tf = TemplateFabric(TEMPLATE_PATH)
+    assert tf.env.bytecode_cache is None
+
+
+def test_precompile_templates(tmp_path):
+    cache_dir = str(tmp_path)
+    enable = template.enable_bytecode_cache
+    with patch.object(template, 'enable_bytecode_cache', lambda env: enable(env, cache_dir)):
+        compiled, failed = TemplateFabric(TEMPLATE_PATH).precompile()
+        assert 'bgpd/templates/general/instance.conf.j2' in compiled
+        assert failed == []
+
+        tf = TemplateFabric(TEMPLATE_PATH)
+        tf.from_file('bgpd/templates/general/instance.conf.j2')
+        assert tf.env.bytecode_cache.hits == 1
+        assert tf.env.bytecode_cache.misses == 0
@@ -0,0 +1,54 @@
+from unittest.mock import patch
+
+import pytest
+
+from bgpcfgd.vty import VtyClient, VtyError, VtyPool
+from .vty_server import VtyServer
+
+
+@pytest.fixture
+def server(tmp_path):
+    server = VtyServer(str(tmp_path))
+    yield server
+    server.close()
+
+
+def test_execute(server, tmp_path):
+    client = VtyClient('bgpd', str(tmp_path))
+    assert client.execute(['show version']) == [(0, 'output of show version\n')]
+    assert client.execute(['show a', 'fail', 'show b']) == [
+        (0, 'output of show a\n'),
+        (1, '% Unknown command: fail\n'),
+        (0, 'output of show b\n'),
+    ]
+    assert client.execute_json('show json') == (0, {'daemon': 'bgpd'})
+    assert client.execute_json('fail') == (1, None)
+    # the connection is reused
+    assert server.connections == 1
+    assert server.commands.count('enable') == 1
+
+
+def test_reconnect(server, tmp_path):
+    client = VtyClient('bgpd', str(tmp_path))
+    client.execute(['show a'])
+    client.sock.shutdown(2)
+    assert client.execute(['show b']) == [(0, 'output of show b\n')]
+    assert client.connects == 2
+    with pytest.raises(VtyError):
+        client.execute(['drop'])
+
+
+def test_pool(server, tmp_path):
+    pool = VtyPool(str(tmp_path))
+    assert pool.run(['show a', 'show b']) == (0, 'output of show a\noutput of show b\n', '')
+    assert pool.run(['show a', 'fail']) == (1, 'output of show a\n% Unknown command: fail\n', 'output of show a\n% Unknown command: fail\n')
+    assert pool.get('bgpd') is pool.get('bgpd')
+    # no socket: the caller has to fall back to vtysh
+    assert pool.run(['show a'], daemon='zebra') is None
+    pool.close()
+
+
+@patch('bgpcfgd.frr.run_command', lambda cmd: (0, str(cmd), ""))
+def test_frr_fallback(tmp_path):
+    import bgpcfgd.frr
+    assert bgpcfgd.frr.run_vtysh(['show a', 'show b']) == (0, "['vtysh', '-c', 'show a', '-c', 'show b']", "")
@@ -0,0 +1,76 @@
+#!/usr/bin/env python3
+"""
+Measure the latency of a command run on an FRR daemon vty socket.
+
+A stand-in vty server is started on a temporary unix socket. Commands are
+run
+  - by a new process per command, which connects to the socket, enters the
+    enable node and runs the command, like a vtysh invocation does
+  - through a persistent VtyClient, one command per request
+  - through a persistent VtyClient, as one pipelined batch
+
+Usage (from src/sonic-bgpcfgd):
+    python3 tests/vty_benchmark.py [-n COUNT]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TESTS_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(TESTS_DIR, '..'))
+sys.path.insert(0, TESTS_DIR)
+
+from bgpcfgd.vty import VtyClient
+from vty_server import VtyServer
+
+FORK_CLIENT = '''
+import sys
+sys.path.insert(0, sys.argv[1])
+from bgpcfgd.vty import VtyClient
+VtyClient('bgpd', sys.argv[2]).execute([sys.argv[3]])
+'''
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=200, help='number of commands')
+    args = parser.parse_args()
+
+    vty_dir = tempfile.mkdtemp()
+    server = VtyServer(vty_dir)
+    try:
+        commands = ['show bgp neighbor 10.0.0.%d json' % (i % 256) for i in range(args.count)]
+
+        start = time.time()
+        for command in commands:
+            subprocess.check_call([sys.executable, '-c', FORK_CLIENT, os.path.join(TESTS_DIR, '..'), vty_dir, command])
+        fork_time = time.time() - start
+
+        client = VtyClient('bgpd', vty_dir)
+        client.execute(['show version'])
+        start = time.time()
+        for command in commands:
+            client.execute([command])
+        persistent_time = time.time() - start
+
+        start = time.time()
+        client.execute(commands)
+        batch_time = time.time() - start
+        client.close()
+
+        print('{} commands'.format(args.count))
+        print('  process per command  : {:10.3f} ms/command'.format(fork_time * 1000 / args.count))
+        print('  persistent client    : {:10.3f} ms/command ({:.0f}x)'.format(persistent_time * 1000 / args.count, fork_time / persistent_time))
+        print('  pipelined batch      : {:10.3f} ms/command ({:.0f}x)'.format(batch_time * 1000 / args.count, fork_time / batch_time))
+    finally:
+        server.close()
+        shutil.rmtree(vty_dir)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+import os
+import socket
+import threading
+
+
+class VtyServer(object):
+    """ Stand-in for the vty unix socket of an FRR daemon
+        Every command is answered with 'output of <command>', except:
+          'enable'           empty output
+          'fail'             an error with status 1
+          'show json'        '{"daemon": <name>}'
+          'drop'             the connection is closed without an answer
+    """
+    def __init__(self, vty_dir, daemon='bgpd'):
+        self.daemon = daemon
+        self.path = os.path.join(vty_dir, '%s.vty' % daemon)
+        self.commands = []
+        self.connections = 0
+        self.sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        self.sock.bind(self.path)
+        self.sock.listen(16)
+        self.thread = threading.Thread(target=self.serve, daemon=True)
+        self.thread.start()
+
+    def serve(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            self.connections += 1
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def answer(self, command):
+        self.commands.append(command)
+        if command == 'enable':
+            return b'', 0
+        if command == 'fail':
+            return b'% Unknown command: fail\n', 1
+        if command == 'show json':
+            return ('{"daemon": "%s"}' % self.daemon).encode(), 0
+        return ('output of %s\n' % command).encode(), 0
+
+    def handle(self, conn):
+        buffer = b''
+        with conn:
+            while True:
+                data = conn.recv(65536)
+                if not data:
+                    return
+                buffer += data
+                while b'\0' in buffer:
+                    command, buffer = buffer.split(b'\0', 1)
+                    if command == b'drop':
+                        self.commands.append('drop')
+                        return
+                    output, status = self.answer(command.decode())
+                    conn.sendall(output + b'\0\0\0' + bytes([status]))
+
+    def close(self):
+        self.sock.close()
+        os.unlink(self.path)
@@ -0,0 +1,98 @@
+"""config_db_delta.py
+
+Incremental CONFIG_DB writes for sonic-cfggen --write-to-db.
+
+ConfigDBConnector.mod_config() rewrites every entry it is given, so loading
+a configuration which is already in CONFIG_DB still publishes a keyspace
+notification for each key and wakes up every subscriber of those tables.
+get_config_delta() compares the data to write with the current content of
+CONFIG_DB (read with a single pipelined get_config()) and keeps only the
+entries and fields whose value would change. The delta keeps mod_config()
+semantics: fields missing from an entry are left untouched, a None entry
+deletes the key and a None table deletes the whole table.
+"""
+
+
+class ConfigDbDeltaSummary(object):
+    """ Per table counters of the entries a delta adds, modifies and deletes """
+
+    def __init__(self):
+        self.tables = {}
+
+    def _counters(self, table):
+        return self.tables.setdefault(table, {'added': 0, 'modified': 0, 'deleted': 0, 'unchanged': 0, 'fields': 0})
+
+    def count(self, table, change, fields=0):
+        counters = self._counters(table)
+        counters[change] += 1
+        counters['fields'] += fields
+
+    def total(self, change):
+        return sum(counters[change] for counters in self.tables.values())
+
+    def lines(self):
+        result = []
+        for table in sorted(self.tables):
+            counters = self.tables[table]
+            if counters['added'] or counters['modified'] or counters['deleted']:
+                result.append('{}: {added} added, {modified} modified ({fields} fields), {deleted} deleted, {unchanged} unchanged'.format(
+                    table, **counters))
+        result.append('Total: {} added, {} modified ({} fields), {} deleted, {} unchanged'.format(
+            self.total('added'), self.total('modified'), self.total('fields'), self.total('deleted'), self.total('unchanged')))
+        return result
+
+
+def _raw_field(configdb, field, value):
+    return list(configdb.typed_to_raw({field: value}).items())[0]
+
+
+def get_config_delta(configdb, current, data):
+    """
+    Compute the part of data which changes CONFIG_DB.
+    configdb is the connector used to serialize keys and values the way
+    mod_config() writes them, current is the output of configdb.get_config()
+    and data the input which would be passed to mod_config().
+    Return a tuple of the delta, to be passed to mod_config(), and a
+    ConfigDbDeltaSummary.
+    """
+    current_raw = {}
+    for table, entries in current.items():
+        table_raw = current_raw.setdefault(table.upper(), {})
+        for key, entry in entries.items():
+            table_raw[configdb.serialize_key(key)] = configdb.typed_to_raw(entry)
+
+    delta = {}
+    summary = ConfigDbDeltaSummary()
+    for table, entries in data.items():
+        existing = current_raw.get(table.upper(), {})
+        if entries is None:
+            if existing:
+                delta[table] = None
+                for _ in existing:
+                    summary.count(table, 'deleted')
+            continue
+
+        for key, entry in entries.items():
+            old = existing.get(configdb.serialize_key(key))
+            if entry is None:
+                if old is not None:
+                    delta.setdefault(table, {})[key] = None
+                    summary.count(table, 'deleted')
+                continue
+            if old is None:
+                delta.setdefault(table, {})[key] = entry
+                summary.count(table, 'added', len(entry))
+                continue
+
+            # An empty entry only requires the key to exist
+            changed = {}
+            for field, value in entry.items():
+                raw_field, raw_value = _raw_field(configdb, field, value)
+                if old.get(raw_field) != raw_value:
+                    changed[field] = value
+            if not changed:
+                summary.count(table, 'unchanged')
+            else:
+                delta.setdefault(table, {})[key] = changed
+                summary.count(table, 'modified', len(changed))
+    return delta, summary
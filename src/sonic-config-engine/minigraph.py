@@ -11,7 +11,7 @@ from collections import defaultdict
 
 
 from lxml import etree as ET
-from lxml.etree import QName
+from lxml.etree import QName as ET_QName
 
 from natsort import natsorted, ns as natsortns
 
@@ -44,6 +44,20 @@ ns1 = "http://schemas.datacontract.org/2004/07/Microsoft.Search.Autopilot.Evolut
 ns2 = "Microsoft.Search.Autopilot.NetMux"
 ns3 = "http://www.w3.org/2001/XMLSchema-instance"
 
+_qname_cache = {}
+
+def QName(namespace, tag):
+    """ Return the '{namespace}tag' name of a minigraph element.
+
+    The parsing functions look up the same few element names for every
+    element of the minigraph, so the names are built once and memoized.
+    """
+    key = (namespace, tag)
+    name = _qname_cache.get(key)
+    if name is None:
+        name = _qname_cache[key] = str(ET_QName(namespace, tag))
+    return name
+
 # Device types
 spine_chassis_frontend_role = 'SpineChassisFrontendRouter'
 chassis_backend_role = 'ChassisBackendRouter'
@@ -1878,6 +1892,12 @@ def enable_internal_bgp_session(bgp_sessions, filename, asic_name):
             (local_sub_role == BACKEND_ASIC_SUB_ROLE and peer_sub_role == FRONTEND_ASIC_SUB_ROLE)):
             bgp_sessions[peer_ip].update({'admin_status': 'up'})
 
+def get_dns_template_file():
+    """ Return the path of the template of the default DNS nameservers """
+    if os.environ.get("CFGGEN_UNIT_TESTING", "0") == "2":
+        return os.path.join(os.path.dirname(__file__), "tests/", "dns.j2")
+    return "/usr/share/sonic/templates/dns.j2"
+
 def select_mmu_profiles(profile, platform, hwsku):
     """
         Select MMU files based on the device metadata attribute - SonicQosProfile
@@ -1942,6 +1962,28 @@ def update_forced_mgmt_route(mgmt_intf, mgmt_routes):
 # Main functions
 #
 ###############################################################################
+
+# Top level minigraph elements consumed by parse_xml()
+MINIGRAPH_SECTIONS = frozenset(str(QName(ns, tag)) for tag in [
+    "Hostname", "HwSku", "DockerRoutingConfigMode",
+    "DpgDec", "CpgDec", "PngDec", "UngDec",
+    "MetadataDeclaration", "LinkMetadataDeclaration", "DeviceInfos",
+])
+
+def load_minigraph_root(filename):
+    """ Parse the minigraph file and return its root element, holding only
+    the top level sections parse_xml() consumes.
+
+    Ignorable whitespace between elements is not kept in the tree, which
+    noticeably lowers the memory needed for large minigraphs.
+    """
+    parser = ET.XMLParser(remove_blank_text=True)
+    root = ET.parse(filename, parser).getroot()
+    for child in list(root):
+        if child.tag not in MINIGRAPH_SECTIONS:
+            root.remove(child)
+    return root
+
 def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None, fabric_port_config_file=None ):
     """ Parse minigraph xml file.
 
@@ -1954,7 +1996,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     fabric_port_config_file -- fabric port config file name
      """
 
-    root = ET.parse(filename).getroot()
+    root = load_minigraph_root(filename)
 
     u_neighbors = None
     u_devices = None
@@ -2024,17 +2066,6 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     max_num_cores = None
     card_type = None
 
-    hwsku_qn = QName(ns, "HwSku")
-    hostname_qn = QName(ns, "Hostname")
-    docker_routing_config_mode_qn = QName(ns, "DockerRoutingConfigMode")
-    for child in root:
-        if child.tag == str(hwsku_qn):
-            hwsku = child.text
-        if child.tag == str(hostname_qn):
-            hostname = child.text
-        if child.tag == str(docker_routing_config_mode_qn):
-            docker_routing_config_mode = child.text
-
     hwsku, hostname, docker_routing_config_mode, chassis_type, chassis_hostname = parse_global_info(root)
 
     (ports, alias_map, alias_asic_map) = get_port_config(hwsku=hwsku, platform=platform, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
@@ -2056,44 +2087,51 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
     # Get the local device node from DeviceMetadata
     local_devices = parse_asic_meta_get_devices(root)
 
+    dpg_tag = str(QName(ns, "DpgDec"))
+    cpg_tag = str(QName(ns, "CpgDec"))
+    png_tag = str(QName(ns, "PngDec"))
+    ung_tag = str(QName(ns, "UngDec"))
+    meta_tag = str(QName(ns, "MetadataDeclaration"))
+    linkmeta_tag = str(QName(ns, "LinkMetadataDeclaration"))
+    deviceinfos_tag = str(QName(ns, "DeviceInfos"))
     for child in root:
         if asic_hostname is None:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == dpg_tag:
                 (intfs, lo_intfs, mvrf, mgmt_intf, voq_inband_intfs, vlans, vlan_members, dhcp_relay_table, pcs, pc_members, acls, acl_table_types, vni, tunnel_intfs, dpg_ecmp_content, static_routes, tunnel_intfs_qos_remap_config) = parse_dpg(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == cpg_tag:
                 (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors, bgp_sentinel_sessions) = parse_cpg(child, hostname)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == png_tag:
                 (neighbors, devices, console_dev, console_port, mgmt_dev, mgmt_port, port_speed_png, console_ports, mux_cable_ports, png_ecmp_content) = parse_png(child, hostname, dpg_ecmp_content)
-            elif child.tag == str(QName(ns, "UngDec")):
+            elif child.tag == ung_tag:
                 (u_neighbors, u_devices, _, _, _, _, _, _) = parse_png(child, hostname, None)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == meta_tag:
                 (syslog_servers, dhcp_servers, dhcpv6_servers, ntp_servers, tacacs_servers, mgmt_routes, erspan_dst, deployment_id, region, cloudtype, resource_type, downstream_subrole, switch_id, switch_type, max_cores, kube_data, macsec_profile, downstream_redundancy_types, redundancy_type, qos_profile, rack_mgmt_map) = parse_meta(child, hostname)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == linkmeta_tag:
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == deviceinfos_tag:
                 (port_speeds_default, port_descriptions, sys_ports) = parse_deviceinfo(child, hwsku)
         else:
-            if child.tag == str(QName(ns, "DpgDec")):
+            if child.tag == dpg_tag:
                 (intfs, lo_intfs, mvrf, mgmt_intf, voq_inband_intfs, vlans, vlan_members, dhcp_relay_table, pcs, pc_members, acls, acl_table_types, vni, tunnel_intfs, dpg_ecmp_content, static_routes, tunnel_intfs_qos_remap_config) = parse_dpg(child, asic_hostname)
                 host_lo_intfs = parse_host_loopback(child, hostname)
-            elif child.tag == str(QName(ns, "CpgDec")):
+            elif child.tag == cpg_tag:
                 (bgp_sessions, bgp_internal_sessions, bgp_voq_chassis_sessions, bgp_asn, bgp_peers_with_range, bgp_monitors, bgp_sentinel_sessions) = parse_cpg(child, asic_hostname, local_devices)
-            elif child.tag == str(QName(ns, "PngDec")):
+            elif child.tag == png_tag:
                 (neighbors, devices, port_speed_png) = parse_asic_png(child, asic_hostname, hostname)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == meta_tag:
                 (sub_role, switch_id, switch_type, max_cores, deployment_id, macsec_profile) = parse_asic_meta(child, asic_hostname)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == linkmeta_tag:
                 linkmetas = parse_linkmeta(child, hostname)
-            elif child.tag == str(QName(ns, "DeviceInfos")):
+            elif child.tag == deviceinfos_tag:
                 (port_speeds_default, port_descriptions, sys_ports) = parse_deviceinfo(child, hwsku)
 
         if chassis_hostname:
-            if child.tag == str(QName(ns, "DeviceInfos")):
+            if child.tag == deviceinfos_tag:
                 if asic_hostname is not None:
                     (sys_ports, chassis_port_alias, port_speeds_default) = parse_chassis_deviceinfo(child, chassis_linecards_info, chassis_hwsku, num_voq, chassis_type, voq_intf_attributes)
-            elif child.tag == str(QName(ns, "MetadataDeclaration")):
+            elif child.tag == meta_tag:
                 (syslog_servers, ntp_servers, tacacs_servers, mgmt_routes, erspan_dst, deployment_id, region, macsec_profile) = parse_chassis_meta(child, chassis_hostname)
-            elif child.tag == str(QName(ns, "LinkMetadataDeclaration")):
+            elif child.tag == linkmeta_tag:
                 linkmetas = parse_linkmeta(child, chassis_hostname)
 
     select_mmu_profiles(qos_profile, platform, hwsku)
@@ -2613,10 +2651,7 @@ def parse_xml(filename, platform=None, port_config_file=None, asic_name=None, hw
         results['NTP_SERVER'] = dict((item, {}) for item in ntp_servers)
         # Set default DNS nameserver from dns.j2
         results['DNS_NAMESERVER'] = {}
-        if os.environ.get("CFGGEN_UNIT_TESTING", "0") == "2":
-            dns_conf = os.path.join(os.path.dirname(__file__), "tests/", "dns.j2")
-        else:
-            dns_conf = "/usr/share/sonic/templates/dns.j2"
+        dns_conf = get_dns_template_file()
         if os.path.isfile(dns_conf):
             text = ""
             with open(dns_conf) as template_file:
@@ -2849,10 +2884,13 @@ def parse_device_desc_xml(filename):
     return results
 
 def parse_hostname(filename):
-    hostName = None
     if not os.path.isfile(filename):
         return None
     root = ET.parse(filename).getroot()
+    return parse_root_hostname(root)
+
+def parse_root_hostname(root):
+    hostName = None
     hostname_qn = QName(ns, "Hostname")
     for child in root:
         if child.tag == str(hostname_qn):
@@ -2865,18 +2903,33 @@ def parse_asic_sub_role(filename, asic_name):
     if not os.path.isfile(filename):
         return None
     root = ET.parse(filename).getroot()
-    for child in root:
-        if child.tag == str(QName(ns, "MetadataDeclaration")):
-            sub_role, _, _, _, _, _= parse_asic_meta(child, asic_name)
-            return sub_role
+    sub_role, _ = parse_root_asic_role_and_switch_type(root, asic_name)
+    return sub_role
 
 def parse_asic_switch_type(filename, asic_name):
     if os.path.isfile(filename):
         root = ET.parse(filename).getroot()
-        for child in root:
-            if child.tag == str(QName(ns, "MetadataDeclaration")):
-                _, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
-                return switch_type
+        _, switch_type = parse_root_asic_role_and_switch_type(root, asic_name)
+        return switch_type
+    return None
+
+def parse_root_asic_role_and_switch_type(root, asic_name):
+    """ Return (sub_role, switch_type) of asic_name from the metadata of an already parsed minigraph root """
+    for child in root:
+        if child.tag == str(QName(ns, "MetadataDeclaration")):
+            sub_role, _, switch_type, _, _, _ = parse_asic_meta(child, asic_name)
+            return sub_role, switch_type
+    return None, None
+
+def parse_root_qos_profile(root, asic_name=None):
+    """ Return the SonicQosProfile parse_xml() selects the MMU profiles of, from an already parsed minigraph root """
+    _, hostname, _, chassis_type, _ = parse_global_info(root)
+    if get_asic_hostname_from_asic_name(chassis_type, asic_name, hostname) is not None:
+        return None
+    for child in root:
+        if child.tag == str(QName(ns, "MetadataDeclaration")):
+            # qos_profile is the one before last value returned by parse_meta
+            return parse_meta(child, hostname)[-2]
     return None
 
 def parse_asic_meta_get_devices(root):
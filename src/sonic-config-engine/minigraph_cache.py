@@ -0,0 +1,242 @@
+"""minigraph_cache.py
+
+Persistent on-disk cache of parsed minigraph data.
+
+Every sonic-cfggen -m invocation used to re-parse the whole minigraph xml,
+which is costly during boot and config load_minigraph where dozens of
+sonic-cfggen processes are run against the same file. The parsed result is
+pickled into a cache directory and reused as long as the minigraph content
+and every other input of parse_xml() are unchanged.
+
+parse_xml() also consults the PORT, FABRIC_PORT and FABRIC_MONITOR tables of
+CONFIG_DB, so their content is part of the cache key as well. The files it
+finds in the device directory of the hwsku (port_config.ini, platform.json,
+hwsku.json, fabric port and monitor config) and the dns template depend on
+the parse result; their paths and digests are stored in the entry and
+checked again when it is loaded.
+
+parse_xml() copies the MMU profile files of the SonicQosProfile into the
+hwsku directory, so the copy is done again when an entry is loaded.
+
+Each combination of (minigraph path, platform, port config, hwsku config,
+asic name) owns one cache slot. A slot stores the full key it was generated
+from, so a change of any input file content invalidates the entry and the
+slot is simply overwritten by the next parse.
+"""
+
+from __future__ import print_function
+
+import hashlib
+import os
+import pickle
+import sys
+import tempfile
+
+from lxml import etree as ET
+
+import minigraph
+import portconfig
+
+from sonic_py_common import device_info
+from sonic_py_common.multi_asic import get_asic_id_from_name
+
+DEFAULT_CACHE_DIR = '/var/cache/sonic/cfggen'
+
+# Bump whenever the layout of a cache entry changes
+CACHE_FORMAT_VERSION = 2
+
+CACHE_FILE_SUFFIX = '.minigraph.pickle'
+
+# Source modules whose code determines the parse result. A change to any of
+# them (e.g. image upgrade) invalidates all existing entries.
+_PARSER_MODULES = ['minigraph', 'portconfig']
+
+
+def _file_digest(filename):
+    """ Return sha256 hex digest of the file content or None if it can't be read """
+    if filename is None:
+        return None
+    sha = hashlib.sha256()
+    try:
+        with open(filename, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                sha.update(chunk)
+    except (IOError, OSError):
+        return None
+    return sha.hexdigest()
+
+
+def _config_db_digest(asic_name, port_config_file):
+    """ Return sha256 hex digest of the CONFIG_DB tables parse_xml() reads """
+    config_db = portconfig.db_connect_configdb(asic_name)
+    if config_db is None:
+        return None
+    tables = ['FABRIC_PORT', 'FABRIC_MONITOR']
+    if port_config_file is None:
+        tables.append('PORT')
+    sha = hashlib.sha256()
+    for table in tables:
+        content = config_db.get_table(table)
+        entries = sorted((repr(key), sorted(fields.items())) for key, fields in content.items())
+        sha.update(repr((table, entries)).encode('utf-8'))
+    return sha.hexdigest()
+
+
+def _dependencies(hwsku, platform, port_config_file, asic_name, hwsku_config_file):
+    """ Return (path, sha256 hex digest) of the files parse_xml() reads from the device directory of the hwsku """
+    asic_id = None
+    if asic_name is not None:
+        asic_id = str(get_asic_id_from_name(asic_name))
+    files = []
+    if not port_config_file:
+        port_config_file = device_info.get_path_to_port_config_file(hwsku, asic_id)
+        files.append(port_config_file)
+    if port_config_file and port_config_file.endswith('.json') and not hwsku_config_file:
+        files.append(portconfig.get_hwsku_file_name(hwsku, platform))
+    files.append(device_info.get_path_to_fabric_port_config_file(hwsku, asic_id))
+    files.append(device_info.get_path_to_fabric_monitor_config_file(hwsku, asic_id))
+    files.append(minigraph.get_dns_template_file())
+    return [(filename, _file_digest(filename)) for filename in files]
+
+
+def _parser_signature():
+    signature = []
+    for name in _PARSER_MODULES:
+        module = sys.modules.get(name)
+        path = getattr(module, '__file__', None)
+        if not path:
+            signature.append((name, None))
+            continue
+        try:
+            st = os.stat(path)
+            signature.append((name, st.st_size, int(st.st_mtime)))
+        except OSError:
+            signature.append((name, None))
+    return signature
+
+
+class MinigraphCache(object):
+    """ Cache of minigraph.parse_xml() results and of the root level
+    attributes sonic-cfggen reads from the same file (hostname, asic sub
+    role and asic switch type).
+    """
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR, enabled=True):
+        self.cache_dir = cache_dir
+        # Unit tests run the parser against mocked platform data which must
+        # never be persisted
+        self.enabled = enabled and not os.environ.get("CFGGEN_UNIT_TESTING")
+        self.hit = False
+
+    def _slot_path(self, filename, platform, port_config_file, asic_name, hwsku_config_file):
+        slot = repr((os.path.abspath(filename), platform, port_config_file, asic_name, hwsku_config_file))
+        name = hashlib.sha1(slot.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, name + CACHE_FILE_SUFFIX)
+
+    def _key(self, filename, platform, port_config_file, asic_name, hwsku_config_file):
+        minigraph_digest = _file_digest(filename)
+        if minigraph_digest is None:
+            return None
+        return (
+            CACHE_FORMAT_VERSION,
+            tuple(sys.version_info[:2]),
+            minigraph_digest,
+            platform,
+            port_config_file,
+            _file_digest(port_config_file),
+            hwsku_config_file,
+            _file_digest(hwsku_config_file),
+            asic_name,
+            _config_db_digest(asic_name, port_config_file),
+            os.environ.get("CFGGEN_UNIT_TESTING_TOPOLOGY"),
+            tuple(_parser_signature()),
+        )
+
+    def _load(self, path, key, platform, port_config_file, asic_name, hwsku_config_file):
+        try:
+            with open(path, 'rb') as f:
+                entry = pickle.load(f)
+        except Exception:
+            return None
+        if not isinstance(entry, dict) or entry.get('key') != key:
+            return None
+        if entry.get('deps') != _dependencies(entry['hwsku'], platform, port_config_file, asic_name, hwsku_config_file):
+            return None
+        return entry
+
+    def _store(self, path, entry):
+        try:
+            if not os.path.isdir(self.cache_dir):
+                os.makedirs(self.cache_dir, 0o755)
+            fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(entry, f, pickle.HIGHEST_PROTOCOL)
+                os.rename(tmp_path, path)
+            except Exception:
+                os.unlink(tmp_path)
+                raise
+        except Exception as e:
+            print('Warning: failed to write minigraph cache {}: {}'.format(path, e), file=sys.stderr)
+
+    def _parse(self, filename, platform, port_config_file, asic_name, hwsku_config_file):
+        if platform:
+            data = minigraph.parse_xml(filename, platform, port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+        else:
+            data = minigraph.parse_xml(filename, port_config_file=port_config_file, asic_name=asic_name, hwsku_config_file=hwsku_config_file)
+
+        root = ET.parse(filename).getroot()
+        hostname = minigraph.parse_root_hostname(root)
+        hwsku = minigraph.parse_global_info(root)[0]
+        sub_role, switch_type = None, None
+        if asic_name is not None:
+            sub_role, switch_type = minigraph.parse_root_asic_role_and_switch_type(root, asic_name)
+
+        return {
+            'data': data,
+            'hostname': hostname,
+            'asic_sub_role': sub_role,
+            'asic_switch_type': switch_type,
+            'hwsku': hwsku,
+            'qos_profile': minigraph.parse_root_qos_profile(root, asic_name),
+        }
+
+    def get(self, filename, platform=None, port_config_file=None, asic_name=None, hwsku_config_file=None):
+        """ Return the parsed minigraph entry, a dict with keys 'data',
+        'hostname', 'asic_sub_role' and 'asic_switch_type'.
+
+        The entry is loaded from the cache when all inputs are unchanged,
+        otherwise the minigraph is parsed and the cache slot is refreshed.
+        The returned 'data' is owned by the caller and may be modified.
+        """
+        self.hit = False
+        key = None
+        path = None
+        if self.enabled:
+            key = self._key(filename, platform, port_config_file, asic_name, hwsku_config_file)
+        if key is not None:
+            path = self._slot_path(filename, platform, port_config_file, asic_name, hwsku_config_file)
+            entry = self._load(path, key, platform, port_config_file, asic_name, hwsku_config_file)
+            if entry is not None:
+                self.hit = True
+                # Done by parse_xml() on a miss
+                minigraph.select_mmu_profiles(entry['qos_profile'], platform, entry['hwsku'])
+                return entry
+
+        entry = self._parse(filename, platform, port_config_file, asic_name, hwsku_config_file)
+        if key is not None:
+            entry['key'] = key
+            entry['deps'] = _dependencies(entry['hwsku'], platform, port_config_file, asic_name, hwsku_config_file)
+            self._store(path, entry)
+        return entry
+
+    def clear(self):
+        """ Remove all cached minigraph entries """
+        if not os.path.isdir(self.cache_dir):
+            return
+        for name in os.listdir(self.cache_dir):
+            if name.endswith(CACHE_FILE_SUFFIX):
+                try:
+                    os.unlink(os.path.join(self.cache_dir, name))
+                except OSError:
+                    pass
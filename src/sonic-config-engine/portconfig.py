@@ -41,6 +41,14 @@ OPTIONAL_HWSKU_ATTRIBUTES = ["fec", "autoneg", "role"]
 
 BRKOUT_PATTERN = r'(\d{1,6})x(\d{1,6}G?)(\[(\d{1,6}G?,?)*\])?(\((\d{1,6})\))?'
 BRKOUT_PATTERN_GROUPS = 6
+BRKOUT_RE = re.compile(BRKOUT_PATTERN)
+
+# Parsed 'platform.json' files: path -> (file signature, content)
+_platform_json_cache = {}
+# Breakout mode entries: (breakout mode, number of lanes) -> tuple of BreakoutModeEntry
+_breakout_entries_cache = {}
+# Breakout mode lookup tables: (supported breakout modes, number of lanes) -> {entries: breakout mode}
+_breakout_table_cache = {}
 
 #
 # Helper Functions
@@ -68,6 +76,28 @@ def readJson(filename):
         print("error occurred while parsing json: {}".format(sys.exc_info()[1]))
         return None
 
+def _file_signature(filename):
+    try:
+        st = os.stat(filename)
+    except OSError:
+        return None
+    return (st.st_mtime_ns, st.st_size, st.st_ino)
+
+def load_platform_json(platform_json_file):
+    """
+    Read 'platform.json' once per process. The parsed content is reused
+    as long as the file mtime, size and inode don't change.
+    The returned dictionary is shared and must not be modified.
+    """
+    signature = _file_signature(platform_json_file)
+    cached = _platform_json_cache.get(platform_json_file)
+    if signature is not None and cached is not None and cached[0] == signature:
+        return cached[1]
+    port_dict = readJson(platform_json_file)
+    if signature is not None and port_dict is not None:
+        _platform_json_cache[platform_json_file] = (signature, port_dict)
+    return port_dict
+
 def db_connect_configdb(namespace=None):
     """
     Connect to configdb
@@ -303,7 +333,7 @@ class BreakoutCfg(object):
             return not self == other
 
         def __hash__(self):
-            return hash((self.num_ports, tuple(self.supported_speed), self.num_assigned_lanes))
+            return hash((self.num_ports, frozenset(self.supported_speed), self.num_assigned_lanes))
 
     def __init__(self, name, bmode, properties):
         self._interface_base_id = int(name.replace(PORT_STR, ''))
@@ -314,14 +344,29 @@ class BreakoutCfg(object):
         self._breakout_capabilities = None
 
         # Find specified breakout mode in port breakout mode capabilities
-        for supported_mode in self._properties['breakout_modes']:
-            if self._breakout_mode_entry == self._str_to_entries(supported_mode):
-                self._breakout_capabilities = self._properties['breakout_modes'][supported_mode]
-                break
+        supported_mode = self._breakout_mode_table().get(self._breakout_mode_entry)
+        if supported_mode is not None:
+            self._breakout_capabilities = self._properties['breakout_modes'][supported_mode]
 
         if not self._breakout_capabilities:
             raise RuntimeError("Unsupported breakout mode {}!".format(bmode))
 
+    def _breakout_mode_table(self):
+        """
+        Map the entries of every supported breakout mode of the port to the
+        mode name. Ports with the same supported modes and number of lanes
+        share the table. The first mode wins if several modes have the same
+        entries.
+        """
+        key = (tuple(self._properties['breakout_modes']), len(self._lanes))
+        table = _breakout_table_cache.get(key)
+        if table is None:
+            table = {}
+            for supported_mode in self._properties['breakout_modes']:
+                table.setdefault(self._str_to_entries(supported_mode), supported_mode)
+            _breakout_table_cache[key] = table
+        return table
+
     def _re_group_to_entry(self, group):
         if len(group) != BRKOUT_PATTERN_GROUPS:
             raise RuntimeError("Unsupported breakout mode format!")
@@ -343,12 +388,19 @@ class BreakoutCfg(object):
             2x50G ---------------> [('2', '50G', None, None, None)]
         """
 
+        key = (bmode, len(self._lanes))
+        entries = _breakout_entries_cache.get(key)
+        if entries is not None:
+            return entries
+
         try:
-            groups_list = [re.match(BRKOUT_PATTERN, i).groups() for i in bmode.split("+")]
+            groups_list = [BRKOUT_RE.match(i).groups() for i in bmode.split("+")]
         except Exception:
             raise RuntimeError('Breakout mode "{}" validation failed!'.format(bmode))
 
-        return [self._re_group_to_entry(group) for group in groups_list]
+        entries = tuple(self._re_group_to_entry(group) for group in groups_list)
+        _breakout_entries_cache[key] = entries
+        return entries
 
     def get_config(self):
         # Ensure that we have corret number of configured lanes
@@ -393,12 +445,30 @@ Given a port and breakout mode, this method returns
 the list of child ports using platform_json file
 """
 def get_child_ports(interface, breakout_mode, platform_json_file):
-    port_dict = readJson(platform_json_file)
+    port_dict = load_platform_json(platform_json_file)
 
     mode_handler = BreakoutCfg(interface, breakout_mode, port_dict[INTF_KEY][interface])
 
     return mode_handler.get_config()
 
+"""
+Given a dictionary of ports and their breakout modes, this method returns
+the child ports of every port, using the platform_json file read once
+"""
+def get_child_ports_bulk(breakout_modes, platform_json_file):
+    return expand_breakout_ports(load_platform_json(platform_json_file), breakout_modes)
+
+def expand_breakout_ports(port_dict, breakout_modes):
+    """
+    Expand ports in one pass over the parsed platform.json content
+    :param port_dict: parsed platform.json content
+    :param breakout_modes: dictionary interface -> breakout mode
+    :return: dictionary interface -> child ports of the interface
+    """
+    interfaces = port_dict[INTF_KEY]
+    return {interface: BreakoutCfg(interface, breakout_mode, interfaces[interface]).get_config()
+            for interface, breakout_mode in breakout_modes.items()}
+
 def parse_platform_json_file(hwsku_json_file, platform_json_file):
     ports = {}
     port_alias_map = {}
@@ -415,17 +485,17 @@ def parse_platform_json_file(hwsku_json_file, platform_json_file):
     if INTF_KEY not in port_dict or INTF_KEY not in  hwsku_dict:
         raise Exception("INTF_KEY is not present in appropriate file")
 
+    brkout_modes = {}
     for intf in port_dict[INTF_KEY]:
         if intf not in hwsku_dict[INTF_KEY]:
             raise Exception("{} is not available in hwsku_dict".format(intf))
 
         # take default_brkout_mode from hwsku.json
-        brkout_mode = hwsku_dict[INTF_KEY][intf][BRKOUT_MODE]
-
-        child_ports = get_child_ports(intf, brkout_mode, platform_json_file)
+        brkout_modes[intf] = hwsku_dict[INTF_KEY][intf][BRKOUT_MODE]
 
+    hwsku_entry = hwsku_dict[INTF_KEY]
+    for intf, child_ports in expand_breakout_ports(port_dict, brkout_modes).items():
         # take optional fields from hwsku.json
-        hwsku_entry = hwsku_dict[INTF_KEY]
         for child_port in child_ports:
             if child_port in hwsku_entry:
                 for key, item in hwsku_entry[child_port].items():
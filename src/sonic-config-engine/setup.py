@@ -48,8 +48,10 @@ else:
 
 # Common modules for python2 and python3
 py_modules = [
+    'config_db_delta',
     'config_samples',
     'minigraph',
+    'minigraph_cache',
     'openconfig_acl',
     'portconfig',
     'smartswitch_config'
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Compare the time needed to render the same templates with one sonic-cfggen
+process per template, with a single 'sonic-cfggen --batch' run and with
+invocations forwarded to a 'sonic-cfggen --server' instance.
+
+Usage:
+    python3 tests/cfggen_batch_benchmark.py [-n COUNT] [-d]
+
+By default the data is loaded from a json file so the benchmark runs without
+a redis instance; -d reads CONFIG_DB instead, as docker start scripts do.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+SCRIPT = os.path.join(TEST_DIR, '..', 'sonic-cfggen')
+TEMPLATES = ['sample-template-1.json.j2', 'sample-template-2.json.j2', 'test.j2', 'test2.j2']
+DATA = {"key1": "value", "key1_1": "value1_1", "key1_2": "value1_2", "key2_1": "value2_1", "key2_2": "value2_2",
+        "yml_item": ["value1", "value2"]}
+
+
+def timed(func):
+    start = time.time()
+    func()
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=20, help='number of templates to render')
+    parser.add_argument('-d', '--from-db', action='store_true', help='read data from CONFIG_DB')
+    args = parser.parse_args()
+
+    work_dir = tempfile.mkdtemp()
+    try:
+        data_file = os.path.join(work_dir, 'data.json')
+        with open(data_file, 'w') as f:
+            json.dump(DATA, f)
+        source = ['-d'] if args.from_db else ['-j', data_file]
+
+        jobs = []
+        for i in range(args.count):
+            template = os.path.join(TEST_DIR, TEMPLATES[i % len(TEMPLATES)])
+            jobs.append({'template': template, 'dest': os.path.join(work_dir, 'out{}'.format(i))})
+        manifest = os.path.join(work_dir, 'manifest.json')
+        with open(manifest, 'w') as f:
+            json.dump(jobs, f)
+
+        def forks(env=None):
+            for job in jobs:
+                subprocess.check_call([sys.executable, SCRIPT] + source + ['-t', job['template'] + ',' + job['dest']], env=env)
+
+        def batch():
+            subprocess.check_call([sys.executable, SCRIPT] + source + ['--batch', manifest])
+
+        sock = os.path.join(work_dir, 'cfggen.sock')
+        server = subprocess.Popen([sys.executable, SCRIPT, '--server', sock])
+        try:
+            while not os.path.exists(sock):
+                time.sleep(0.05)
+            env = dict(os.environ, SONIC_CFGGEN_SOCKET=sock)
+            # Warm up the server so the first-request import of lazily loaded modules isn't measured
+            forks(env)
+
+            fork_time = timed(forks)
+            batch_time = timed(batch)
+            server_time = timed(lambda: forks(env))
+        finally:
+            server.terminate()
+            server.wait()
+
+        print('{} templates'.format(args.count))
+        print('  one process per template : {:8.3f}s'.format(fork_time))
+        print('  single --batch run        : {:8.3f}s ({:.1f}x)'.format(batch_time, fork_time / batch_time))
+        print('  forwarded to --server     : {:8.3f}s ({:.1f}x)'.format(server_time, fork_time / server_time))
+    finally:
+        shutil.rmtree(work_dir)
+
+
+if __name__ == '__main__':
+    main()
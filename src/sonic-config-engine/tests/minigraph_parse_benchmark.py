@@ -0,0 +1,70 @@
+#!/usr/bin/env python3
+"""
+Report wall time and peak RSS of loading minigraph files with a full
+ElementTree parse and with minigraph.load_minigraph_root(), and of the
+complete minigraph.parse_xml().
+
+Every measurement runs in a fresh interpreter so peak RSS values are
+independent of each other.
+
+Usage (from src/sonic-config-engine):
+    python3 tests/minigraph_parse_benchmark.py [MINIGRAPH ...]
+
+Without arguments all the sample minigraphs under tests/ are measured.
+"""
+
+import glob
+import json
+import os
+import subprocess
+import sys
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+MODULES_DIR = os.path.join(TEST_DIR, '..')
+
+MEASURE = '''
+import json, resource, sys, time
+sys.path.insert(0, sys.argv[1])
+import minigraph
+from lxml import etree as ET
+mode, filename = sys.argv[2], sys.argv[3]
+base_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+start = time.time()
+if mode == 'etree':
+    root = ET.parse(filename).getroot()
+elif mode == 'pruned':
+    root = minigraph.load_minigraph_root(filename)
+else:
+    minigraph.parse_xml(filename)
+elapsed = time.time() - start
+rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+print(json.dumps({'time': elapsed, 'rss': rss, 'delta_rss': rss - base_rss}))
+'''
+
+
+def measure(mode, filename):
+    output = subprocess.check_output([sys.executable, '-c', MEASURE, MODULES_DIR, mode, filename],
+                                     stderr=subprocess.DEVNULL)
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def main():
+    files = sys.argv[1:] or sorted(glob.glob(os.path.join(TEST_DIR, '*.xml')))
+    print('{:<60} {:>8} {:>22} {:>22} {:>10}'.format('minigraph', 'size KB', 'etree load ms/KB', 'pruned load ms/KB', 'parse ms'))
+    for filename in files:
+        try:
+            etree = measure('etree', filename)
+            pruned = measure('pruned', filename)
+            parse = measure('parse', filename)
+        except subprocess.CalledProcessError:
+            print('{:<60} failed to parse'.format(os.path.basename(filename)))
+            continue
+        print('{:<60} {:>8} {:>12.2f} /{:>8} {:>12.2f} /{:>8} {:>10.2f}'.format(
+            os.path.basename(filename), os.path.getsize(filename) // 1024,
+            etree['time'] * 1000, etree['delta_rss'],
+            pruned['time'] * 1000, pruned['delta_rss'],
+            parse['time'] * 1000))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Report the time of expanding the default breakout modes of all the ports of
+a platform, as done by sonic-cfggen -k/-p and by dynamic port breakout:
+  - per port   : platform.json is read and the supported breakout modes are
+                 parsed again for every port (the previous behavior)
+  - bulk       : portconfig.parse_platform_json_file(), one read and one pass
+  - cached     : portconfig.get_child_ports() for every port, as a long running
+                 process does, with platform.json already loaded
+
+Usage (from src/sonic-config-engine):
+    python3 tests/portconfig_benchmark.py [PLATFORM_JSON HWSKU_JSON]
+
+Without arguments the largest platform.json of the device tree is measured.
+"""
+
+import glob
+import os
+import sys
+import time
+
+TEST_DIR = os.path.dirname(os.path.realpath(__file__))
+sys.path.insert(0, os.path.join(TEST_DIR, '..'))
+
+import portconfig
+
+DEVICE_DIR = os.path.join(TEST_DIR, '..', '..', '..', 'device')
+ROUNDS = 10
+
+
+def largest_platform():
+    candidates = []
+    for platform_json in glob.glob(os.path.join(DEVICE_DIR, '*', '*', portconfig.PLATFORM_JSON)):
+        hwsku_jsons = glob.glob(os.path.join(os.path.dirname(platform_json), '*', portconfig.HWSKU_JSON))
+        if hwsku_jsons:
+            candidates.append((os.path.getsize(platform_json), platform_json, sorted(hwsku_jsons)[0]))
+    _, platform_json, hwsku_json = max(candidates)
+    return platform_json, hwsku_json
+
+
+def clear_caches():
+    portconfig._platform_json_cache.clear()
+    portconfig._breakout_entries_cache.clear()
+    portconfig._breakout_table_cache.clear()
+
+
+def per_port(platform_json, modes):
+    for interface, mode in modes.items():
+        clear_caches()
+        port_dict = portconfig.readJson(platform_json)
+        portconfig.BreakoutCfg(interface, mode, port_dict[portconfig.INTF_KEY][interface]).get_config()
+
+
+def bulk(platform_json, hwsku_json):
+    clear_caches()
+    portconfig.parse_platform_json_file(hwsku_json, platform_json)
+
+
+def cached(platform_json, modes):
+    for interface, mode in modes.items():
+        portconfig.get_child_ports(interface, mode, platform_json)
+
+
+def measure(func, *args):
+    start = time.time()
+    for _ in range(ROUNDS):
+        func(*args)
+    return (time.time() - start) * 1000 / ROUNDS
+
+
+def main():
+    if len(sys.argv) == 3:
+        platform_json, hwsku_json = sys.argv[1:]
+    else:
+        platform_json, hwsku_json = largest_platform()
+
+    hwsku_dict = portconfig.readJson(hwsku_json)
+    modes = {interface: value[portconfig.BRKOUT_MODE] for interface, value in hwsku_dict[portconfig.INTF_KEY].items()}
+
+    print('{} ({} bytes), {} ports'.format(os.path.relpath(platform_json), os.path.getsize(platform_json), len(modes)))
+    per_port_time = measure(per_port, platform_json, modes)
+    bulk_time = measure(bulk, platform_json, hwsku_json)
+    cached_time = measure(cached, platform_json, modes)
+    print('  per port : {:8.2f} ms'.format(per_port_time))
+    print('  bulk     : {:8.2f} ms ({:.0f}x)'.format(bulk_time, per_port_time / bulk_time))
+    print('  cached   : {:8.2f} ms ({:.0f}x)'.format(cached_time, per_port_time / cached_time))
+
+
+if __name__ == '__main__':
+    main()
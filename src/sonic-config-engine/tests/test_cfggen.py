@@ -213,6 +213,28 @@ class TestCfgGen(TestCase):
         for key, value in data.items():
             self.assertEqual(output_data[key.replace("key", "jk")], value)
 
+    def test_template_manifest_batch_mode(self):
+        manifest = [
+            {'template': os.path.join(self.test_dir, 'test.j2'), 'dest': self.output_file},
+            {'template': os.path.join(self.test_dir, 'test2.j2'), 'dest': self.output2_file, 'data': {'key1': 'job_value'}},
+            {'template': os.path.join(self.test_dir, 'test2.j2')},
+        ]
+        manifest_file = os.path.join(self.test_dir, 'batch_manifest.json')
+        with open(manifest_file, 'w') as f:
+            json.dump(manifest, f)
+        argument = ['-y', os.path.join(self.test_dir, 'test.yml')]
+        argument += ['-a', '{"key1":"value"}']
+        argument += ['--batch', manifest_file]
+        try:
+            output = self.run_script(argument)
+        finally:
+            os.remove(manifest_file)
+        self.assertEqual(output.strip(), 'value')
+        with open(self.output_file) as tf:
+            self.assertEqual(tf.read().strip(), 'value1\nvalue2')
+        with open(self.output2_file) as tf:
+            self.assertEqual(tf.read().strip(), 'job_value')
+
     # FIXME: This test depends heavily on the ordering of the interfaces and
     # it is not at all intuitive what that ordering should be. Could make it
     # more robust by adding better parsing logic.
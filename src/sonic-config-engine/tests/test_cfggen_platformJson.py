@@ -7,6 +7,7 @@ import ast
 import tests.common_utils as utils
 
 from unittest import TestCase
+import portconfig
 from portconfig import get_port_config, INTF_KEY
 
 if sys.version_info.major == 3:
@@ -116,3 +117,26 @@ class TestCfgGenPlatformJson(TestCase):
         (ports, _, _) = get_port_config(port_config_file=self.platform_json)
         self.assertNotEqual(ports, None)
         self.assertEqual(ports, {})
+
+    def test_get_child_ports_bulk(self):
+        hwsku_dict = portconfig.readJson(self.hwsku_json)
+        platform_dict = portconfig.readJson(self.platform_json)
+        modes = {intf: hwsku_dict[INTF_KEY][intf]['default_brkout_mode'] for intf in platform_dict[INTF_KEY]}
+
+        bulk = portconfig.get_child_ports_bulk(modes, self.platform_json)
+        self.assertEqual(sorted(bulk.keys()), sorted(modes.keys()))
+        for intf, mode in modes.items():
+            self.assertEqual(bulk[intf], portconfig.get_child_ports(intf, mode, self.platform_json))
+
+    def test_platform_json_loaded_once(self):
+        portconfig._platform_json_cache.clear()
+        with mock.patch('portconfig.readJson', wraps=portconfig.readJson) as read_mocked:
+            portconfig.get_child_ports('Ethernet0', '1x100G[40G]', self.platform_json)
+            portconfig.get_child_ports('Ethernet0', '4x25G[10G]', self.platform_json)
+            self.assertEqual(read_mocked.call_count, 1)
+
+    def test_breakout_mode_format_error(self):
+        with self.assertRaises(RuntimeError):
+            portconfig.get_child_ports('Ethernet0', 'bad', self.platform_json)
+        with self.assertRaises(RuntimeError):
+            portconfig.get_child_ports('Ethernet0', '3x33G', self.platform_json)
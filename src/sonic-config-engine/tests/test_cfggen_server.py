@@ -0,0 +1,135 @@
+import json
+import os
+import shutil
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+from importlib.machinery import SourceFileLoader
+from io import StringIO
+from unittest import TestCase, mock
+
+test_dir = os.path.dirname(os.path.realpath(__file__))
+sonic_cfggen = SourceFileLoader('sonic_cfggen', os.path.join(test_dir, '..', 'sonic-cfggen')).load_module()
+
+
+class TestCachedConfigDbReader(TestCase):
+
+    def setUp(self):
+        self.reader = sonic_cfggen.CachedConfigDbReader()
+        self.slot = (None, ())
+        self.reads = 0
+        self.changed_during_read = False
+        self.watch = mock.patch.object(sonic_cfggen.CachedConfigDbReader, '_watch')
+        self.watch.start()
+        self.read = mock.patch.object(sonic_cfggen.ConfigDbReader, 'get_config', side_effect=self.read_config_db,
+                                      autospec=True)
+        self.read.start()
+
+    def tearDown(self):
+        self.read.stop()
+        self.watch.stop()
+
+    def read_config_db(self, reader, namespace, db_kwargs):
+        self.reads += 1
+        if self.changed_during_read:
+            # a keyspace notification received by the watcher while CONFIG_DB is read
+            self.changed_during_read = False
+            with self.reader.lock:
+                self.reader._invalidate(self.slot)
+        return {'DEVICE_METADATA': {'localhost': {'hostname': 'switch{}'.format(self.reads)}}}
+
+    def notify(self):
+        with self.reader.lock:
+            self.reader._invalidate(self.slot)
+
+    def test_snapshot(self):
+        config = self.reader.get_config(None, {})
+        self.assertEqual(self.reads, 1)
+        config['DEVICE_METADATA'] = {}
+        self.assertEqual(self.reader.get_config(None, {})['DEVICE_METADATA']['localhost']['hostname'], 'switch1')
+        self.assertEqual(self.reads, 1)
+
+        self.notify()
+        self.assertEqual(self.reader.get_config(None, {})['DEVICE_METADATA']['localhost']['hostname'], 'switch2')
+        self.assertEqual(self.reads, 2)
+
+    def test_change_during_read(self):
+        self.changed_during_read = True
+        self.reader.get_config(None, {})
+        # the snapshot may miss the change, it is read again
+        self.assertNotIn(self.slot, self.reader.snapshots)
+        self.assertEqual(self.reader.get_config(None, {})['DEVICE_METADATA']['localhost']['hostname'], 'switch2')
+        self.reader.get_config(None, {})
+        self.assertEqual(self.reads, 2)
+
+    def test_not_watched(self):
+        self.watch.stop()
+        with mock.patch.object(sonic_cfggen.CachedConfigDbReader, '_watch', side_effect=Exception('no redis')):
+            self.reader.get_config(None, {})
+            self.reader.get_config(None, {})
+        self.watch.start()
+        self.assertEqual(self.reads, 2)
+
+
+class TestCfgGenServer(TestCase):
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.server = sonic_cfggen.CfgGenServer(os.path.join(self.tmp_dir, 'sonic-cfggen.sock'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def test_stdin_json(self):
+        for path in ['/dev/stdin', '/dev/fd/0']:
+            response = self.server.handle({'argv': ['-j', path, '-v', 'key1'], 'cwd': self.tmp_dir,
+                                           'stdin': '{"key1": "value"}'})
+            self.assertEqual(response, {'rc': 0, 'stdout': 'value\n', 'stderr': ''})
+        response = self.server.handle({'argv': ['--json=/dev/stdin', '-v', 'key1'], 'cwd': self.tmp_dir,
+                                       'stdin': '{"key1": "value"}'})
+        self.assertEqual(response['stdout'], 'value\n')
+
+    def test_stdin_batch_manifest(self):
+        manifest = [{'template': os.path.join(test_dir, 'test2.j2')}]
+        stdin = sys.stdin
+        response = self.server.handle({'argv': ['-a', '{"key1": "value"}', '--batch', '-'], 'cwd': self.tmp_dir,
+                                       'stdin': json.dumps(manifest)})
+        self.assertEqual(response, {'rc': 0, 'stdout': 'value\n', 'stderr': ''})
+        self.assertIs(sys.stdin, stdin)
+
+    def test_stdin_not_forwarded(self):
+        response = self.server.handle({'argv': ['-j', '/dev/stdin', '-v', 'key1'], 'cwd': self.tmp_dir})
+        self.assertEqual(response['rc'], 1)
+        self.assertIn('stdin', response['stderr'])
+
+    def test_forward_stdin(self):
+        thread = threading.Thread(target=self.server.serve_forever)
+        thread.daemon = True
+        thread.start()
+        for _ in range(100):
+            # the server answers this empty request with an error once it listens
+            probe = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                probe.connect(self.server.socket_path)
+                break
+            except OSError:
+                time.sleep(0.01)
+            finally:
+                probe.close()
+
+        stdout = StringIO()
+        with mock.patch.object(sys, 'stdin', StringIO('{"key1": "value"}')), \
+                mock.patch.object(sys, 'stdout', stdout):
+            rc = sonic_cfggen._forward_to_server(self.server.socket_path, ['-j', '/dev/stdin', '-v', 'key1'])
+        self.assertEqual(rc, 0)
+        self.assertEqual(stdout.getvalue(), 'value\n')
+
+    def test_reads_stdin(self):
+        self.assertTrue(sonic_cfggen._reads_stdin(['--batch', '-']))
+        self.assertTrue(sonic_cfggen._reads_stdin(['--batch=-']))
+        self.assertTrue(sonic_cfggen._reads_stdin(['-j/dev/stdin']))
+        self.assertTrue(sonic_cfggen._reads_stdin(['-y', '/proc/self/fd/0']))
+        self.assertFalse(sonic_cfggen._reads_stdin(['-j', 'db.json', '-t', 'a.j2,-v']))
@@ -0,0 +1,88 @@
+from unittest import TestCase
+
+from config_db_delta import get_config_delta
+
+
+class ConfigDbSerializer(object):
+    """ Key and value serialization of swsscommon ConfigDBConnector """
+
+    @staticmethod
+    def serialize_key(key):
+        if type(key) is tuple:
+            return '|'.join(key)
+        return str(key)
+
+    @staticmethod
+    def typed_to_raw(typed_data):
+        if len(typed_data) == 0:
+            return {'NULL': 'NULL'}
+        raw_data = {}
+        for field, value in typed_data.items():
+            if type(value) is list:
+                raw_data[field + '@'] = ','.join(value)
+            else:
+                raw_data[field] = str(value)
+        return raw_data
+
+
+class TestConfigDbDelta(TestCase):
+
+    def setUp(self):
+        self.configdb = ConfigDbSerializer()
+        self.current = {
+            'PORT': {
+                'Ethernet0': {'speed': '100000', 'lanes': '0,1,2,3', 'mtu': '9100'},
+                'Ethernet4': {'speed': '100000', 'lanes': '4,5,6,7'},
+            },
+            'VLAN_MEMBER': {
+                ('Vlan1000', 'Ethernet0'): {'tagging_mode': 'untagged'},
+            },
+            'ACL_TABLE': {
+                'DATAACL': {'ports': ['Ethernet0', 'Ethernet4'], 'type': 'L3'},
+            },
+            'FEATURE': {
+                'bgp': {'state': 'enabled'},
+            },
+        }
+
+    def test_unchanged_config_has_empty_delta(self):
+        data = {
+            'PORT': {'Ethernet0': {'speed': '100000', 'lanes': '0,1,2,3'}},
+            'VLAN_MEMBER': {'Vlan1000|Ethernet0': {'tagging_mode': 'untagged'}},
+            'ACL_TABLE': {'DATAACL': {'ports': ['Ethernet0', 'Ethernet4'], 'type': 'L3'}},
+        }
+        delta, summary = get_config_delta(self.configdb, self.current, data)
+        self.assertEqual(delta, {})
+        self.assertEqual(summary.total('unchanged'), 3)
+        self.assertEqual(summary.lines(), ['Total: 0 added, 0 modified (0 fields), 0 deleted, 3 unchanged'])
+
+    def test_only_changed_fields_are_written(self):
+        data = {
+            'PORT': {
+                'Ethernet0': {'speed': '40000', 'lanes': '0,1,2,3'},
+                'Ethernet8': {'speed': '100000'},
+                'Ethernet4': None,
+            },
+            'ACL_TABLE': {'DATAACL': {'ports': ['Ethernet0'], 'type': 'L3'}},
+            'VLAN': {'Vlan1000': {}},
+        }
+        delta, summary = get_config_delta(self.configdb, self.current, data)
+        self.assertEqual(delta, {
+            'PORT': {
+                'Ethernet0': {'speed': '40000'},
+                'Ethernet8': {'speed': '100000'},
+                'Ethernet4': None,
+            },
+            'ACL_TABLE': {'DATAACL': {'ports': ['Ethernet0']}},
+            'VLAN': {'Vlan1000': {}},
+        })
+        self.assertEqual(summary.tables['PORT']['added'], 1)
+        self.assertEqual(summary.tables['PORT']['modified'], 1)
+        self.assertEqual(summary.tables['PORT']['deleted'], 1)
+        self.assertEqual(summary.total('fields'), 3)
+
+    def test_table_deletion(self):
+        data = {'FEATURE': None, 'MISSING_TABLE': None, 'feature': {'bgp': None, 'lldp': None}}
+        delta, summary = get_config_delta(self.configdb, self.current, data)
+        self.assertEqual(delta, {'FEATURE': None, 'feature': {'bgp': None}})
+        self.assertEqual(summary.total('deleted'), 2)
@@ -0,0 +1,121 @@
+import os
+import shutil
+import tempfile
+
+import minigraph
+import minigraph_cache
+
+from unittest import TestCase, mock
+
+
+class TestMinigraphCache(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+        self.tmp_dir = tempfile.mkdtemp()
+        self.cache_dir = os.path.join(self.tmp_dir, 'cache')
+        self.sample_graph = os.path.join(self.tmp_dir, 'minigraph.xml')
+        shutil.copy(os.path.join(self.test_dir, 'simple-sample-graph-case.xml'), self.sample_graph)
+
+    def tearDown(self):
+        shutil.rmtree(self.tmp_dir)
+
+    def get_cache(self):
+        cache = minigraph_cache.MinigraphCache(self.cache_dir)
+        # Other test cases leave CFGGEN_UNIT_TESTING set in the environment
+        cache.enabled = True
+        return cache
+
+    def test_cache_hit_returns_parsed_data(self):
+        expected = minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config)
+
+        cache = self.get_cache()
+        entry = cache.get(self.sample_graph, port_config_file=self.port_config)
+        self.assertFalse(cache.hit)
+        self.assertEqual(entry['data'], expected)
+
+        entry = cache.get(self.sample_graph, port_config_file=self.port_config)
+        self.assertTrue(cache.hit)
+        self.assertEqual(entry['data'], expected)
+        self.assertEqual(entry['hostname'], minigraph.parse_hostname(self.sample_graph))
+
+    def test_cache_invalidated_on_content_change(self):
+        cache = self.get_cache()
+        cache.get(self.sample_graph, port_config_file=self.port_config)
+
+        with open(self.sample_graph) as f:
+            content = f.read()
+        with open(self.sample_graph, 'w') as f:
+            f.write(content.replace('switch-t0', 'switch-t0-new'))
+
+        entry = cache.get(self.sample_graph, port_config_file=self.port_config)
+        self.assertFalse(cache.hit)
+        self.assertEqual(entry['data']['DEVICE_METADATA']['localhost']['hostname'], 'switch-t0-new')
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+    def test_cache_disabled(self):
+        cache = minigraph_cache.MinigraphCache(self.cache_dir, enabled=False)
+        cache.get(self.sample_graph, port_config_file=self.port_config)
+        cache.get(self.sample_graph, port_config_file=self.port_config)
+        self.assertFalse(cache.hit)
+        self.assertFalse(os.path.exists(self.cache_dir))
+
+    def test_corrupted_entry_is_reparsed(self):
+        cache = self.get_cache()
+        cache.get(self.sample_graph, port_config_file=self.port_config)
+        for name in os.listdir(self.cache_dir):
+            with open(os.path.join(self.cache_dir, name), 'wb') as f:
+                f.write(b'garbage')
+
+        entry = cache.get(self.sample_graph, port_config_file=self.port_config)
+        self.assertFalse(cache.hit)
+        self.assertEqual(entry['data'], minigraph.parse_xml(self.sample_graph, port_config_file=self.port_config))
+
+        cache.get(self.sample_graph, port_config_file=self.port_config)
+        self.assertTrue(cache.hit)
+
+    def test_cache_invalidated_on_device_port_config_change(self):
+        # Without a port config file, parse_xml() reads the one of the hwsku in the device directory
+        device_port_config = os.path.join(self.tmp_dir, 'port_config.ini')
+        shutil.copy(self.port_config, device_port_config)
+        with mock.patch('sonic_py_common.device_info.get_path_to_port_config_file', return_value=device_port_config):
+            cache = self.get_cache()
+            cache.get(self.sample_graph)
+            cache.get(self.sample_graph)
+            self.assertTrue(cache.hit)
+
+            with open(device_port_config) as f:
+                content = f.read()
+            with open(device_port_config, 'w') as f:
+                f.write(content.replace('fortyGigE0/0', 'fortyGigE9/9'))
+
+            entry = cache.get(self.sample_graph)
+            self.assertFalse(cache.hit)
+            self.assertEqual(entry['data']['PORT']['Ethernet0']['alias'], 'fortyGigE9/9')
+
+    def test_cache_invalidated_on_dns_template_change(self):
+        dns_template = os.path.join(self.tmp_dir, 'dns.j2')
+        shutil.copy(os.path.join(self.test_dir, 'dns.j2'), dns_template)
+        with mock.patch('minigraph.get_dns_template_file', return_value=dns_template):
+            cache = self.get_cache()
+            cache.get(self.sample_graph, port_config_file=self.port_config)
+            cache.get(self.sample_graph, port_config_file=self.port_config)
+            self.assertTrue(cache.hit)
+
+            with open(dns_template, 'w') as f:
+                f.write('{"DNS_NAMESERVER": {"1.1.1.1": {}}}')
+
+            entry = cache.get(self.sample_graph, port_config_file=self.port_config)
+            self.assertFalse(cache.hit)
+            self.assertEqual(entry['data']['DNS_NAMESERVER'], {'1.1.1.1': {}})
+
+    def test_mmu_profiles_selected_on_cache_hit(self):
+        shutil.copy(os.path.join(self.test_dir, 'sample-dell-6100-t0-minigraph.xml'), self.sample_graph)
+        with mock.patch('minigraph.select_mmu_profiles') as mock_select_mmu_profiles:
+            cache = self.get_cache()
+            cache.get(self.sample_graph)
+            cache.get(self.sample_graph)
+            self.assertTrue(cache.hit)
+        self.assertEqual(mock_select_mmu_profiles.call_args_list,
+                         [mock.call('RDMA-CENTRIC', None, 'Force10-S6100')] * 2)
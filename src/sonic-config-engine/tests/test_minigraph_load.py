@@ -0,0 +1,30 @@
+import os
+
+import minigraph
+
+from lxml import etree as ET
+from unittest import TestCase, mock
+
+
+def load_full_root(filename):
+    return ET.parse(filename).getroot()
+
+
+class TestMinigraphLoad(TestCase):
+
+    def setUp(self):
+        self.test_dir = os.path.dirname(os.path.realpath(__file__))
+        self.port_config = os.path.join(self.test_dir, 't0-sample-port-config.ini')
+
+    def test_unused_sections_are_dropped(self):
+        root = minigraph.load_minigraph_root(os.path.join(self.test_dir, 'simple-sample-graph-case.xml'))
+        self.assertTrue(len(root) > 0)
+        for child in root:
+            self.assertIn(child.tag, minigraph.MINIGRAPH_SECTIONS)
+
+    def test_parse_matches_full_tree(self):
+        for name in ['simple-sample-graph-case.xml', 't0-sample-graph.xml', 'sample-graph-resource-type.xml']:
+            graph = os.path.join(self.test_dir, name)
+            with mock.patch('minigraph.load_minigraph_root', load_full_root):
+                expected = minigraph.parse_xml(graph, port_config_file=self.port_config)
+            self.assertEqual(minigraph.parse_xml(graph, port_config_file=self.port_config), expected, name)
@@ -1,7 +1,9 @@
 #!/usr/bin/env python3
 
 import datetime
+import heapq
 import inspect
+import itertools
 import json
 import os
 import sys
@@ -185,7 +187,9 @@ class MainServer:
         self.db_connectors = {}
         self.selector = swsscommon.Select()
         self.callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
-        self.timer_handlers = defaultdict(list)
+        self.batch_callbacks = defaultdict(lambda: defaultdict(list))  # db -> table -> handlers[]
+        self.timer_heap = []    # (ts, seq, handler, args)
+        self.timer_seq = itertools.count()
         self.subscribers = set()
 
     def register_db(self, db_name):
@@ -198,23 +202,29 @@ class MainServer:
         """ Register timer based handler.
             The handler will be called on/after give timestamp, ts
         """
-        self.timer_handlers[ts].append((handler, args))
+        heapq.heappush(self.timer_heap, (ts, next(self.timer_seq), handler, args))
 
 
-    def register_handler(self, db_name, table_name, handler):
+    def register_handler(self, db_name, table_name, handler, batch=False):
         """
         Handler registration for any update in given table
         in given db. The handler will be called for any update
         to the table in this db.
+        With batch set, the handler is called once per wakeup with
+        a dict of all keys updated, key -> (op, data) of the last update.
         """
         self.register_db(db_name)
 
-        if table_name not in self.callbacks[db_name]:
+        if (table_name not in self.callbacks[db_name] and
+                table_name not in self.batch_callbacks[db_name]):
             conn = self.db_connectors[db_name]
             subscriber = swsscommon.SubscriberStateTable(conn, table_name)
             self.subscribers.add(subscriber)
             self.selector.addSelectable(subscriber)
-        self.callbacks[db_name][table_name].append(handler)
+        if batch:
+            self.batch_callbacks[db_name][table_name].append(handler)
+        else:
+            self.callbacks[db_name][table_name].append(handler)
 
 
     def get_db_entry(self, db_name, table_name, key):
@@ -246,24 +256,49 @@ class MainServer:
         tbl.set(key, list(data.items()))
 
 
+    def run_timers(self):
+        """ Call the due timer handlers.
+            Return the select timeout in ms, until the next timer
+        """
+        ct_ts = datetime.datetime.now()
+        while self.timer_heap:
+            ts, _, handler, args = self.timer_heap[0]
+            if ts > ct_ts:
+                due_ms = (ts - ct_ts) // datetime.timedelta(milliseconds=1)
+                return min(MainServer.SELECT_TIMEOUT, due_ms + 1)
+            heapq.heappop(self.timer_heap)
+            if args is None:
+                handler()
+            else:
+                handler(*args)
+        return MainServer.SELECT_TIMEOUT
+
+
+    def drain_subscriber(self, subscriber):
+        """ Pop all pending updates of the subscriber and call the handlers """
+        db_name = subscriber.getDbConnector().getDbName()
+        table_name = subscriber.getTableName()
+        batch = {}
+        while True:
+            key, op, fvs = subscriber.pop()
+            if not key:
+                break
+            if table_name == FEATURE_TABLE and key in DISABLED_FEATURE_SET:
+                continue
+            log_debug("Received message : '%s'" % str((key, op, fvs)))
+            for callback in self.callbacks[db_name][table_name]:
+                callback(key, op, dict(fvs))
+            batch[key] = (op, dict(fvs))
+
+        if batch:
+            for callback in self.batch_callbacks[db_name][table_name]:
+                callback(batch)
+
+
     def run(self):
         """ Main loop """
         while True:
-            timeout = MainServer.SELECT_TIMEOUT
-            ct_ts = datetime.datetime.now()
-            while self.timer_handlers:
-                k = sorted(self.timer_handlers.keys())[0]
-                if k <= ct_ts:
-                    lst = self.timer_handlers[k]
-                    del self.timer_handlers[k]
-                    for fn in lst:
-                        if fn[1] is None:
-                            fn[0]()
-                        else:
-                            fn[0](*fn[1])
-                else:
-                    timeout = (k - ct_ts).seconds
-                    break
+            timeout = self.run_timers()
 
             state, _ = self.selector.select(timeout)
             if state == self.selector.TIMEOUT:
@@ -276,16 +311,7 @@ class MainServer:
                     return
 
             for subscriber in self.subscribers:
-                key, op, fvs = subscriber.pop()
-                if not key:
-                    continue
-                if subscriber.getTableName() == FEATURE_TABLE and key in DISABLED_FEATURE_SET:
-                    continue
-                log_debug("Received message : '%s'" % str((key, op, fvs)))
-                for callback in (self.callbacks
-                        [subscriber.getDbConnector().getDbName()]
-                        [subscriber.getTableName()]):
-                    callback(key, op, dict(fvs))
+                self.drain_subscriber(subscriber)
 
 
 
@@ -637,20 +663,23 @@ class FeatureTransitionHandler:
 #
 class LabelsPendingHandler:
     def __init__(self, server):
-        server.register_handler(STATE_DB_NAME, KUBE_LABEL_TABLE, self.on_update)
+        server.register_handler(STATE_DB_NAME, KUBE_LABEL_TABLE, self.on_update,
+                batch=True)
         self.server = server
         self.pending = False
         self.set_labels = {}
         return
 
 
-    def on_update(self, key, op, data):
+    def on_update(self, updates):
         # For any update sync with kube API server.
         # Don't optimize, as API server could differ with DB's contents
         # in many ways.
+        # Labels updated many times in one wakeup, e.g. by a bulk FEATURE
+        # update, are written once.
         #
-        if (key == KUBE_LABEL_SET_KEY):
-            self.set_labels = dict(data)
+        if (KUBE_LABEL_SET_KEY in updates):
+            self.set_labels = dict(updates[KUBE_LABEL_SET_KEY][1])
         else:
             return
 
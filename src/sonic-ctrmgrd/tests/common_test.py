@@ -1,3 +1,4 @@
+import collections
 import copy
 import json
 import os
@@ -440,6 +441,32 @@ class mock_subscriber:
         return self.tbl
 
 
+class mock_queue_subscriber:
+    """ Subscriber returning the queued updates, one per pop """
+    def __init__(self, db_name, tbl, updates=None):
+        self.db_name = db_name
+        self.tbl = tbl
+        self.updates = collections.deque(updates or [])
+
+
+    def pop(self):
+        if self.updates:
+            return self.updates.popleft()
+        return ("", "", {})
+
+
+    def getDbConnector(self):
+        return self
+
+
+    def getDbName(self):
+        return self.db_name
+
+
+    def getTableName(self):
+        return self.tbl
+
+
 def subscriber_side_effect(db, tbl):
     global subscribers_returned
 
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+#
+# Micro-benchmark of ctrmgrd MainServer loop: pushes FEATURE updates
+# through MainServer.run and reports the select wakeups and updates/s,
+# draining all updates per wakeup vs popping one update per wakeup.
+#
+# Run from src/sonic-ctrmgrd:
+#   python3 -m tests.ctrmgrd_benchmark [count]
+#
+import sys
+import time
+from unittest.mock import patch
+
+from . import common_test
+
+sys.path.append("ctrmgr")
+import ctrmgrd
+
+
+class bench_selector:
+    TIMEOUT = 1
+    ERROR = 2
+    OBJECT = 0
+
+    def __init__(self, subscriber):
+        self.subscriber = subscriber
+        self.wakeups = 0
+
+
+    def addSelectable(self, subs):
+        return 0
+
+
+    def select(self, timeout):
+        # Ready while updates are pending; error ends the loop
+        if not self.subscriber.updates:
+            return (self.ERROR, None)
+        self.wakeups += 1
+        return (self.OBJECT, None)
+
+
+class SinglePopServer(ctrmgrd.MainServer):
+    """ Loop as before: one update per subscriber per wakeup """
+    def drain_subscriber(self, subscriber):
+        key, op, fvs = subscriber.pop()
+        if not key:
+            return
+        if subscriber.getTableName() == ctrmgrd.FEATURE_TABLE and key in ctrmgrd.DISABLED_FEATURE_SET:
+            return
+        ctrmgrd.log_debug("Received message : '%s'" % str((key, op, fvs)))
+        for callback in (self.callbacks[subscriber.getDbConnector().getDbName()]
+                [subscriber.getTableName()]):
+            callback(key, op, dict(fvs))
+        for callback in (self.batch_callbacks[subscriber.getDbConnector().getDbName()]
+                [subscriber.getTableName()]):
+            callback({key: (op, dict(fvs))})
+
+
+def run_loop(server_class, count):
+    updates = [("feat{}".format(i % 64), "SET", (("state", "enabled"), ("set_owner", "local")))
+            for i in range(count)]
+    subscriber = common_test.mock_queue_subscriber(
+            ctrmgrd.CONFIG_DB_NAME, ctrmgrd.FEATURE_TABLE, updates)
+    selector = bench_selector(subscriber)
+    calls = [0, 0]
+
+    def on_update(key, op, data):
+        calls[0] += 1
+
+    def on_batch(batch):
+        calls[1] += 1
+
+    with patch("ctrmgrd.swsscommon.DBConnector"), \
+            patch("ctrmgrd.swsscommon.Select", return_value=selector), \
+            patch("ctrmgrd.swsscommon.SubscriberStateTable", return_value=subscriber):
+        server = server_class()
+        server.register_handler(ctrmgrd.CONFIG_DB_NAME, ctrmgrd.FEATURE_TABLE, on_update)
+        server.register_handler(ctrmgrd.CONFIG_DB_NAME, ctrmgrd.FEATURE_TABLE, on_batch,
+                batch=True)
+        start = time.time()
+        server.run()
+        elapsed = time.time() - start
+
+    return selector.wakeups, calls[0], calls[1], elapsed
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    ctrmgrd.UNIT_TESTING = 1
+    ctrmgrd.log_debug = lambda m: None
+    for name, server_class in (("single pop", SinglePopServer), ("drain", ctrmgrd.MainServer)):
+        wakeups, calls, batch_calls, elapsed = run_loop(server_class, count)
+        print("{:10s}: {} updates, {} wakeups, {} batch calls, {:.3f}s, {:.0f} updates/s".format(
+            name, calls, wakeups, batch_calls, elapsed, calls / elapsed))
+
+
+if __name__ == '__main__':
+    main()
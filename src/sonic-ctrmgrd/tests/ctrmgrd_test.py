@@ -577,3 +577,58 @@ class TestContainerStartup(object):
             ret = common_test.check_kube_actions()
             assert ret == 0
         self.clear()
+
+
+    @patch("ctrmgrd.swsscommon.DBConnector")
+    @patch("ctrmgrd.swsscommon.Select")
+    @patch("ctrmgrd.swsscommon.SubscriberStateTable")
+    def test_drain_and_batch(self, mock_subs, mock_select, mock_conn):
+        self.init()
+        updates = [("swss", "SET", {"state": "enabled"}),
+                   ("database", "SET", {"state": "enabled"}),
+                   ("bgp", "SET", {"state": "enabled"}),
+                   ("swss", "SET", {"state": "disabled"})]
+        subscriber = common_test.mock_queue_subscriber(
+                ctrmgrd.CONFIG_DB_NAME, ctrmgrd.FEATURE_TABLE, updates)
+        mock_subs.return_value = subscriber
+
+        received = []
+        batches = []
+        server = ctrmgrd.MainServer()
+        server.register_handler(ctrmgrd.CONFIG_DB_NAME, ctrmgrd.FEATURE_TABLE,
+                lambda key, op, data: received.append((key, data["state"])))
+        server.register_handler(ctrmgrd.CONFIG_DB_NAME, ctrmgrd.FEATURE_TABLE,
+                batches.append, batch=True)
+        assert mock_subs.call_count == 1
+
+        server.drain_subscriber(subscriber)
+        assert received == [("swss", "enabled"), ("bgp", "enabled"),
+                ("swss", "disabled")]
+        assert batches == [{"swss": ("SET", {"state": "disabled"}),
+                            "bgp": ("SET", {"state": "enabled"})}]
+
+        # Nothing pending, no batch delivered
+        server.drain_subscriber(subscriber)
+        assert len(batches) == 1
+        self.clear()
+
+
+    @patch("ctrmgrd.swsscommon.Select")
+    def test_timers(self, mock_select):
+        self.init()
+        called = []
+        server = ctrmgrd.MainServer()
+        now = ctrmgrd.datetime.datetime.now()
+        delta = ctrmgrd.datetime.timedelta
+        server.register_timer(now - delta(seconds=1), called.append, ("b",))
+        server.register_timer(now - delta(seconds=2), called.append, ("a",))
+        server.register_timer(now - delta(seconds=1), called.append, ("c",))
+        server.register_timer(now + delta(milliseconds=300), called.append, ("d",))
+
+        timeout = server.run_timers()
+        assert called == ["a", "b", "c"]
+        assert 0 < timeout <= 301
+
+        server.timer_heap.clear()
+        assert server.run_timers() == ctrmgrd.MainServer.SELECT_TIMEOUT
+        self.clear()
@@ -5,6 +5,7 @@ import os
 import random
 import re
 import subprocess
+import sys
 import yaml
 from natsort import natsorted
 from sonic_py_common.general import getstatusoutput_noshell_pipe
@@ -18,6 +19,10 @@ CONTAINER_PLATFORM_PATH = USR_SHARE_SONIC_PATH + "/platform"
 MACHINE_CONF_PATH = "/host/machine.conf"
 SONIC_VERSION_YAML_PATH = "/etc/sonic/sonic_version.yml"
 
+# Snapshot of the parsed device files, written once at boot
+DEVICE_INFO_SNAPSHOT_PATH = "/run/sonic/device_info.json"
+DEVICE_INFO_SNAPSHOT_VERSION = 1
+
 # Port configuration file names
 PORT_CONFIG_FILE = "port_config.ini"
 PLATFORM_JSON_FILE = "platform.json"
@@ -55,6 +60,141 @@ DPU_NAME_PREFIX = "dpu"
 sonic_ver_info = {}
 hw_info_dict = {}
 
+
+class _DeviceFileCache(object):
+    """
+    Process wide cache of the parsed device files (machine.conf,
+    sonic_version.yml, asic.conf, platform_env.conf). These files don't
+    change after boot, but an entry is still validated against the file
+    mtime, size and inode on every lookup, so an updated file is parsed again.
+    The cache is pre-loaded from the boot snapshot when it exists.
+    """
+    def __init__(self, snapshot_path=DEVICE_INFO_SNAPSHOT_PATH):
+        self.snapshot_path = snapshot_path
+        self.snapshot_loaded = False
+        self.entries = {}
+
+    @staticmethod
+    def signature(path):
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return [st.st_mtime_ns, st.st_size, st.st_ino]
+
+    def load_snapshot(self):
+        self.snapshot_loaded = True
+        if self.signature(self.snapshot_path) is None:
+            return
+        try:
+            with open(self.snapshot_path) as snapshot_file:
+                snapshot = json.load(snapshot_file)
+        except (IOError, OSError, ValueError):
+            return
+        if not isinstance(snapshot, dict) or snapshot.get('version') != DEVICE_INFO_SNAPSHOT_VERSION:
+            return
+        for path, entry in snapshot.get('files', {}).items():
+            self.entries.setdefault(path, (entry['signature'], entry['value']))
+
+    def get(self, path, loader, keep_unstated=False):
+        """
+        Return the parsed content of a file
+
+        Args:
+            path: path of the file
+            loader: function parsing the file, called with the path
+            keep_unstated: keep the parsed content even if the file can't be
+                stat'ed (e.g. the file is provided by a mock)
+        """
+        if not self.snapshot_loaded:
+            self.load_snapshot()
+        signature = self.signature(path)
+        entry = self.entries.get(path)
+        if entry is not None and entry[0] == signature:
+            return entry[1]
+        value = loader(path)
+        if signature is not None or keep_unstated:
+            self.entries[path] = (signature, value)
+        return value
+
+    def invalidate(self, path=None):
+        if path is None:
+            self.entries.clear()
+        else:
+            self.entries.pop(path, None)
+
+    def write_snapshot(self, path=None):
+        path = path or self.snapshot_path
+        files = {}
+        for file_path, (signature, value) in self.entries.items():
+            if signature is None:
+                continue
+            try:
+                json.dumps(value)
+            except (TypeError, ValueError):
+                continue
+            files[file_path] = {'signature': signature, 'value': value}
+        snapshot_dir = os.path.dirname(path)
+        if snapshot_dir and not os.path.isdir(snapshot_dir):
+            os.makedirs(snapshot_dir)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as snapshot_file:
+            json.dump({'version': DEVICE_INFO_SNAPSHOT_VERSION, 'files': files}, snapshot_file)
+        os.rename(tmp_path, path)
+
+
+_device_file_cache = _DeviceFileCache()
+
+
+def _read_conf_pairs(path):
+    """
+    Parse a 'key=value' configuration file
+
+    Returns:
+        A list of [key, value] pairs, in the file order
+    """
+    pairs = []
+    with open(path) as conf_file:
+        for line in conf_file:
+            tokens = line.split('=')
+            if len(tokens) < 2:
+                continue
+            pairs.append([tokens[0], tokens[1].strip()])
+    return pairs
+
+
+def invalidate_device_info_cache(path=None):
+    """
+    Drop the cached device information, so it is read again on the next call
+
+    Args:
+        path: drop only the parsed content of this file. If not provided,
+            all the cached device information is dropped.
+    """
+    global sonic_ver_info
+    _device_file_cache.invalidate(path)
+    if path is None or path == SONIC_VERSION_YAML_PATH:
+        sonic_ver_info = {}
+    if path is None:
+        hw_info_dict.clear()
+
+
+def write_device_info_snapshot(path=DEVICE_INFO_SNAPSHOT_PATH):
+    """
+    Parse the device files and save them to the snapshot file, so that
+    short-lived processes load them with a single read. Run once at boot.
+    """
+    get_machine_info()
+    get_sonic_version_info()
+    get_num_npus()
+    is_supervisor()
+    is_macsec_supported()
+    _device_file_cache.write_snapshot(path)
+
+
+def device_info_snapshot_main():
+    write_device_info_snapshot(sys.argv[1] if len(sys.argv) > 1 else DEVICE_INFO_SNAPSHOT_PATH)
+
 def get_localhost_info(field, config_db=None):
     try:
         # TODO: enforce caller to provide config_db explicitly and remove its default value
@@ -87,15 +227,7 @@ def get_machine_info():
     if not os.path.isfile(MACHINE_CONF_PATH):
         return None
 
-    machine_vars = {}
-    with open(MACHINE_CONF_PATH) as machine_conf_file:
-        for line in machine_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-                continue
-            machine_vars[tokens[0]] = tokens[1].strip()
-
-    return machine_vars
+    return dict(_device_file_cache.get(MACHINE_CONF_PATH, _read_conf_pairs))
 
 def get_platform(**kwargs):
     """
@@ -457,16 +589,16 @@ def get_sonic_version_info():
         return None
 
     global sonic_ver_info
-    if sonic_ver_info:
-        return sonic_ver_info
+    sonic_ver_info = _device_file_cache.get(SONIC_VERSION_YAML_PATH, _load_sonic_version, keep_unstated=True)
+    return sonic_ver_info
 
-    with open(SONIC_VERSION_YAML_PATH) as stream:
+
+def _load_sonic_version(path):
+    with open(path) as stream:
         if yaml.__version__ >= "5.1":
-            sonic_ver_info = yaml.full_load(stream)
+            return yaml.full_load(stream)
         else:
-            sonic_ver_info = yaml.safe_load(stream)
-
-    return sonic_ver_info
+            return yaml.safe_load(stream)
 
 def get_sonic_version_file():
     if not os.path.isfile(SONIC_VERSION_YAML_PATH):
@@ -547,14 +679,10 @@ def get_num_npus():
     asic_conf_file_path = get_asic_conf_file_path()
     if asic_conf_file_path is None:
         return 1
-    with open(asic_conf_file_path) as asic_conf_file:
-        for line in asic_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'num_asic':
-                num_npus = tokens[1].strip()
-        return int(num_npus)
+    for key, value in _device_file_cache.get(asic_conf_file_path, _read_conf_pairs):
+        if key.lower() == 'num_asic':
+            num_npus = value
+    return int(num_npus)
 
 
 def is_multi_npu():
@@ -580,16 +708,10 @@ def is_supervisor():
     platform_env_conf_file_path = get_platform_env_conf_file_path()
     if platform_env_conf_file_path is None:
         return False
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'supervisor':
-                val = tokens[1].strip()
-                if val == '1':
-                    return True
-        return False
+    for key, value in _device_file_cache.get(platform_env_conf_file_path, _read_conf_pairs):
+        if key.lower() == 'supervisor' and value == '1':
+            return True
+    return False
 
 # Check if this platform has macsec capability.
 def is_macsec_supported():
@@ -600,15 +722,11 @@ def is_macsec_supported():
     if platform_env_conf_file_path is None:
         return supported
 
-    # Else open the file check for keyword - macsec_enabled -
-    with open(platform_env_conf_file_path) as platform_env_conf_file:
-        for line in platform_env_conf_file:
-            tokens = line.split('=')
-            if len(tokens) < 2:
-               continue
-            if tokens[0].lower() == 'macsec_enabled':
-                supported = tokens[1].strip()
-                break
+    # Else check the file for keyword - macsec_enabled -
+    for key, value in _device_file_cache.get(platform_env_conf_file_path, _read_conf_pairs):
+        if key.lower() == 'macsec_enabled':
+            supported = value
+            break
     return int(supported)
 
 
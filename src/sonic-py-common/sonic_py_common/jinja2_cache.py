@@ -0,0 +1,125 @@
+"""
+Shared Jinja2 bytecode cache for SONiC templates
+
+Templates rendered by sonic-cfggen and bgpcfgd are compiled from source by
+every process which renders them. Attaching a SonicBytecodeCache to the
+Jinja2 environment stores the compiled templates under a shared directory,
+so only the first process (or the image build, see precompile_templates)
+pays for the compilation.
+
+Jinja2 validates a cached template against the sha1 of its source, so an
+updated template is recompiled transparently. The generated code also
+depends on the environment settings (e.g. trim_blocks) and on how the
+registered filters and tests receive their arguments, hence every distinct
+environment configuration gets its own namespace of cache entries.
+"""
+
+import hashlib
+import os
+import sys
+
+import jinja2
+
+DEFAULT_CACHE_DIR = '/var/cache/sonic/jinja2'
+DEFAULT_TEMPLATE_DIR = '/usr/share/sonic/templates'
+
+# Environment attributes which change the code generated for a template
+_COMPILE_OPTIONS = [
+    'block_start_string', 'block_end_string',
+    'variable_start_string', 'variable_end_string',
+    'comment_start_string', 'comment_end_string',
+    'line_statement_prefix', 'line_comment_prefix',
+    'trim_blocks', 'lstrip_blocks', 'newline_sequence',
+    'keep_trailing_newline', 'optimized', 'is_async',
+]
+
+# Function attributes Jinja2 inspects at compile time to decide which
+# arguments a filter or test receives
+_PASS_ARG_ATTRS = ['jinja_pass_arg', 'contextfilter', 'evalcontextfilter', 'environmentfilter']
+
+
+def _callable_signature(functions):
+    signature = []
+    for name in sorted(functions):
+        func = functions[name]
+        signature.append((name, tuple(repr(getattr(func, attr, None)) for attr in _PASS_ARG_ATTRS)))
+    return signature
+
+
+def environment_signature(env):
+    """
+    Return a digest of every setting of env which affects compiled templates
+    """
+    autoescape = env.autoescape
+    if callable(autoescape):
+        autoescape = getattr(autoescape, '__name__', repr(autoescape))
+    signature = (
+        jinja2.__version__,
+        tuple(sys.version_info[:2]),
+        tuple(repr(getattr(env, option, None)) for option in _COMPILE_OPTIONS),
+        repr(autoescape),
+        tuple(sorted(env.extensions)),
+        tuple(_callable_signature(env.filters)),
+        tuple(_callable_signature(env.tests)),
+    )
+    return hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16]
+
+
+class SonicBytecodeCache(jinja2.FileSystemBytecodeCache):
+    """
+    File system bytecode cache whose entries are scoped by an environment
+    signature, and which never fails rendering when the cache directory
+    can't be written (e.g. read-only file system).
+    """
+    def __init__(self, directory=DEFAULT_CACHE_DIR, namespace=''):
+        super(SonicBytecodeCache, self).__init__(directory, '__jinja2_%s.cache')
+        self.namespace = namespace
+        self.hits = 0
+        self.misses = 0
+
+    def get_cache_key(self, name, filename=None):
+        return super(SonicBytecodeCache, self).get_cache_key(self.namespace + '|' + name, filename)
+
+    def load_bytecode(self, bucket):
+        super(SonicBytecodeCache, self).load_bytecode(bucket)
+        if bucket.code is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+
+    def dump_bytecode(self, bucket):
+        try:
+            super(SonicBytecodeCache, self).dump_bytecode(bucket)
+        except (IOError, OSError):
+            pass
+
+
+def enable_bytecode_cache(env, cache_dir=DEFAULT_CACHE_DIR):
+    """
+    Attach a SonicBytecodeCache to env. Must be called after all filters and
+    tests were registered. The cache is only used when cache_dir exists; the
+    directory is created at image build time.
+    Return the attached cache or None.
+    """
+    if not os.path.isdir(cache_dir):
+        return None
+    env.bytecode_cache = SonicBytecodeCache(cache_dir, environment_signature(env))
+    return env.bytecode_cache
+
+
+def precompile_templates(env, extensions=('j2',)):
+    """
+    Compile every template the loader of env can list into the bytecode
+    cache of env.
+    Return a tuple of the list of compiled template names and a list of
+    (template name, error) of templates which failed to compile.
+    """
+    compiled = []
+    failed = []
+    for name in env.list_templates(extensions=list(extensions)):
+        try:
+            env.get_template(name)
+            compiled.append(name)
+        except Exception as e:
+            failed.append((name, str(e)))
+    return compiled, failed
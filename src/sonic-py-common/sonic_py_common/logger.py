@@ -55,6 +55,13 @@ class Logger(object):
         """
         self._min_log_priority = priority
 
+    def get_min_log_priority(self):
+        """
+        Returns the minimum log priority level, messages with a lower
+        priority are not logged
+        """
+        return self._min_log_priority
+
     def set_min_log_priority_error(self):
         """
         Convenience function to set minimum log priority to LOG_PRIORITY_ERROR
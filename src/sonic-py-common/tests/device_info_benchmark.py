@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Measure the latency of the device_info lookups made by the CLI entry points
+
+The device files (machine.conf, sonic_version.yml, asic.conf and
+platform_env.conf) are created in a temporary directory. The time of the
+module import and of the first and repeated lookups is measured in fresh
+processes
+  - without the boot snapshot
+  - with the boot snapshot
+and compared with the lookups parsing the files on every call.
+
+Usage (from src/sonic-py-common):
+    python3 tests/device_info_benchmark.py [-n COUNT]
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+TESTS_DIR = os.path.dirname(os.path.realpath(__file__))
+
+MACHINE_CONF = "onie_platform=x86_64-mlnx_msn2700-r0\nonie_machine=mlnx_msn2700\nonie_base_mac=e4:1d:2d:44:5e:80\n"
+SONIC_VERSION = "build_version: 'test.1'\nasic_type: mellanox\ncommit_id: 'a8fbac59d'\nbranch: 'test'\n"
+ASIC_CONF = "NUM_ASIC=1\nDEV_ID_ASIC_0=03:00.0\n"
+PLATFORM_ENV_CONF = "SYNCD_SHM_SIZE=256m\nmacsec_enabled=1\n"
+
+CLIENT = '''
+import sys, time
+start = time.time()
+sys.path.insert(0, sys.argv[1])
+from sonic_py_common import device_info
+import_time = time.time() - start
+root, count, snapshot, cached, write_snapshot = sys.argv[2], int(sys.argv[3]), sys.argv[4], sys.argv[5] == '1', sys.argv[6] == '1'
+device_info.MACHINE_CONF_PATH = root + '/machine.conf'
+device_info.SONIC_VERSION_YAML_PATH = root + '/sonic_version.yml'
+device_info.get_asic_conf_file_path = lambda: root + '/asic.conf'
+device_info.get_platform_env_conf_file_path = lambda: root + '/platform_env.conf'
+device_info._device_file_cache = device_info._DeviceFileCache(snapshot)
+
+def lookups():
+    if not cached:
+        device_info.invalidate_device_info_cache()
+    device_info.get_platform()
+    device_info.get_sonic_version_info()
+    device_info.get_num_npus()
+    device_info.is_supervisor()
+    device_info.is_macsec_supported()
+
+start = time.time()
+lookups()
+first_time = time.time() - start
+start = time.time()
+for _ in range(count):
+    lookups()
+print(import_time, first_time, (time.time() - start) / count)
+if write_snapshot:
+    device_info._device_file_cache.write_snapshot()
+'''
+
+
+def run_client(root, count, snapshot, cached=True, write_snapshot=False):
+    output = subprocess.check_output([sys.executable, '-c', CLIENT, os.path.join(TESTS_DIR, '..'), root, str(count),
+                                      snapshot, '1' if cached else '0', '1' if write_snapshot else '0'],
+                                     env=dict(os.environ, PLATFORM=''))
+    return [float(value) * 1000 for value in output.split()]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('-n', '--count', type=int, default=1000, help='number of repeated lookups')
+    args = parser.parse_args()
+
+    root = tempfile.mkdtemp()
+    try:
+        for name, content in (('machine.conf', MACHINE_CONF), ('sonic_version.yml', SONIC_VERSION),
+                              ('asic.conf', ASIC_CONF), ('platform_env.conf', PLATFORM_ENV_CONF)):
+            with open(os.path.join(root, name), 'w') as f:
+                f.write(content)
+        snapshot = os.path.join(root, 'device_info.json')
+        # what is done once at boot
+        run_client(root, 1, snapshot, write_snapshot=True)
+
+        print('{:24s} {:>12s} {:>14s} {:>16s}'.format('', 'import (ms)', 'first call (ms)', 'next calls (ms)'))
+        no_snapshot = os.path.join(root, 'none.json')
+        for title, snapshot_path, cached in (('parse on every call', no_snapshot, False),
+                                             ('cache, no snapshot', no_snapshot, True),
+                                             ('cache and snapshot', snapshot, True)):
+            import_time, first_time, next_time = run_client(root, args.count, snapshot_path, cached)
+            print('{:24s} {:12.3f} {:14.3f} {:16.4f}'.format(title, import_time, first_time, next_time))
+    finally:
+        shutil.rmtree(root)
+
+
+if __name__ == '__main__':
+    main()
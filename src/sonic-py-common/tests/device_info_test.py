@@ -162,6 +162,47 @@ class TestDeviceInfo(object):
         assert mock_hwsku.called_once()
         mock_cfg_inst.get_table.assert_called_once_with("DEVICE_METADATA")
 
+    def test_device_file_cache(self, tmp_path):
+        asic_conf = tmp_path / "asic.conf"
+        asic_conf.write_text("NUM_ASIC=2\n")
+        with mock.patch("sonic_py_common.device_info.get_asic_conf_file_path", return_value=str(asic_conf)), \
+                mock.patch("sonic_py_common.device_info._read_conf_pairs",
+                           wraps=device_info._read_conf_pairs) as read_mocked:
+            assert device_info.get_num_npus() == 2
+            assert device_info.get_num_npus() == 2
+            assert read_mocked.call_count == 1
+
+            # an updated file is parsed again
+            asic_conf.write_text("NUM_ASIC=4\n")
+            os.utime(str(asic_conf), ns=(0, 0))
+            assert device_info.get_num_npus() == 4
+            assert read_mocked.call_count == 2
+
+            device_info.invalidate_device_info_cache(str(asic_conf))
+            assert device_info.get_num_npus() == 4
+            assert read_mocked.call_count == 3
+
+    def test_device_info_snapshot(self, tmp_path):
+        machine_conf = tmp_path / "machine.conf"
+        machine_conf.write_text(MACHINE_CONF_CONTENTS)
+        snapshot = str(tmp_path / "run" / "device_info.json")
+        with mock.patch("sonic_py_common.device_info.MACHINE_CONF_PATH", str(machine_conf)), \
+                mock.patch("sonic_py_common.device_info.get_asic_conf_file_path", return_value=None), \
+                mock.patch("sonic_py_common.device_info.get_platform_env_conf_file_path", return_value=None):
+            device_info.write_device_info_snapshot(snapshot)
+
+            cache = device_info._DeviceFileCache(snapshot)
+            loader = mock.MagicMock()
+            assert dict(cache.get(str(machine_conf), loader)) == EXPECTED_GET_MACHINE_INFO_RESULT
+            loader.assert_not_called()
+
+            # the snapshot entry is ignored once the file changed
+            machine_conf.write_text("onie_platform=x86_64-kvm_x86_64-r0\n")
+            loader.return_value = [["onie_platform", "x86_64-kvm_x86_64-r0"]]
+            assert cache.get(str(machine_conf), loader) == loader.return_value
+            loader.assert_called_once_with(str(machine_conf))
+        device_info.invalidate_device_info_cache()
+
     @classmethod
     def teardown_class(cls):
         print("TEARDOWN")
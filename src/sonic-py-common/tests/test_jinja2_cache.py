@@ -0,0 +1,88 @@
+import os
+
+import jinja2
+
+from sonic_py_common.jinja2_cache import enable_bytecode_cache, environment_signature, precompile_templates
+
+
+def create_env(template_dir, trim_blocks=False):
+    env = jinja2.Environment(loader=jinja2.FileSystemLoader([str(template_dir)]), trim_blocks=trim_blocks)
+    env.filters['upper_name'] = lambda value: value.upper()
+    return env
+
+
+def write_templates(template_dir):
+    template_dir.mkdir()
+    (template_dir / 'a.j2').write_text(u'{% if name %}\n{{ name | upper_name }}\n{% endif %}\n')
+    (template_dir / 'broken.j2').write_text(u'{% if name %}\n')
+
+
+def test_cache_disabled_without_directory(tmp_path):
+    env = create_env(tmp_path)
+    assert enable_bytecode_cache(env, str(tmp_path / 'missing')) is None
+    assert env.bytecode_cache is None
+
+
+def test_precompile_and_reuse(tmp_path):
+    template_dir = tmp_path / 'templates'
+    cache_dir = tmp_path / 'cache'
+    write_templates(template_dir)
+    cache_dir.mkdir()
+
+    env = create_env(template_dir)
+    enable_bytecode_cache(env, str(cache_dir))
+    compiled, failed = precompile_templates(env)
+    assert compiled == ['a.j2']
+    assert [name for name, _ in failed] == ['broken.j2']
+    assert len(os.listdir(str(cache_dir))) == 1
+
+    env = create_env(template_dir)
+    cache = enable_bytecode_cache(env, str(cache_dir))
+    assert env.get_template('a.j2').render(name='x') == u'\nX\n'
+    assert (cache.hits, cache.misses) == (1, 0)
+
+
+def test_environment_options_are_isolated(tmp_path):
+    template_dir = tmp_path / 'templates'
+    cache_dir = tmp_path / 'cache'
+    write_templates(template_dir)
+    cache_dir.mkdir()
+
+    env = create_env(template_dir)
+    enable_bytecode_cache(env, str(cache_dir))
+    env.get_template('a.j2')
+
+    trim_env = create_env(template_dir, trim_blocks=True)
+    assert environment_signature(trim_env) != environment_signature(env)
+    cache = enable_bytecode_cache(trim_env, str(cache_dir))
+    assert trim_env.get_template('a.j2').render(name='x') == u'X\n'
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_source_change_invalidates_entry(tmp_path):
+    template_dir = tmp_path / 'templates'
+    cache_dir = tmp_path / 'cache'
+    write_templates(template_dir)
+    cache_dir.mkdir()
+
+    env = create_env(template_dir)
+    enable_bytecode_cache(env, str(cache_dir))
+    env.get_template('a.j2')
+
+    (template_dir / 'a.j2').write_text(u'{{ name }}!')
+    env = create_env(template_dir)
+    cache = enable_bytecode_cache(env, str(cache_dir))
+    assert env.get_template('a.j2').render(name='x') == u'x!'
+    assert (cache.hits, cache.misses) == (0, 1)
+
+
+def test_read_only_cache_does_not_fail_rendering(tmp_path):
+    template_dir = tmp_path / 'templates'
+    cache_dir = tmp_path / 'cache'
+    write_templates(template_dir)
+    cache_dir.mkdir()
+
+    env = create_env(template_dir)
+    cache = enable_bytecode_cache(env, str(cache_dir))
+    cache.directory = str(tmp_path / 'removed')
+    assert env.get_template('a.j2').render(name='x') == u'\nX\n'
@@ -12,8 +12,10 @@ i.e. it is mixin not parent class.
 """
 class SonicYang(SonicYangExtMixin):
 
-    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0):
+    def __init__(self, yang_dir, debug=False, print_log_enabled=True, sonic_yang_options=0, cache_dir=None):
         self.yang_dir = yang_dir
+        # directory of the YANG model cache, no cache if None
+        self.cache_dir = cache_dir
         self.ctx = None
         self.module = None
         self.root = None
@@ -44,6 +46,12 @@ class SonicYang(SonicYangExtMixin):
         # below dict will store preProcessed yang objects, which may be needed by
         # all yang modules, such as grouping.
         self.preProcessedYang = dict()
+        # converters of leaves, compiled with the yang models
+        self.leafConverters = dict()
+        # cropped config DB tables and their translation loaded in the data
+        # tree, kept by loadData(incremental=True) for the next incremental load
+        self.loadedTables = None
+        self.xlateTables = dict()
         # element path for CONFIG DB. An example for this list could be:
         # ['PORT', 'Ethernet0', 'speed']
         self.elementPath = []
@@ -4,10 +4,20 @@
 from __future__ import print_function
 import yang as ly
 import syslog
+import copy
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import namedtuple
 from json import dump, dumps, loads
 from xmltodict import parse
 from glob import glob
 
+# Bump when the content of the YANG model cache changes
+YANG_MODEL_CACHE_VERSION = 1
+YANG_MODEL_CACHE_PREFIX = 'sonic_yang_models_'
+
 Type_1_list_maps_model = [
     'DSCP_TO_TC_MAP_LIST',
     'DOT1P_TO_TC_MAP_LIST',
@@ -34,6 +44,9 @@ LEAF_LIST_WITH_STRING_VALUE_DICT = {
     ('PORT', 'adv_interface_types'): ',',
 }
 
+# Converters of a leaf value from config DB to yang (xlate) and back (revXlate)
+LeafConverter = namedtuple('LeafConverter', ['xlate', 'revXlate'])
+
 """
 This is the Exception thrown out of all public function of this class.
 """
@@ -51,6 +64,7 @@ class SonicYangExtMixin:
         try:
             # get all files
             self.yangFiles = glob(self.yang_dir +"/*.yang")
+            cacheFile = self._yangModelCacheFile(self.yangFiles)
             # load yang modules
             for file in self.yangFiles:
                 m = self._load_schema_module(file)
@@ -65,10 +79,15 @@ class SonicYangExtMixin:
             self.sysLog(syslog.LOG_DEBUG,'Loaded below Yang Models')
             self.sysLog(syslog.LOG_DEBUG,str(self.yangFiles))
 
-            # load json for each yang model
-            self._loadJsonYangModel()
-            # create a map from config DB table to yang container
-            self._createDBTableToModuleMap()
+            # json of yang models and table map are only built when not cached
+            if not self._loadYangModelCache(cacheFile):
+                # load json for each yang model
+                self._loadJsonYangModel()
+                # create a map from config DB table to yang container
+                self._createDBTableToModuleMap()
+                self._saveYangModelCache(cacheFile)
+            # converters of the leaves of config DB tables
+            self._compileLeafConverters()
         except Exception as e:
             self.sysLog(msg="Yang Models Load failed:{}".format(str(e)), \
                 debug=syslog.LOG_ERR, doPrint=True)
@@ -76,6 +95,94 @@ class SonicYangExtMixin:
 
         return True
 
+    def _yangModelCacheFile(self, yangFiles):
+        '''
+            Get the cache file of the yang models, named after a hash of the
+            content of the yang model files.
+
+            Parameters:
+                yangFiles (list): path of yang model files.
+
+            Returns:
+                (str): path of cache file or None if no cache is used.
+        '''
+        if not self.cache_dir:
+            return None
+        h = hashlib.sha256(str(YANG_MODEL_CACHE_VERSION).encode())
+        for f in sorted(yangFiles):
+            with open(f, 'rb') as yangFile:
+                h.update(os.path.basename(f).encode())
+                h.update(hashlib.sha256(yangFile.read()).digest())
+        return os.path.join(self.cache_dir,
+            "{}{}.pickle".format(YANG_MODEL_CACHE_PREFIX, h.hexdigest()))
+
+    def _loadYangModelCache(self, cacheFile):
+        '''
+            Load json of yang models, config DB table map and preprocessed
+            yang from cache file.
+
+            Parameters:
+                cacheFile (str): path of cache file or None.
+
+            Returns:
+                (bool): True if loaded from cache.
+        '''
+        if cacheFile is None or not os.path.exists(cacheFile):
+            return False
+        try:
+            with open(cacheFile, 'rb') as f:
+                cache = pickle.load(f)
+            if cache.get('version') != YANG_MODEL_CACHE_VERSION:
+                return False
+            self.yJson = cache['yJson']
+            self.confDbYangMap = cache['confDbYangMap']
+            self.preProcessedYang = cache['preProcessedYang']
+        except Exception as e:
+            self.sysLog(syslog.LOG_WARNING, "Yang models cache {} load failed:{}".\
+                format(cacheFile, str(e)))
+            return False
+        self.sysLog(msg="Yang models loaded from cache {}".format(cacheFile))
+        return True
+
+    def _saveYangModelCache(self, cacheFile):
+        '''
+            Save json of yang models, config DB table map and preprocessed
+            yang in cache file, and remove the cache files of other yang models.
+            A failure to save is logged and ignored.
+
+            Parameters:
+                cacheFile (str): path of cache file or None.
+
+            Returns:
+                void
+        '''
+        if cacheFile is None:
+            return
+        cache = {
+            'version': YANG_MODEL_CACHE_VERSION,
+            'yJson': self.yJson,
+            'confDbYangMap': self.confDbYangMap,
+            'preProcessedYang': self.preProcessedYang
+        }
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            # write in temp file and rename, readers never see partial cache
+            fd, tmpFile = tempfile.mkstemp(dir=self.cache_dir, suffix='.tmp')
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    pickle.dump(cache, f, protocol=pickle.HIGHEST_PROTOCOL)
+                os.replace(tmpFile, cacheFile)
+            except Exception:
+                os.unlink(tmpFile)
+                raise
+            for f in glob(os.path.join(self.cache_dir, YANG_MODEL_CACHE_PREFIX + "*.pickle")):
+                if f != cacheFile:
+                    os.unlink(f)
+        except Exception as e:
+            self.sysLog(syslog.LOG_WARNING, "Yang models cache {} save failed:{}".\
+                format(cacheFile, str(e)))
+        return
+
     """
     load JSON schema format from yang models
     """
@@ -399,46 +506,103 @@ class SonicYangExtMixin:
 
         return leafDict
 
+    def _compileLeafConverters(self):
+        '''
+            Compile the converters of the leaves of all config DB tables, so
+            translation and reverse translation convert each value with a
+            direct call instead of looking up its yang type.
+        '''
+        self.leafConverters = dict()
+        for table, cmap in self.confDbYangMap.items():
+            # common yang files are stored as module, they have no table
+            if cmap.get('container') is None:
+                continue
+            self._compileModelLeafConverters(cmap['container'], table)
+
+        return
+
+    def _compileModelLeafConverters(self, model, table):
+
+        self._getLeafConverters(model, table)
+        for inner in ('list', 'container'):
+            models = model.get(inner)
+            if isinstance(models, dict):
+                models = [models]
+            for innerModel in models or []:
+                self._compileModelLeafConverters(innerModel, table)
+
+        return
+
+    def _getLeafConverters(self, model, table):
+        '''
+            Get the converters of the leaves of a yang List\Container, they are
+            compiled on first use if not compiled with the yang models.
+
+            Parameters:
+                model (dict): json format of yang List\Container.
+                table (str): config DB table, this table is being translated.
+
+            Returns:
+                 converters (dict): LeafConverter for each leaf, leaf-list and
+                    leaf in choices of the List\Container.
+        '''
+        # models stay in self.confDbYangMap, which is kept with the converters
+        key = (table, id(model))
+        converters = self.leafConverters.get(key)
+        if converters is None:
+            converters = dict()
+            for name, leaf in self._createLeafDict(model, table).items():
+                converters[name] = self._compileLeafConverter(table, name, leaf)
+            self.leafConverters[key] = converters
+
+        return converters
+
     """
-    Convert a string from Config DB value to Yang Value based on type of the
-    key in Yang model.
-    @model : A List of Leafs in Yang model list
+    Compile the converter of a Config DB value to Yang Value and back, based
+    on type of the leaf in Yang model.
     """
-    def _findYangTypedValue(self, key, value, leafDict):
+    def _compileLeafConverter(self, table, name, leaf):
 
+        type = leaf.get('type', dict()).get('@name', '')
         # convert config DB string to yang Type
-        def _yangConvert(val):
-            # Convert everything to string
-            val = str(val)
-            # find type of this key from yang leaf
-            type = leafDict[key]['type']['@name']
-
-            if 'uint' in type:
-                vValue = int(val, 10)
-            # TODO: find type of leafref from schema node
-            elif 'leafref' in type:
-                vValue = val
-            #TODO: find type in sonic-head, as of now, all are enumeration
-            elif 'stypes:' in type:
-                vValue = val
-            else:
-                vValue = val
-            return vValue
+        if 'uint' in type:
+            def _yangConvert(val):
+                return int(str(val), 10)
+        # TODO: find type of leafref from schema node
+        #TODO: find type in sonic-head, as of now, all are enumeration
+        else:
+            _yangConvert = str
+        # convert yang Type to config DB string
+        # config DB has only strings, thank god for that :), wait not yet!!!
+        _revYangConvert = str
 
         # if it is a leaf-list do it for each element
-        if leafDict[key]['__isleafList']:
-            vValue = list()
-            if isinstance(value, str) and (self.elementPath[0], self.elementPath[-1]) in LEAF_LIST_WITH_STRING_VALUE_DICT:
-                # For field defined as leaf-list but has string value in CONFIG DB, need do special handling here. For exampe:
-                # port.adv_speeds in CONFIG DB has value "100,1000,10000", it shall be transferred to [100,1000,10000] as YANG value here to
-                # make it align with its YANG definition.
-                value = (x.strip() for x in value.split(LEAF_LIST_WITH_STRING_VALUE_DICT[(self.elementPath[0], self.elementPath[-1])]))
-            for v in value:
-                vValue.append(_yangConvert(v))
+        if leaf['__isleafList']:
+            # For field defined as leaf-list but has string value in CONFIG DB. For exampe:
+            # port.adv_speeds in CONFIG DB has value "100,1000,10000", it shall be transferred
+            # to [100,1000,10000] as YANG value to make it align with its YANG definition,
+            # and back to a string for CONFIG DB.
+            separator = LEAF_LIST_WITH_STRING_VALUE_DICT.get((table, name))
+
+            def xlate(value):
+                if separator is not None and isinstance(value, str):
+                    value = (x.strip() for x in value.split(separator))
+                return [_yangConvert(v) for v in value]
+
+            def revXlate(value):
+                if separator is not None and isinstance(value, list):
+                    return separator.join(_revYangConvert(x) for x in value)
+                return [_revYangConvert(v) for v in value]
+        elif type == 'boolean':
+            xlate = _yangConvert
+
+            def revXlate(value):
+                return 'true' if value else 'false'
         else:
-            vValue = _yangConvert(value)
+            xlate = _yangConvert
+            revXlate = _revYangConvert
 
-        return vValue
+        return LeafConverter(xlate, revXlate)
 
     """
     Xlate a Type 1 map list
@@ -501,8 +665,8 @@ class SonicYangExtMixin:
         inner_clist = model.get('list')
         if inner_clist:
             inner_listKey = inner_clist['key']['@value']
-            inner_leafDict = self._createLeafDict(inner_clist, table)
-            for lkey in inner_leafDict:
+            inner_converters = self._getLeafConverters(inner_clist, table)
+            for lkey in inner_converters:
                 if inner_listKey != lkey:
                     inner_listVal = lkey
 
@@ -590,7 +754,7 @@ class SonicYangExtMixin:
         #This is done to improve performance of mapping from values of TABLEs in
         #config DB to leaf in YANG LIST.
 
-        leafDict = self._createLeafDict(model, table)
+        converters = self._getLeafConverters(model, table)
         # get keys from YANG model list itself
         listKeys = model['key']['@value']
         self.sysLog(msg="xlateList keyList:{}".format(listKeys))
@@ -621,8 +785,7 @@ class SonicYangExtMixin:
                     self.elementPath.append(vKey)
                     self.sysLog(syslog.LOG_DEBUG, "xlateList vkey {}".format(vKey))
                     try:
-                        keyDict[vKey] = self._findYangTypedValue(vKey, \
-                                            config[pkey][vKey], leafDict)
+                        keyDict[vKey] = converters[vKey].xlate(config[pkey][vKey])
                     finally:
                         self.elementPath.pop()
                 yang.append(keyDict)
@@ -721,14 +884,15 @@ class SonicYangExtMixin:
                 self._xlateContainerInContainer(modelContainer, yang, configC, table)
 
         ## Handle other leaves in container,
-        leafDict = self._createLeafDict(model, table)
+        converters = self._getLeafConverters(model, table)
         vKeys = list(configC.keys())
         for vKey in vKeys:
             #vkey must be a leaf\leaf-list\choice in container
-            if leafDict.get(vKey):
+            converter = converters.get(vKey)
+            if converter:
                 self.elementPath.append(vKey)
                 self.sysLog(syslog.LOG_DEBUG, "xlateContainer vkey {}".format(vKey))
-                yang[vKey] = self._findYangTypedValue(vKey, configC[vKey], leafDict)
+                yang[vKey] = converter.xlate(configC[vKey])
                 self.elementPath.pop()
                 # delete entry from copy of config
                 del configC[vKey]
@@ -805,35 +969,6 @@ class SonicYangExtMixin:
 
         return keyV, keyDict
 
-    """
-    Convert a string from Config DB value to Yang Value based on type of the
-    key in Yang model.
-    @model : A List of Leafs in Yang model list
-    """
-    def _revFindYangTypedValue(self, key, value, leafDict):
-
-        # convert yang Type to config DB string
-        def _revYangConvert(val):
-            # config DB has only strings, thank god for that :), wait not yet!!!
-            return str(val)
-
-        # if it is a leaf-list do it for each element
-        if leafDict[key]['__isleafList']:
-            if isinstance(value, list) and (self.elementPath[0], self.elementPath[-1]) in LEAF_LIST_WITH_STRING_VALUE_DICT:
-                # For field defined as leaf-list but has string value in CONFIG DB, we need do special handling here:
-                # e.g. port.adv_speeds is [10,100,1000] in YANG, need to convert it into a string for CONFIG DB: "10,100,1000"
-                vValue = LEAF_LIST_WITH_STRING_VALUE_DICT[(self.elementPath[0], self.elementPath[-1])].join((_revYangConvert(x) for x in value))
-            else:
-                vValue = list()
-                for v in value:
-                    vValue.append(_revYangConvert(v))
-        elif leafDict[key]['type']['@name'] == 'boolean':
-            vValue = 'true' if value else 'false'
-        else:
-            vValue = _revYangConvert(value)
-
-        return vValue
-
     """
     Rev xlate from <TABLE>_LIST to table in config DB
     Type 1 Lists have inner list, each inner list key:val should
@@ -891,8 +1026,8 @@ class SonicYangExtMixin:
         inner_clist = model.get('list')
         if inner_clist:
             inner_listKey = inner_clist['key']['@value']
-            inner_leafDict = self._createLeafDict(inner_clist, table)
-            for lkey in inner_leafDict:
+            inner_converters = self._getLeafConverters(inner_clist, table)
+            for lkey in inner_converters:
                 if inner_listKey != lkey:
                     inner_listVal = lkey
 
@@ -930,7 +1065,7 @@ class SonicYangExtMixin:
         # create a dict to map each key under primary key with a dict yang model.
         # This is done to improve performance of mapping from values of TABLEs in
         # config DB to leaf in YANG LIST.
-        leafDict = self._createLeafDict(model, table)
+        converters = self._getLeafConverters(model, table)
 
         # list with name <NAME>_LIST should be removed,
         if "_LIST" in model['@name']:
@@ -955,8 +1090,7 @@ class SonicYangExtMixin:
                             continue
 
                         self.elementPath.append(key)
-                        config[pkey][key] = self._revFindYangTypedValue(key, \
-                            entry[key], leafDict)
+                        config[pkey][key] = converters[key].revXlate(entry[key])
                         self.elementPath.pop()
                 self.elementPath.pop()
 
@@ -1012,13 +1146,14 @@ class SonicYangExtMixin:
                 self._revXlateContainerInContainer(modelContainer, yang, config, table)
 
         ## Handle other leaves in container,
-        leafDict = self._createLeafDict(model, table)
+        converters = self._getLeafConverters(model, table)
         for vKey in yang:
             #vkey must be a leaf\leaf-list\choice in container
-            if leafDict.get(vKey):
+            converter = converters.get(vKey)
+            if converter:
                 self.sysLog(syslog.LOG_DEBUG, "revXlateContainer vkey {}".format(vKey))
                 self.elementPath.append(vKey)
-                config[vKey] = self._revFindYangTypedValue(vKey, yang[vKey], leafDict)
+                config[vKey] = converter.revXlate(yang[vKey])
                 self.elementPath.pop()
 
         return
@@ -1154,10 +1289,24 @@ class SonicYangExtMixin:
     load_data: load Config DB, crop, xlate and create data tree from it. (Public)
     input:    data
               debug Flag
+              incremental Flag, keep the loaded tables and their translation,
+              so the next incremental load only translates and reloads in the
+              data tree the tables which changed.
     returns:  True - success   False - failed
     """
-    def loadData(self, configdbJson, debug=False):
+    def loadData(self, configdbJson, debug=False, incremental=False):
+
+       if incremental and self.loadedTables is not None and self.root is not None:
+           try:
+               return self._loadDataIncremental(configdbJson, debug)
+           except Exception as e:
+               # full load gives the result, and the error if the config is invalid
+               self.sysLog(msg="Incremental Data Loading Failed, load all tables:{}".\
+                   format(str(e)), debug=syslog.LOG_WARNING)
 
+       # full load resets the tables kept for incremental load
+       self.loadedTables = None
+       self.xlateTables = dict()
        try:
           # write Translated config in file if debug enabled
           xlateFile = None
@@ -1182,8 +1331,127 @@ class SonicYangExtMixin:
             debug=syslog.LOG_ERR, doPrint=True)
            raise SonicYangException("Data Loading Failed\n{}".format(str(e)))
 
+       if incremental:
+           for table in self.jIn:
+               key, subkey = self._xlateTableKeys(table)
+               self.xlateTables[table] = self.xlateJson[key][subkey]
+           self.loadedTables = copy.deepcopy(self.jIn)
+
        return True
 
+    """
+    Get top level container key and table container key of a table in yang JSON
+    """
+    def _xlateTableKeys(self, table):
+
+        cmap = self.confDbYangMap[table]
+        key = cmap['module']+":"+cmap['topLevelContainer']
+        subkey = cmap['topLevelContainer']+":"+cmap['container']['@name']
+        return key, subkey
+
+    """
+    Load Config DB in the data tree kept from the previous load, only the
+    tables which changed are translated again and reloaded in the data tree.
+    The whole data tree is then validated, which also checks the leafrefs
+    and must conditions of other tables to the reloaded ones.
+    Raise exception if the incremental load fails, the data tree is then
+    not usable and loadData loads all tables.
+    """
+    def _loadDataIncremental(self, configdbJson, debug=False):
+
+        self.jIn = configdbJson
+        self.tablesWithOutYang = dict()
+        # self.jIn will be cropped
+        self._cropConfigDB()
+
+        loadedTables = self.loadedTables
+        changedTables = [table for table in self.jIn \
+            if loadedTables.get(table) != self.jIn[table]]
+        removedTables = [table for table in loadedTables if table not in self.jIn]
+        self.sysLog(msg="Incremental Data Loading, changed tables:{} removed tables:{}".\
+            format(changedTables, removedTables))
+
+        # translate changed tables, the translation of other tables is kept
+        for table in changedTables:
+            yangJ = dict()
+            self._xlateConfigDBtoYang({table: self.jIn[table]}, yangJ)
+            key, subkey = self._xlateTableKeys(table)
+            self.xlateTables[table] = yangJ[key][subkey]
+        for table in removedTables:
+            del self.xlateTables[table]
+
+        self.xlateJson = dict()
+        for table in self.jIn:
+            key, subkey = self._xlateTableKeys(table)
+            self.xlateJson.setdefault(key, dict())[subkey] = self.xlateTables[table]
+        if debug:
+            with open("xlateConfig.json", 'w') as f:
+                dump(self.xlateJson, f, indent=4)
+
+        self._reloadDataTreeTables(changedTables + removedTables)
+        if self.root is not None:
+            self.root.validate(ly.LYD_OPT_CONFIG, self.ctx)
+
+        for table in changedTables:
+            loadedTables[table] = copy.deepcopy(self.jIn[table])
+        for table in removedTables:
+            del loadedTables[table]
+
+        return True
+
+    """
+    Replace the given tables in the data tree with their translation in
+    self.xlateTables. Top level containers left empty are removed.
+    """
+    def _reloadDataTreeTables(self, tables):
+
+        yangJ = dict()
+        for table in tables:
+            module, topc, container = self._getModuleTLCcontainer(table)
+            if self.root is not None:
+                node = self._find_data_node("/" + module + ":" + topc + "/" + table)
+                if node is not None:
+                    parent = node.parent()
+                    node.unlink()
+                    if parent is not None and parent.child() is None:
+                        self._unlinkTopLevelDataNode(parent)
+            if table in self.xlateTables:
+                key, subkey = self._xlateTableKeys(table)
+                yangJ.setdefault(key, dict())[subkey] = self.xlateTables[table]
+
+        if not yangJ:
+            return
+        if self.root is None:
+            # no table is kept, the reloaded tables are all the tables
+            self.root = self.ctx.parse_data_mem(dumps(yangJ), ly.LYD_JSON, \
+                ly.LYD_OPT_CONFIG|ly.LYD_OPT_STRICT)
+            return
+        # Parsed as edit content: values are checked, but not leafrefs and
+        # must conditions to other tables, nor default nodes added, which
+        # would replace the values of other tables when merged. These are
+        # validated along with the whole data tree once merged.
+        node = self.ctx.parse_data_mem(dumps(yangJ), ly.LYD_JSON, \
+            ly.LYD_OPT_EDIT|ly.LYD_OPT_STRICT)
+        self.root.merge(node, 0)
+
+        return
+
+    """
+    Unlink a top level container from the data tree, self.root is moved to
+    another top level container.
+    """
+    def _unlinkTopLevelDataNode(self, node):
+
+        path = node.path()
+        if self.root.path() == path:
+            sibling = self.root.next()
+            node.unlink()
+            self.root = sibling
+        else:
+            node.unlink()
+
+        return
+
     """
     Get data from Data tree, data tree will be assigned in self.xlateJson. (Public)
     """
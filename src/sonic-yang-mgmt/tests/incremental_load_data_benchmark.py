@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""
+Compares full and incremental sonic_yang loadData times for a one line change.
+
+The sample config DB is extended with ACL rules, then the description of one
+port is changed: the full load translates and validates all tables again, the
+incremental load only the PORT table and the tables with leafrefs to it.
+
+Usage: python3 tests/incremental_load_data_benchmark.py [-d yang_dir] [-r rules] [-n runs]
+"""
+
+import argparse
+import copy
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sonic_yang as sy
+
+SAMPLE_CONFIG_DB = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+    "../../sonic-yang-models/tests/files/sample_config_db.json")
+
+
+def load(syc, config, incremental):
+    start = time.time()
+    syc.loadData(copy.deepcopy(config), incremental=incremental)
+    return time.time() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sonic_yang incremental loadData benchmark")
+    parser.add_argument('-d', '--yang-dir', default='/usr/local/yang-models/')
+    parser.add_argument('-r', '--rules', type=int, default=10000)
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(SAMPLE_CONFIG_DB) as f:
+        config = json.load(f)['SAMPLE_CONFIG_DB_JSON']
+    table = next(iter(config['ACL_TABLE']))
+    for rule in range(args.rules):
+        config['ACL_RULE']["{}|RULE_{}".format(table, rule)] = {
+            "PACKET_ACTION": "FORWARD",
+            "PRIORITY": str(rule % 9999 + 1),
+            "SRC_IP": "10.{}.{}.0/24".format(rule >> 8 & 0xff, rule & 0xff)
+        }
+
+    syc = sy.SonicYang(args.yang_dir, print_log_enabled=False)
+    syc.loadYangModel()
+    load(syc, config, True)
+
+    full = []
+    incremental = []
+    for run in range(args.runs):
+        config['PORT']['Ethernet0']['description'] = "run {}".format(run)
+        incremental.append(load(syc, config, True))
+        syc.getData()
+        result = syc.revXlateJson
+        full.append(load(syc, config, False))
+        syc.getData()
+        if result != syc.revXlateJson:
+            print("incremental and full load differ")
+            sys.exit(1)
+        load(syc, config, True)
+
+    print("{} tables, {} ACL rules".format(len(config), len(config['ACL_RULE'])))
+    print("full:        {:.3f}s (best of {})".format(min(full), args.runs))
+    print("incremental: {:.3f}s (best of {})".format(min(incremental), args.runs))
+
+
+if __name__ == '__main__':
+    main()
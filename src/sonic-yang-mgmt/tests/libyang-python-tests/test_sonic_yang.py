@@ -1,10 +1,12 @@
 import sys
 import os
+import copy
 import pytest
 import sonic_yang as sy
 import json
 import glob
 import logging
+from unittest import mock
 from ijson import items as ijson_itmes
 
 test_path = os.path.dirname(os.path.abspath(__file__))
@@ -381,5 +383,110 @@ class Test_SonicYang(object):
 
         return
 
+    def test_yang_model_cache(self, sonic_yang_data, tmp_path, monkeypatch):
+        # The first load creates the cache, the next ones only load the
+        # modules in libyang and take the rest from the cache
+        yang_dir = sonic_yang_data['yang_dir']
+        cache_dir = str(tmp_path)
+
+        cold = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+        cold.loadYangModel()
+        assert len(glob.glob(cache_dir + "/sonic_yang_models_*.pickle")) == 1
+
+        def not_cached():
+            assert False, "yang json built on warm load"
+
+        warm = sy.SonicYang(yang_dir, cache_dir=cache_dir)
+        monkeypatch.setattr(warm, '_loadJsonYangModel', not_cached)
+        warm.loadYangModel()
+        assert warm.yJson == cold.yJson
+        assert warm.confDbYangMap == cold.confDbYangMap
+        assert warm.preProcessedYang == cold.preProcessedYang
+
+        # translation with the cached models
+        jIn = json.loads(self.readIjsonInput(sonic_yang_data['test_file'], 'SAMPLE_CONFIG_DB_JSON'))
+        warm.loadData(jIn)
+        warm.validate_data_tree()
+
+        return
+
+    def test_leaf_converters(self, sonic_yang_data):
+        # converters are compiled with the yang models, per table and leaf
+        syc = sonic_yang_data['syc']
+        port_list = syc._findYangList(syc.confDbYangMap['PORT']['container'], 'PORT_LIST')
+        assert syc._getLeafConverters(port_list, 'PORT') is \
+            syc.leafConverters[('PORT', id(port_list))]
+
+        converters = syc._getLeafConverters(port_list, 'PORT')
+        assert converters['mtu'].xlate('9100') == 9100
+        assert converters['mtu'].revXlate(9100) == '9100'
+        assert converters['admin_status'].xlate('up') == 'up'
+        # leaf-list with string value in config DB
+        assert converters['adv_speeds'].xlate('all') == ['all']
+        assert converters['adv_speeds'].revXlate(['all']) == 'all'
+        assert converters['adv_speeds'].xlate('10, 100') == ['10', '100']
+        assert converters['adv_speeds'].revXlate(['10', '100']) == '10,100'
+
+        return
+
+    def test_incremental_load_data(self, sonic_yang_data):
+        # incremental load must give the same result as a full load, only the
+        # changed tables are translated again
+        syc = sonic_yang_data['syc']
+        jIn = json.loads(self.readIjsonInput(sonic_yang_data['test_file'], 'SAMPLE_CONFIG_DB_JSON'))
+
+        def load(config, incremental):
+            syc.loadData(copy.deepcopy(config), incremental=incremental)
+            xlateJson = copy.deepcopy(syc.xlateJson)
+            syc.getData()
+            return syc.jIn, syc.tablesWithOutYang, xlateJson, syc.revXlateJson
+
+        load(jIn, True)
+        changes = list()
+        config = copy.deepcopy(jIn)
+        config['PORT']['Ethernet0']['description'] = 'uplink'
+        changes.append((config, ['PORT']))
+        config = copy.deepcopy(config)
+        del config['NTP_SERVER']
+        config['UNKNOWN_TABLE'] = {'key': {'field': 'value'}}
+        changes.append((config, []))
+        changes.append((jIn, ['PORT', 'NTP_SERVER']))
+        for config, changedTables in changes:
+            with mock.patch.object(syc, '_xlateConfigDBtoYang', wraps=syc._xlateConfigDBtoYang) as xlate, \
+                    mock.patch.object(syc, '_xlateConfigDB', wraps=syc._xlateConfigDB) as xlateAll:
+                incremental = load(config, True)
+            # the incremental path is taken: no full translation, one per changed table
+            xlateAll.assert_not_called()
+            assert sorted(list(c.args[0])[0] for c in xlate.call_args_list) == sorted(changedTables)
+            assert incremental == load(config, False)
+            load(config, True)
+
+        # invalid changes fail the incremental load itself, not only the full
+        # load it falls back to:
+        # - a port still used by VLAN_MEMBER is removed
+        # - a value does not match its pattern
+        # - the management VRF used by NTP is disabled
+        invalid = list()
+        config = copy.deepcopy(jIn)
+        del config['PORT']['Ethernet0']
+        invalid.append(config)
+        config = copy.deepcopy(jIn)
+        config['PORT']['Ethernet0']['tpid'] = '0xzz'
+        invalid.append(config)
+        config = copy.deepcopy(jIn)
+        config['MGMT_VRF_CONFIG']['vrf_global']['mgmtVrfEnabled'] = 'false'
+        invalid.append(config)
+        for config in invalid:
+            load(jIn, True)
+            with pytest.raises(Exception):
+                syc._loadDataIncremental(copy.deepcopy(config))
+            load(jIn, True)
+            with pytest.raises(sy.SonicYangException):
+                syc.loadData(copy.deepcopy(config), incremental=True)
+            with pytest.raises(sy.SonicYangException):
+                syc.loadData(copy.deepcopy(config))
+
+        return
+
     def teardown_class(self):
         pass
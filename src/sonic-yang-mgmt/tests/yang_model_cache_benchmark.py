@@ -0,0 +1,60 @@
+#!/usr/bin/env python3
+"""
+Compares cold and warm sonic_yang loadYangModel times with the YANG model cache.
+
+Cold: empty cache directory, the JSON of the yang models, the config DB table
+map and the preprocessed groupings are built and saved in the cache.
+Warm: the yang models are only loaded in the libyang context, the rest comes
+from the cache.
+
+Usage: python3 tests/yang_model_cache_benchmark.py [-d yang_dir] [-n runs]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sonic_yang as sy
+
+
+def load(yang_dir, cache_dir):
+    start = time.time()
+    syc = sy.SonicYang(yang_dir, print_log_enabled=False, cache_dir=cache_dir)
+    syc.loadYangModel()
+    return time.time() - start, syc
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sonic_yang model cache benchmark")
+    parser.add_argument('-d', '--yang-dir', default='/usr/local/yang-models/')
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    args = parser.parse_args()
+
+    cache_dir = tempfile.mkdtemp()
+    try:
+        no_cache, reference = load(args.yang_dir, None)
+        cold = []
+        warm = []
+        for _ in range(args.runs):
+            for f in os.listdir(cache_dir):
+                os.unlink(os.path.join(cache_dir, f))
+            cold.append(load(args.yang_dir, cache_dir)[0])
+            elapsed, syc = load(args.yang_dir, cache_dir)
+            warm.append(elapsed)
+            if syc.confDbYangMap != reference.confDbYangMap or syc.yJson != reference.yJson:
+                print("cached yang models differ")
+                sys.exit(1)
+        print("{} yang models".format(len(reference.yangFiles)))
+        print("no cache: {:.3f}s".format(no_cache))
+        print("cold:     {:.3f}s (best of {})".format(min(cold), args.runs))
+        print("warm:     {:.3f}s (best of {})".format(min(warm), args.runs))
+    finally:
+        shutil.rmtree(cache_dir)
+
+
+if __name__ == '__main__':
+    main()
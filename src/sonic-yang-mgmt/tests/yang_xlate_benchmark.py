@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Measures sonic_yang translation and reverse translation of a large synthetic
+config DB, with the leaf converters compiled with the yang models and with
+the yang type of the leaf looked up again for every value and the leaves
+collected on every List\\Container, like before the converters were compiled.
+
+Usage: python3 tests/yang_xlate_benchmark.py [-d yang_dir] [-p ports] [-r rules] [-n runs]
+"""
+
+import argparse
+import copy
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sonic_yang as sy
+from sonic_yang_ext import LeafConverter
+
+
+def synthetic_config(ports, rules):
+    config = {
+        'PORT': dict(),
+        'ACL_TABLE': {
+            'DATAACL': {
+                'policy_desc': 'DATAACL',
+                'ports': ['Ethernet{}'.format(port * 4) for port in range(ports)],
+                'stage': 'ingress',
+                'type': 'L3'
+            }
+        },
+        'ACL_RULE': dict()
+    }
+    for port in range(ports):
+        config['PORT']['Ethernet{}'.format(port * 4)] = {
+            'alias': 'Eth{}/1'.format(port + 1),
+            'lanes': ','.join(str(port * 4 + lane) for lane in range(4)),
+            'speed': '100000',
+            'mtu': '9100',
+            'admin_status': 'up',
+            'adv_speeds': '10000,25000,100000',
+            'description': 'port {}'.format(port)
+        }
+    for rule in range(rules):
+        config['ACL_RULE']['DATAACL|RULE_{}'.format(rule)] = {
+            'PACKET_ACTION': 'FORWARD',
+            'PRIORITY': str(rule % 9999 + 1),
+            'IP_PROTOCOL': '6',
+            'L4_DST_PORT': str(rule % 65535),
+            'SRC_IP': '10.{}.{}.0/24'.format(rule >> 8 & 0xff, rule & 0xff)
+        }
+    return config
+
+
+def xlate(syc, config):
+    jIn = copy.deepcopy(config)
+    yangJ = dict()
+    start = time.time()
+    syc._xlateConfigDBtoYang(jIn, yangJ)
+    middle = time.time()
+    # reverse translation is from self.xlateJson to self.revXlateJson
+    syc.xlateJson = yangJ
+    syc.revXlateJson = dict()
+    syc._revXlateYangtoConfigDB(syc.xlateJson, syc.revXlateJson)
+    return middle - start, time.time() - middle, syc.revXlateJson
+
+
+def main():
+    parser = argparse.ArgumentParser(description="sonic_yang translation benchmark")
+    parser.add_argument('-d', '--yang-dir', default='/usr/local/yang-models/')
+    parser.add_argument('-p', '--ports', type=int, default=512)
+    parser.add_argument('-r', '--rules', type=int, default=50000)
+    parser.add_argument('-n', '--runs', type=int, default=3)
+    args = parser.parse_args()
+
+    syc = sy.SonicYang(args.yang_dir, print_log_enabled=False)
+    syc.loadYangModel()
+    config = synthetic_config(args.ports, args.rules)
+    leaves = sum(len(entry) for table in config.values() for entry in table.values())
+
+    getLeafConverters = syc._getLeafConverters
+    compileLeafConverter = syc._compileLeafConverter
+
+    def perValueLeafConverters(model, table):
+        syc.leafConverters = dict()
+        return getLeafConverters(model, table)
+
+    def perValueLeafConverter(table, name, leaf):
+        return LeafConverter(
+            lambda value: compileLeafConverter(table, name, leaf).xlate(value),
+            lambda value: compileLeafConverter(table, name, leaf).revXlate(value))
+
+    results = dict()
+    for name in ('per value', 'compiled'):
+        if name == 'per value':
+            syc._getLeafConverters = perValueLeafConverters
+            syc._compileLeafConverter = perValueLeafConverter
+        else:
+            syc._getLeafConverters = getLeafConverters
+            syc._compileLeafConverter = compileLeafConverter
+            syc._compileLeafConverters()
+        runs = [xlate(syc, config) for _ in range(args.runs)]
+        results[name] = runs[-1][2]
+        forward = min(run[0] for run in runs)
+        reverse = min(run[1] for run in runs)
+        print("{:9s}: xlate {:.3f}s ({:.0f} leaves/s), rev xlate {:.3f}s ({:.0f} leaves/s)".format(
+            name, forward, leaves / forward, reverse, leaves / reverse))
+
+    if results['per value'] != results['compiled'] or results['compiled'] != config:
+        print("translation results differ")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
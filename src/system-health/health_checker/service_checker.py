@@ -1,7 +1,9 @@
+import concurrent.futures
 import docker
 import os
 import pickle
 import re
+import requests
 
 from swsscommon import swsscommon
 from sonic_py_common import multi_asic, device_info
@@ -15,13 +17,25 @@ logger = Logger(log_identifier=SYSLOG_IDENTIFIER)
 EVENTS_PUBLISHER_SOURCE = "sonic-events-host"
 EVENTS_PUBLISHER_TAG = "process-not-running"
 
-def check_docker_image(image_name):
+# Timeout in seconds of a docker API call
+DOCKER_API_TIMEOUT = 10
+# Timeout in seconds of supervisorctl status run in a container, it may be slow on a busy system
+DOCKER_EXEC_TIMEOUT = 60
+
+def get_docker_client(timeout=DOCKER_API_TIMEOUT):
+    """
+    @summary: Create a docker client, its connection to docker is kept between API calls.
+    @param timeout: Timeout in seconds of an API call.
+    """
+    return docker.DockerClient(base_url='unix://var/run/docker.sock', timeout=timeout)
+
+def check_docker_image(image_name, docker_client=None):
     """
     @summary: This function will check if docker image exists.
     @return:  True if the image exists, otherwise False.
     """
     try:
-        DOCKER_CLIENT = docker.DockerClient(base_url='unix://var/run/docker.sock')
+        DOCKER_CLIENT = docker_client if docker_client else get_docker_client()
         DOCKER_CLIENT.images.get(image_name)
         return True
     except (docker.errors.ImageNotFound, docker.errors.APIError) as err:
@@ -38,8 +52,16 @@ class ServiceChecker(HealthChecker):
 
     CRITICAL_PROCESSES_PATH = 'etc/supervisor/critical_processes'
 
-    # Command to get merged directory of a container
-    GET_CONTAINER_FOLDER_CMD = 'docker inspect {} --format "{{{{.GraphDriver.Data.MergedDir}}}}"'
+    # Command to get the status of supervisor processes in a container
+    SUPERVISOR_STATUS_CMD = ['bash', '-c', 'supervisorctl status']
+    # Process status of a container which did not answer supervisorctl status in time
+    PROCESS_STATUS_UNKNOWN = object()
+
+    # Max number of docker API calls and commands run at the same time
+    MAX_WORKERS = 8
+
+    # Timeout in seconds of a command
+    COMMAND_TIMEOUT = 30
 
     # Command to query the status of monit service.
     CHECK_MONIT_SERVICE_CMD = 'systemctl is-active monit.service'
@@ -68,10 +90,33 @@ class ServiceChecker(HealthChecker):
 
         self.config_db = None
 
+        # Docker client and worker pool are kept between checks. Work is only given to
+        # the pool by the checking thread, a task never waits for another task.
+        self.docker_client = None
+        self.exec_docker_client = None
+        self.executor = None
+        # Output of supervisorctl status got for all containers of a check
+        self.process_status = {}
+
         self.load_critical_process_cache()
 
         self.events_handle = swsscommon.events_init_publisher(EVENTS_PUBLISHER_SOURCE)
 
+    def _get_docker_client(self):
+        if not self.docker_client:
+            self.docker_client = get_docker_client()
+        return self.docker_client
+
+    def _get_exec_docker_client(self):
+        if not self.exec_docker_client:
+            self.exec_docker_client = get_docker_client(DOCKER_EXEC_TIMEOUT)
+        return self.exec_docker_client
+
+    def _get_executor(self):
+        if not self.executor:
+            self.executor = concurrent.futures.ThreadPoolExecutor(max_workers=ServiceChecker.MAX_WORKERS)
+        return self.executor
+
     def get_expected_running_containers(self, feature_table):
         """Get a set of containers that are expected to running on SONiC
 
@@ -101,12 +146,12 @@ class ServiceChecker(HealthChecker):
         for container_name in feature_table.keys():
             # slim image does not have telemetry container and corresponding docker image
             if container_name == "telemetry":
-                ret = check_docker_image("docker-sonic-telemetry")
+                ret = check_docker_image("docker-sonic-telemetry", self._get_docker_client())
                 if not ret:
                     # If telemetry container image is not present, check gnmi container image
                     # If gnmi container image is not present, ignore telemetry container check
                     # if gnmi container image is present, check gnmi container instead of telemetry
-                    ret = check_docker_image("docker-sonic-gnmi")
+                    ret = check_docker_image("docker-sonic-gnmi", self._get_docker_client())
                     if not ret:
                         logger.log_debug("Ignoring telemetry container check on image which has no corresponding docker image")
                     else:
@@ -143,19 +188,19 @@ class ServiceChecker(HealthChecker):
         Returns:
             running_containers: A set of running container names
         """
-        DOCKER_CLIENT = docker.DockerClient(base_url='unix://var/run/docker.sock')
         running_containers = set()
-        ctrs = DOCKER_CLIENT.containers
         try:
-            lst = ctrs.list(filters={"status": "running"})
-
+            # One API call for all containers, names are like "/snmp"
+            lst = self._get_docker_client().api.containers(filters={"status": "running"})
             for ctr in lst:
-                running_containers.add(ctr.name)
-                if ctr.name not in self.container_critical_processes:
-                    self.fill_critical_process_by_container(ctr.name)
+                running_containers.add(ctr['Names'][0].lstrip('/'))
         except docker.errors.APIError as err:
             logger.log_error("Failed to retrieve the running container list. Error: '{}'".format(err))
 
+        new_containers = [container for container in running_containers if container not in self.container_critical_processes]
+        for _ in self._get_executor().map(self.fill_critical_process_by_container, new_containers):
+            pass
+
         return running_containers
 
     def get_critical_process_list_from_file(self, container, critical_processes_file):
@@ -220,11 +265,12 @@ class ServiceChecker(HealthChecker):
         self.need_save_cache = True
 
     def _get_container_folder(self, container):
-        container_folder = utils.run_command(ServiceChecker.GET_CONTAINER_FOLDER_CMD.format(container))
-        if container_folder is None:
-            return container_folder
-
-        return container_folder.strip()
+        try:
+            container_info = self._get_docker_client().api.inspect_container(container)
+            return container_info['GraphDriver']['Data']['MergedDir']
+        except Exception as err:
+            logger.log_warning("Failed to inspect container '{}'. Error: '{}'".format(container, err))
+            return None
 
     def save_critical_process_cache(self):
         """Save self.container_critical_processes to a cache file
@@ -258,19 +304,31 @@ class ServiceChecker(HealthChecker):
     def get_category(self):
         return 'Services'
 
-    def check_by_monit(self, config):
+    def get_monit_summary(self):
+        """Get the output of $CHECK_CMD
+
+        Returns:
+            monit_summary: A tuple (monit service is active, output of $CHECK_CMD)
+        """
+        output = utils.run_command(ServiceChecker.CHECK_MONIT_SERVICE_CMD, timeout=ServiceChecker.COMMAND_TIMEOUT)
+        if not output or output.strip() != 'active':
+            return False, None
+
+        return True, utils.run_command(ServiceChecker.CHECK_CMD, timeout=ServiceChecker.COMMAND_TIMEOUT)
+
+    def check_by_monit(self, config, monit_summary=None):
         """
         et and analyze the output of $CHECK_CMD, collect status for file system or customize checker if any.
         :param config: Health checker configuration.
+        :param monit_summary: Output of get_monit_summary, it is got if not given.
         :return:
         """
-        output = utils.run_command(ServiceChecker.CHECK_MONIT_SERVICE_CMD)
-        if not output or output.strip() != 'active':
+        active, output = monit_summary if monit_summary else self.get_monit_summary()
+        if not active:
             self.set_object_not_ok('Service', 'monit', 'monit service is not running')
             return
 
-        output = utils.run_command(ServiceChecker.CHECK_CMD)
-        lines = output.splitlines()
+        lines = output.splitlines() if output else []
         if not lines or len(lines) < ServiceChecker.MIN_CHECK_CMD_LINES:
             self.set_object_not_ok('Service', 'monit', 'monit service is not ready')
             return
@@ -324,8 +382,14 @@ class ServiceChecker(HealthChecker):
             self.set_object_not_ok('Service', 'system', 'no critical process found')
             return
 
+        # Supervisor process status of all containers are got at the same time
+        containers = [container for container in self.container_critical_processes
+                      if self._is_feature_enabled(container, feature_table)]
+        self.process_status = dict(zip(containers, self._get_executor().map(self.get_process_status, containers)))
+
         for container, critical_process_list in self.container_critical_processes.items():
             self.check_process_existence(container, critical_process_list, config, feature_table)
+        self.process_status = {}
 
         for bad_container in self.bad_containers:
             self.set_object_not_ok('Service', bad_container, 'Syntax of critical_processes file is incorrect')
@@ -337,8 +401,14 @@ class ServiceChecker(HealthChecker):
             config (object): Health checker configuration.
         """
         self.reset()
-        self.check_by_monit(config)
+        # monit summary is got while the services are checked, monit status are still
+        # set first in self._info
+        monit_summary = self._get_executor().submit(self.get_monit_summary)
         self.check_services(config)
+        services_info = self._info
+        self._info = {}
+        self.check_by_monit(config, monit_summary.result())
+        self._info.update(services_info)
         swsscommon.events_deinit_publisher(self.events_handle)
 
     def _parse_supervisorctl_status(self, process_status):
@@ -360,6 +430,46 @@ class ServiceChecker(HealthChecker):
             data[items[0].strip()] = items[1].strip()
         return data
 
+    def get_process_status(self, container_name):
+        """Get the output of supervisorctl status in a container
+
+        Args:
+            container_name (str): Container name
+
+        Returns:
+            process_status: Output of supervisorctl status, None if it could not be got,
+                PROCESS_STATUS_UNKNOWN if it timed out
+        """
+        # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
+        # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
+        # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
+        try:
+            api = self._get_exec_docker_client().api
+            exec_id = api.exec_create(container_name, ServiceChecker.SUPERVISOR_STATUS_CMD, stdout=True, stderr=False)
+            return api.exec_start(exec_id).decode('utf-8', 'replace')
+        except requests.exceptions.Timeout as err:
+            # A busy container says nothing about its processes
+            logger.log_warning("Timed out getting process status of container '{}'. Error: '{}'".format(container_name, err))
+            return ServiceChecker.PROCESS_STATUS_UNKNOWN
+        except docker.errors.APIError as err:
+            # Like docker exec in a stopped container, there is no process status
+            logger.log_debug("Failed to get process status of container '{}'. Error: '{}'".format(container_name, err))
+            return ''
+        except (docker.errors.DockerException, requests.exceptions.ConnectionError) as err:
+            # Like a failed docker exec, docker is not reachable: there is no process status
+            logger.log_warning("Failed to get process status of container '{}'. Error: '{}'".format(container_name, err))
+            return ''
+        except Exception as err:
+            logger.log_warning("Failed to get process status of container '{}'. Error: '{}'".format(container_name, err))
+            return None
+
+    def _is_feature_enabled(self, container_name, feature_table):
+        # We look into the 'FEATURE' table to verify whether the container is disabled or not.
+        feature_name = self.container_feature_dict[container_name]
+        return (feature_name in feature_table
+                and "state" in feature_table[feature_name]
+                and feature_table[feature_name]["state"] not in ["disabled", "always_disabled"])
+
     def publish_events(self, container_name, critical_process_list):
         params = swsscommon.FieldValueMap()
         params["ctr_name"] = container_name
@@ -376,33 +486,32 @@ class ServiceChecker(HealthChecker):
             config (object): Health checker configuration.
             feature_table (object): Feature table
         """
-        feature_name = self.container_feature_dict[container_name]
-        if feature_name in feature_table:
-            # We look into the 'FEATURE' table to verify whether the container is disabled or not.
-            # If the container is diabled, we exit.
-            if ("state" in feature_table[feature_name]
-                    and feature_table[feature_name]["state"] not in ["disabled", "always_disabled"]):
-
-                # We are using supervisorctl status to check the critical process status. We cannot leverage psutil here because
-                # it not always possible to get process cmdline in supervisor.conf. E.g, cmdline of orchagent is "/usr/bin/orchagent",
-                # however, in supervisor.conf it is "/usr/bin/orchagent.sh"
-                cmd = 'docker exec {} bash -c "supervisorctl status"'.format(container_name)
-                process_status = utils.run_command(cmd)
-                if process_status is None:
-                    for process_name in critical_process_list:
-                        self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
-                    self.publish_events(container_name, critical_process_list)
-                    return
-
-                process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
-                for process_name in critical_process_list:
-                    if config and config.ignore_services and process_name in config.ignore_services:
-                        continue
-
-                    # Sometimes process_name is in critical_processes file, but it is not in supervisor.conf, such process will not run in container.
-                    # and it is safe to ignore such process. E.g, radv. So here we only check those processes which are in process_status.
-                    if process_name in process_status:
-                        if process_status[process_name] != 'RUNNING':
-                            self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
-                        else:
-                            self.set_object_ok('Process', '{}:{}'.format(container_name, process_name))
+        # If the container is diabled, we exit.
+        if not self._is_feature_enabled(container_name, feature_table):
+            return
+
+        if container_name in self.process_status:
+            process_status = self.process_status[container_name]
+        else:
+            process_status = self.get_process_status(container_name)
+        if process_status is ServiceChecker.PROCESS_STATUS_UNKNOWN:
+            # The processes are checked again next time, they are not reported as not running
+            return
+        if process_status is None:
+            for process_name in critical_process_list:
+                self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
+            self.publish_events(container_name, critical_process_list)
+            return
+
+        process_status = self._parse_supervisorctl_status(process_status.strip().splitlines())
+        for process_name in critical_process_list:
+            if config and config.ignore_services and process_name in config.ignore_services:
+                continue
+
+            # Sometimes process_name is in critical_processes file, but it is not in supervisor.conf, such process will not run in container.
+            # and it is safe to ignore such process. E.g, radv. So here we only check those processes which are in process_status.
+            if process_name in process_status:
+                if process_status[process_name] != 'RUNNING':
+                    self.set_object_not_ok('Process', '{}:{}'.format(container_name, process_name), "Process '{}' in container '{}' is not running".format(process_name, container_name))
+                else:
+                    self.set_object_ok('Process', '{}:{}'.format(container_name, process_name))
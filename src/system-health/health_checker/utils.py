@@ -1,15 +1,21 @@
 import subprocess
 
 
-def run_command(command):
+def run_command(command, timeout=None):
     """
     Utility function to run an shell command and return the output.
     :param command: Shell command string.
+    :param timeout: Seconds to wait for the command, it is killed after it.
     :return: Output of the shell command.
     """
     try:
         process = subprocess.Popen(command, shell=True, universal_newlines=True, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
-        return process.communicate()[0]
+        try:
+            return process.communicate(timeout=timeout)[0]
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.communicate()
+            return None
     except Exception:
         return None
 
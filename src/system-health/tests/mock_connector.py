@@ -23,6 +23,13 @@ class MockConnector(object):
     def get_all(self, db_id, key):
         return MockConnector.data[key]
 
+    def delete_all_by_pattern(self, db_id, pattern):
+        for key in self.keys(db_id, pattern):
+            MockConnector.data.pop(key)
+
+    def get_redis_client(self, db_id):
+        return MockConnector.data
+
     def exists(self, db_id, key):
         return key in MockConnector.data
 
@@ -34,3 +41,32 @@ class MockConnector(object):
         self.data[key] = {}
         for field,value in fieldsvalues.items():
             self.data[key][field] = value
+
+
+class MockRedisCommand(object):
+    def formatHSET(self, key, values):
+        self.command = ('HSET', key, values)
+
+    def formatHDEL(self, key, field):
+        self.command = ('HDEL', key, field)
+
+
+class MockRedisPipeline(object):
+    """Applies the commands to MockConnector.data on flush"""
+    def __init__(self, client):
+        self.commands = []
+        self.flushes = 0
+
+    def push(self, command):
+        self.commands.append(command.command)
+
+    def flush(self):
+        for op, key, arg in self.commands:
+            if op == 'HSET':
+                MockConnector.data.setdefault(key, {}).update(arg)
+            else:
+                MockConnector.data[key].pop(arg, None)
+                if not MockConnector.data[key]:
+                    MockConnector.data.pop(key)
+        self.commands = []
+        self.flushes += 1
@@ -0,0 +1,113 @@
+import collections
+import threading
+import time
+
+import docker
+import requests
+
+
+class MockDocker(object):
+    """
+    Fake docker daemon behind docker.DockerClient: running containers, the output
+    of supervisorctl status in them and images. Every API call is counted and may
+    take some latency, like the docker daemon.
+    """
+    # process_status of a container in which supervisorctl status times out
+    TIMEOUT = 'timeout'
+    # process_status of a container when the docker socket is down
+    SOCKET_DOWN = 'socket down'
+
+    def __init__(self, latency=0):
+        self.containers = {}
+        self.images = set()
+        self.latency = latency
+        self.calls = collections.Counter()
+        self.clients = 0
+        self.timeouts = []
+        self.concurrent_calls = 0
+        self.max_concurrent_calls = 0
+        self._lock = threading.Lock()
+
+    def add_container(self, name, process_status='', merged_dir=None):
+        """Add a running container
+
+        Args:
+            name (str): Container name
+            process_status (str): Output of supervisorctl status, None if the exec fails,
+                TIMEOUT if it times out, SOCKET_DOWN if docker can't be reached
+            merged_dir (str): MergedDir of the container
+        """
+        self.containers[name] = {
+            'process_status': process_status,
+            'merged_dir': merged_dir
+        }
+
+    def remove_container(self, name):
+        self.containers.pop(name, None)
+
+    def client(self, base_url=None, timeout=None):
+        """Stands for docker.DockerClient"""
+        self.clients += 1
+        self.timeouts.append(timeout)
+        return MockDockerClient(self)
+
+    def call(self, name):
+        with self._lock:
+            self.calls[name] += 1
+            self.concurrent_calls += 1
+            self.max_concurrent_calls = max(self.max_concurrent_calls, self.concurrent_calls)
+        try:
+            if self.latency:
+                time.sleep(self.latency)
+        finally:
+            with self._lock:
+                self.concurrent_calls -= 1
+
+
+class MockDockerApi(object):
+    def __init__(self, mock_docker):
+        self.docker = mock_docker
+
+    def containers(self, filters=None):
+        self.docker.call('containers')
+        return [{'Names': ['/' + name], 'State': 'running'} for name in self.docker.containers]
+
+    def inspect_container(self, container):
+        self.docker.call('inspect_container')
+        if container not in self.docker.containers:
+            raise docker.errors.NotFound("No such container: {}".format(container))
+        return {'GraphDriver': {'Data': {'MergedDir': self.docker.containers[container]['merged_dir']}}}
+
+    def exec_create(self, container, cmd, stdout=True, stderr=True):
+        self.docker.call('exec_create')
+        if container not in self.docker.containers:
+            raise docker.errors.APIError("Container {} is not running".format(container))
+        return {'Id': container}
+
+    def exec_start(self, exec_id):
+        self.docker.call('exec_start')
+        process_status = self.docker.containers[exec_id['Id']]['process_status']
+        if process_status is None:
+            raise ValueError("Invalid exec output")
+        if process_status == MockDocker.SOCKET_DOWN:
+            raise requests.exceptions.ConnectionError("Connection aborted")
+        if process_status == MockDocker.TIMEOUT:
+            raise requests.exceptions.ReadTimeout("Read timed out")
+        return process_status.encode()
+
+
+class MockDockerImages(object):
+    def __init__(self, mock_docker):
+        self.docker = mock_docker
+
+    def get(self, name):
+        self.docker.call('images.get')
+        if name not in self.docker.images:
+            raise docker.errors.ImageNotFound("No such image: {}".format(name))
+        return name
+
+
+class MockDockerClient(object):
+    def __init__(self, mock_docker):
+        self.api = MockDockerApi(mock_docker)
+        self.images = MockDockerImages(mock_docker)
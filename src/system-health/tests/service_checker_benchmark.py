@@ -0,0 +1,82 @@
+#!/usr/bin/env python3
+"""
+Measures a ServiceChecker check against a fake docker daemon, with the docker
+API calls one after another (one worker, like before) and on the worker pool.
+Every docker API call and command takes some latency.
+
+Run from src/system-health:
+    python3 -m tests.service_checker_benchmark [-c containers] [-l latency] [-n checks]
+"""
+import argparse
+import os
+import time
+from unittest.mock import MagicMock, patch
+
+from .mock_docker import MockDocker
+
+from health_checker.service_checker import ServiceChecker
+
+test_path = os.path.dirname(os.path.abspath(__file__))
+
+supervisorctl_output = """
+snmpd                       RUNNING   pid 67, uptime 1:03:56
+snmp-subagent               RUNNING   pid 68, uptime 1:03:56
+"""
+
+
+def run_checks(workers, containers, latency, checks):
+    mock_docker = MockDocker(latency=latency)
+    feature_table = {}
+    for i in range(containers):
+        mock_docker.add_container('snmp' + str(i), supervisorctl_output, test_path)
+        feature_table['snmp' + str(i)] = {'state': 'enabled', 'has_global_scope': 'True', 'has_per_asic_scope': 'False'}
+
+    def run_command(cmd, timeout=None):
+        time.sleep(latency)
+        if 'is-active' in cmd:
+            return 'active'
+        return 'Monit 5.20.0 uptime: 3h 54m\nService Name    Status    Type\nsonic    Running    System\n'
+
+    config_db = MagicMock()
+    config_db.get_table = MagicMock(return_value=feature_table)
+    with patch('docker.DockerClient', side_effect=mock_docker.client), \
+            patch('health_checker.utils.run_command', side_effect=run_command), \
+            patch('swsscommon.swsscommon.ConfigDBConnector', return_value=config_db), \
+            patch('sonic_py_common.multi_asic.is_multi_asic', return_value=False), \
+            patch.object(ServiceChecker, 'CRITICAL_PROCESS_CACHE', os.path.join(test_path, 'benchmark_cache')), \
+            patch.object(ServiceChecker, 'MAX_WORKERS', workers):
+        checker = ServiceChecker()
+        # No ignored services
+        config = None
+        # First check inspects the containers for their critical processes
+        checker.check(config)
+        calls = sum(mock_docker.calls.values())
+        start = time.time()
+        for _ in range(checks):
+            checker.check(config)
+        elapsed = (time.time() - start) / checks
+        info = checker.get_info()
+    os.remove(os.path.join(test_path, 'benchmark_cache'))
+    return elapsed, (sum(mock_docker.calls.values()) - calls) // checks, mock_docker.max_concurrent_calls, info
+
+
+def main():
+    parser = argparse.ArgumentParser(description="ServiceChecker benchmark")
+    parser.add_argument('-c', '--containers', type=int, default=24)
+    parser.add_argument('-l', '--latency', type=float, default=0.05, help="seconds per docker API call and command")
+    parser.add_argument('-n', '--checks', type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for name, workers in (('sequential', 1), ('pool', ServiceChecker.MAX_WORKERS)):
+        elapsed, calls, concurrent, results[name] = run_checks(workers, args.containers, args.latency, args.checks)
+        print("{:10s}: {:.3f}s per check, {} docker API calls per check, {} concurrent calls".format(
+            name, elapsed, calls, concurrent))
+
+    if results['sequential'] != results['pool']:
+        print("check output differs")
+        exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -10,16 +10,17 @@
         3. Config
 """
 import copy
+import docker
 import os
 import sys
-import docker
 from imp import load_source
 from swsscommon import swsscommon
 
 from mock import Mock, MagicMock, patch
 from sonic_py_common import device_info
 
-from .mock_connector import MockConnector
+from .mock_connector import MockConnector, MockRedisCommand, MockRedisPipeline
+from .mock_docker import MockDocker
 
 swsscommon.SonicV2Connector = MockConnector
 
@@ -29,7 +30,7 @@ modules_path = os.path.dirname(test_path)
 scripts_path = os.path.join(modules_path, 'scripts')
 sys.path.insert(0, modules_path)
 sys.path.insert(0, scripts_path)
-from health_checker import utils
+from health_checker import service_checker, utils
 from health_checker.config import Config
 from health_checker.hardware_checker import HardwareChecker
 from health_checker.health_checker import HealthChecker
@@ -103,13 +104,9 @@ def test_service_checker_single_asic(mock_config_db, mock_run, mock_docker_clien
 
         }
     }
-    mock_containers = MagicMock()
-    mock_snmp_container = MagicMock()
-    mock_snmp_container.name = 'snmp'
-    mock_containers.list = MagicMock(return_value=[mock_snmp_container])
-    mock_docker_client_object = MagicMock()
-    mock_docker_client.return_value = mock_docker_client_object
-    mock_docker_client_object.containers = mock_containers
+    mock_docker = MockDocker()
+    mock_docker_client.side_effect = mock_docker.client
+    mock_docker.add_container('snmp', mock_supervisorctl_output)
 
     mock_run.return_value = mock_supervisorctl_output
 
@@ -136,9 +133,7 @@ def test_service_checker_single_asic(mock_config_db, mock_run, mock_docker_clien
 
         }
     }
-    mock_ns_container = MagicMock()
-    mock_ns_container.name = 'new_service'
-    mock_containers.list = MagicMock(return_value=[mock_snmp_container, mock_ns_container])
+    mock_docker.add_container('new_service', mock_supervisorctl_output)
     checker.check(config)
     assert 'new_service' in checker.container_critical_processes
 
@@ -148,13 +143,12 @@ def test_service_checker_single_asic(mock_config_db, mock_run, mock_docker_clien
     assert 'new_service:snmp-subagent' in checker._info
     assert checker._info['new_service:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
 
-    mock_containers.list = MagicMock(return_value=[mock_snmp_container])
+    mock_docker.remove_container('new_service')
     checker.check(config)
     assert 'new_service' in checker._info
     assert checker._info['new_service'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
 
-    mock_containers.list = MagicMock(return_value=[mock_snmp_container, mock_ns_container])
-    mock_run.return_value = None
+    mock_docker.add_container('new_service', None)
     checker.check(config)
     assert 'new_service:snmpd' in checker._info
     assert checker._info['new_service:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
@@ -162,12 +156,96 @@ def test_service_checker_single_asic(mock_config_db, mock_run, mock_docker_clien
     assert 'new_service:snmp-subagent' in checker._info
     assert checker._info['new_service:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
 
+    # Docker clients are kept between checks, supervisorctl status has its own timeout
+    assert mock_docker.timeouts == [service_checker.DOCKER_API_TIMEOUT, service_checker.DOCKER_EXEC_TIMEOUT]
+
     origin_container_critical_processes = copy.deepcopy(checker.container_critical_processes)
     checker.save_critical_process_cache()
     checker.load_critical_process_cache()
     assert origin_container_critical_processes == checker.container_critical_processes
 
 
+@patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker._get_container_folder', MagicMock(return_value=test_path))
+@patch('health_checker.service_checker.ServiceChecker.check_by_monit', MagicMock())
+@patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
+@patch('health_checker.service_checker.ServiceChecker.publish_events')
+@patch('docker.DockerClient')
+@patch('swsscommon.swsscommon.ConfigDBConnector')
+def test_service_checker_process_status_timeout(mock_config_db, mock_docker_client, mock_publish_events):
+    mock_db_data = MagicMock()
+    mock_config_db.return_value = mock_db_data
+    mock_db_data.get_table = MagicMock(return_value={
+        'snmp': {
+            'state': 'enabled',
+            'has_global_scope': 'True',
+            'has_per_asic_scope': 'False',
+        }
+    })
+    mock_docker = MockDocker()
+    mock_docker_client.side_effect = mock_docker.client
+    mock_docker.add_container('snmp', MockDocker.TIMEOUT)
+
+    checker = ServiceChecker()
+    config = Config()
+    checker.check(config)
+    # A container which did not answer in time is checked next time, its processes are not reported as not running
+    assert 'snmp' in checker.container_critical_processes
+    assert 'snmp:snmpd' not in checker._info
+    assert 'snmp:snmp-subagent' not in checker._info
+    mock_publish_events.assert_not_called()
+
+    mock_docker.add_container('snmp', mock_supervisorctl_output)
+    checker.check(config)
+    assert checker._info['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    assert checker._info['snmp:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+
+    # An unexpected error still reports the processes as not running
+    mock_docker.add_container('snmp', None)
+    checker.check(config)
+    assert checker._info['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+    mock_publish_events.assert_called_once_with('snmp', ['snmpd', 'snmp-subagent'])
+
+
+@patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
+@patch('health_checker.service_checker.ServiceChecker._get_container_folder', MagicMock(return_value=test_path))
+@patch('health_checker.service_checker.ServiceChecker.check_by_monit', MagicMock())
+@patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
+@patch('health_checker.service_checker.ServiceChecker.publish_events')
+@patch('docker.DockerClient')
+@patch('swsscommon.swsscommon.ConfigDBConnector')
+def test_service_checker_docker_socket_down(mock_config_db, mock_docker_client, mock_publish_events):
+    mock_db_data = MagicMock()
+    mock_config_db.return_value = mock_db_data
+    mock_db_data.get_table = MagicMock(return_value={
+        'snmp': {
+            'state': 'enabled',
+            'has_global_scope': 'True',
+            'has_per_asic_scope': 'False',
+        }
+    })
+    mock_docker = MockDocker()
+    mock_docker_client.side_effect = mock_docker.client
+    mock_docker.add_container('snmp', mock_supervisorctl_output)
+
+    checker = ServiceChecker()
+    config = Config()
+    checker.check(config)
+    assert checker._info['snmp:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+
+    # Like a failed docker exec: no process status, no process reported as not running
+    mock_docker.add_container('snmp', MockDocker.SOCKET_DOWN)
+    checker.check(config)
+    assert 'snmp:snmpd' not in checker._info
+    assert 'snmp:snmp-subagent' not in checker._info
+    mock_publish_events.assert_not_called()
+
+    # docker client can't be created
+    mock_docker_client.side_effect = docker.errors.DockerException('Error while fetching server API version')
+    checker.exec_docker_client = None
+    assert checker.get_process_status('snmp') == ''
+
+
 @patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
 @patch('health_checker.service_checker.ServiceChecker._get_container_folder', MagicMock(return_value=telemetry_path))
 @patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
@@ -194,19 +272,10 @@ def test_service_checker_telemetry(mock_config_db, mock_run, mock_docker_client)
 
         }
     }
-    mock_containers = MagicMock()
-    mock_gnmi_container = MagicMock()
-    mock_gnmi_container.name = 'gnmi'
-    mock_containers.list = MagicMock(return_value=[mock_gnmi_container])
-    mock_docker_client_object = MagicMock()
-    mock_docker_client.return_value = mock_docker_client_object
-    mock_docker_client_object.containers = mock_containers
-    mock_docker_client_object.images = MagicMock()
-    mock_docker_client_object.images.get = MagicMock()
-    except_err = docker.errors.ImageNotFound("Unit test")
-    mock_docker_client_object.images.get.side_effect = [except_err, None]
-
-    mock_run.return_value = "gnmi-native                       RUNNING   pid 67, uptime 1:03:56"
+    mock_docker = MockDocker()
+    mock_docker_client.side_effect = mock_docker.client
+    mock_docker.add_container('gnmi', "gnmi-native                       RUNNING   pid 67, uptime 1:03:56")
+    mock_docker.images.add('docker-sonic-gnmi')
 
     checker = ServiceChecker()
     assert checker.get_category() == 'Services'
@@ -239,19 +308,11 @@ def test_service_checker_multi_asic(mock_config_db, mock_docker_client):
         }
     }
 
-    mock_containers = MagicMock()
-    mock_snmp_container = MagicMock()
-    mock_snmp_container.name = 'snmp'
-    list_return_value = [mock_snmp_container]
+    mock_docker = MockDocker()
+    mock_docker_client.side_effect = mock_docker.client
+    mock_docker.add_container('snmp', mock_supervisorctl_output)
     for i in range(3):
-        mock_container = MagicMock()
-        mock_container.name = 'snmp' + str(i)
-        list_return_value.append(mock_container)
-
-    mock_containers.list = MagicMock(return_value=list_return_value)
-    mock_docker_client_object = MagicMock()
-    mock_docker_client.return_value = mock_docker_client_object
-    mock_docker_client_object.containers = mock_containers
+        mock_docker.add_container('snmp' + str(i), mock_supervisorctl_output)
 
     checker = ServiceChecker()
 
@@ -277,6 +338,50 @@ def test_service_checker_multi_asic(mock_config_db, mock_docker_client):
     assert checker._info['snmp2:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
 
 
+@patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
+@patch('sonic_py_common.multi_asic.is_multi_asic', MagicMock(return_value=False))
+@patch('docker.DockerClient')
+@patch('health_checker.utils.run_command')
+@patch('swsscommon.swsscommon.ConfigDBConnector')
+def test_service_checker_docker_snapshot(mock_config_db, mock_run, mock_docker_client):
+    setup()
+    mock_db_data = MagicMock()
+    mock_config_db.return_value = mock_db_data
+    mock_db_data.get_table = MagicMock(return_value={
+        'snmp' + str(i): {
+            'state': 'enabled',
+            'has_global_scope': 'True',
+            'has_per_asic_scope': 'False',
+        } for i in range(20)
+    })
+    mock_docker = MockDocker(latency=0.01)
+    mock_docker_client.side_effect = mock_docker.client
+    for i in range(20):
+        mock_docker.add_container('snmp' + str(i), mock_supervisorctl_output, test_path)
+    mock_run.side_effect = lambda cmd, timeout=None: 'active' if 'is-active' in cmd else \
+        'Monit 5.20.0 uptime: 3h 54m\n' \
+        'Service Name                     Status                      Type\n' \
+        'snmp0                            Running                     Process\n'
+
+    checker = ServiceChecker()
+    config = Config()
+    checker.check(config)
+    # Containers are inspected on first check only
+    assert mock_docker.calls['inspect_container'] == 20
+    checker.check(config)
+    assert mock_docker.calls['inspect_container'] == 20
+    assert mock_docker.calls['containers'] == 2
+    assert mock_docker.calls['exec_start'] == 40
+    assert mock_docker.clients == 2
+    assert 1 < mock_docker.max_concurrent_calls <= ServiceChecker.MAX_WORKERS
+
+    # Status from monit come first, status from docker overwrite them
+    assert list(checker._info)[0] == 'snmp0'
+    assert checker._info['snmp0'][HealthChecker.INFO_FIELD_OBJECT_TYPE] == 'Process'
+    assert checker._info['snmp19:snmpd'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_OK
+    assert checker._info['snmp19:snmp-subagent'][HealthChecker.INFO_FIELD_OBJECT_STATUS] == HealthChecker.STATUS_NOT_OK
+
+
 @patch('swsscommon.swsscommon.ConfigDBConnector', MagicMock())
 @patch('swsscommon.swsscommon.ConfigDBConnector.connect', MagicMock())
 @patch('health_checker.service_checker.ServiceChecker.check_by_monit', MagicMock())
@@ -291,11 +396,8 @@ def test_service_checker_no_critical_process(mock_get_table, mock_docker_client)
 
         }
     }
-    mock_containers = MagicMock()
-    mock_containers.list = MagicMock(return_value=[])
-    mock_docker_client_object = MagicMock()
-    mock_docker_client.return_value = mock_docker_client_object
-    mock_docker_client_object.containers = mock_containers
+    mock_docker = MockDocker()
+    mock_docker_client.side_effect = mock_docker.client
 
     checker = ServiceChecker()
     config = Config()
@@ -951,3 +1053,52 @@ def test_healthd_check_interval(mock_log_warning, mock_log_notice, mock_time):
 
     daemon.stop_event.wait.return_value = True
     assert not daemon._run_checker(manager, chassis)
+
+
+@patch('healthd.RedisCommand', MockRedisCommand)
+@patch('healthd.RedisPipeline', MockRedisPipeline)
+@patch('healthd.HealthDaemon.log_debug', side_effect=lambda *args, **kwargs: None)
+def test_healthd_publish_system_health(mock_log_debug):
+    table = HealthDaemon.SYSTEM_HEALTH_TABLE_NAME
+    MockConnector.data[table] = {'stale': 'left by a previous run'}
+    daemon = HealthDaemon()
+
+    def stat(**not_ok):
+        info = {'fan1': {HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_OK,
+                         HealthChecker.INFO_FIELD_OBJECT_MSG: ''}}
+        for name, msg in not_ok.items():
+            info[name] = {HealthChecker.INFO_FIELD_OBJECT_STATUS: HealthChecker.STATUS_NOT_OK,
+                          HealthChecker.INFO_FIELD_OBJECT_MSG: msg}
+        HealthChecker.summary = HealthChecker.STATUS_NOT_OK if not_ok else HealthChecker.STATUS_OK
+        return {'Hardware': info}
+
+    # First check clears the table and writes all fields in one flush
+    daemon._process_stat(None, None, stat(psu1='psu1 is missing', psu2='psu2 is missing'))
+    assert MockConnector.data[table] == {'psu1': 'psu1 is missing', 'psu2': 'psu2 is missing',
+                                         'summary': HealthChecker.STATUS_NOT_OK}
+    assert daemon.last_writes == {'set': 3, 'deleted': 0}
+    assert daemon._pipeline.flushes == 1
+
+    # Nothing changed, nothing written
+    daemon._process_stat(None, None, stat(psu1='psu1 is missing', psu2='psu2 is missing'))
+    assert daemon.last_writes == {'set': 0, 'deleted': 0}
+    assert daemon.write_counters['skipped'] == 1
+    assert daemon._pipeline.flushes == 1
+
+    # Only the changed and removed fields are written
+    daemon._process_stat(None, None, stat(psu1='psu1 is out of power'))
+    assert MockConnector.data[table] == {'psu1': 'psu1 is out of power', 'summary': HealthChecker.STATUS_NOT_OK}
+    assert daemon.last_writes == {'set': 1, 'deleted': 1}
+    assert daemon._pipeline.flushes == 2
+
+    daemon._process_stat(None, None, stat())
+    assert MockConnector.data[table] == {'summary': HealthChecker.STATUS_OK}
+    assert daemon.last_writes == {'set': 1, 'deleted': 1}
+
+    # Table is written again after STATE_DB is flushed
+    MockConnector.data.pop(table)
+    daemon._process_stat(None, None, stat())
+    assert MockConnector.data[table] == {'summary': HealthChecker.STATUS_OK}
+    assert daemon.last_writes == {'set': 1, 'deleted': 0}
+    assert daemon.write_counters == {'checks': 5, 'skipped': 1, 'set': 6, 'deleted': 2}
+    MockConnector.data.pop(table)